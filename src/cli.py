@@ -0,0 +1,244 @@
+"""
+Command-line entry point for the network model data collation.
+
+Example:
+    collate run --year 2035 --scenario HE --tags NGET,SPT --format parquet
+    collate run --tags NGET --run-scoped
+    collate validate --tags NGET,SPT
+    collate runs
+    collate sensitivity --tags NGET --branches ABHA4A-EXET41-1,ABHA4A-LAGA41-1
+    collate threshold-sweep --tags NGET,SPT --thresholds 50,100,200
+    collate serve --port 8765
+
+Any option that is not given falls back to the settings in config.py.
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from src.config import (
+    DEMAND_PROFILES_FILE_PATH, HOURLY_DEMAND_BLOCK_NODES, LOG_FORMAT, RESULT_CACHE_SIZE, SERVICE_HOST, SERVICE_PORT,
+    TRANSMISSION_THRESHOLD_SWEEP, VALID_DEMAND_ALLOCATIONS, VALID_EXCEL_READERS, VALID_INTRA_HVDC_SOURCES, RunConfig,
+    default_run_config
+)
+
+
+def _comma_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the `collate` command.
+
+    :return: Configured ArgumentParser.
+    """
+    parser = argparse.ArgumentParser(prog="collate", description="Network model data collation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Options shared by every command that runs the pipeline.
+    config_parser = argparse.ArgumentParser(add_help=False)
+    config_parser.add_argument("--year", type=int, help="Year of analysis (e.g. 2035).")
+    config_parser.add_argument("--scenario", help='FES scenario for demand ("HT", "HE", "EE").')
+    config_parser.add_argument("--tags", type=_comma_list, help="Comma-separated TO tags, e.g. NGET,SPT.")
+    config_parser.add_argument("--demand-types", type=_comma_list,
+                               help="Comma-separated FES demand types, e.g. R,E,C.")
+    config_parser.add_argument("--gen-capacity-for-transmission", type=float,
+                               help="Capacity (MW) above which plant prefers 275/400kV nodes.")
+    config_parser.add_argument("--output-dir", help="Directory for output files.")
+    config_parser.add_argument("--etys-file", help="Path to the ETYS Appendix B workbook.")
+    config_parser.add_argument("--excel-reader", choices=sorted(VALID_EXCEL_READERS),
+                               help="Engine for reading the ETYS workbook (default streaming).")
+    config_parser.add_argument("--demand-file", help="Path to the FES demand CSV.")
+    config_parser.add_argument("--intra-hvdc-source", choices=sorted(VALID_INTRA_HVDC_SOURCES),
+                               help="Read the Intra HVDC links from the ETYS workbook (default) or the HVDC CSV.")
+    config_parser.add_argument("--demand-allocation", choices=sorted(VALID_DEMAND_ALLOCATIONS),
+                               help="Split demand of GSPs matching several ETYS nodes (default first: no split; "
+                                    "requires scipy otherwise).")
+    config_parser.add_argument("--demand-allocation-weights", help="CSV of GSP, ETYS_Node, Weight for "
+                                                                   "--demand-allocation weights.")
+
+    run_parser = subparsers.add_parser("run", parents=[config_parser],
+                                       help="Collate network, plant, demand and intra HVDC data.")
+    run_parser.add_argument("--format", dest="formats", type=_comma_list,
+                            help="Comma-separated output formats: xlsx, sqlite, parquet, csv, "
+                                 "matpower, pandapower, psse, geojson, geoparquet.")
+    run_parser.add_argument("--verify", action="store_true",
+                            help="Also run the reference implementations and compare every output table "
+                                 "(writes VERIFICATION_<date>.xlsx with mismatches and per-stage speedup).")
+    run_parser.add_argument("--fail-on-invalid-input", action="store_true", default=None,
+                            help="Stop before processing if input validation finds errors.")
+    run_parser.add_argument("--collapse-zero-impedance", action="store_true", default=None,
+                            help="Simulator cases: merge buses joined by zero-impedance branches (requires scipy).")
+    run_parser.add_argument("--reduce-below-kv", type=float,
+                            help="Simulator cases: Kron-reduce nodes below this kV (requires scipy).")
+    run_parser.add_argument("--run-id",
+                            help="Write the outputs to <output dir>/runs/<run id> (safe for concurrent runs).")
+    run_parser.add_argument("--run-scoped", action="store_true",
+                            help="As --run-id, with a generated ID (<timestamp>-<config hash>-<random>).")
+
+    subparsers.add_parser("validate", parents=[config_parser],
+                          help="Check the inputs (columns, types, duplicate keys, Status/Year values, node names) "
+                               "without processing them; exits with status 1 on errors.")
+
+    runs_parser = subparsers.add_parser("runs", help="List the completed runs recorded in the output manifest.")
+    runs_parser.add_argument("--output-dir", help="Directory for output files.")
+
+    sensitivity_parser = subparsers.add_parser("sensitivity", parents=[config_parser],
+                                               help="Compute DC PTDF/LODF matrices for the collated network "
+                                                    "(requires scipy).")
+    sensitivity_parser.add_argument("--branches", type=_comma_list,
+                                    help="Comma-separated branch labels (<Node 1>-<Node 2>-<circuit>) to monitor "
+                                         "and outage; all branches if omitted.")
+    sensitivity_parser.add_argument("--no-lodf", action="store_true", help="Only compute the PTDF matrix.")
+
+    diff_parser = subparsers.add_parser("diff", help="Compare the circuits, transformers and reactive compensation "
+                                                     "of two ETYS Appendix B workbooks.")
+    diff_parser.add_argument("old", help="Path to the old workbook.")
+    diff_parser.add_argument("new", help="Path to the new workbook.")
+    diff_parser.add_argument("--tags", type=_comma_list, help="Comma-separated TO tags (default all).")
+    diff_parser.add_argument("--year", type=int,
+                             help="Compare the assets in service in this year (default all rows as listed).")
+    diff_parser.add_argument("--excel-reader", choices=sorted(VALID_EXCEL_READERS),
+                             help="Engine for reading the workbooks (default streaming).")
+    diff_parser.add_argument("--output-dir", help="Directory for output files.")
+
+    hourly_parser = subparsers.add_parser("hourly-demand", parents=[config_parser],
+                                          help="Expand the nodal demand into hourly time series with per-type "
+                                               "profiles (chunked .npy files).")
+    hourly_parser.add_argument("--profiles", default=DEMAND_PROFILES_FILE_PATH,
+                               help="CSV with one row per hour and one column per demand type.")
+    hourly_parser.add_argument("--block-nodes", type=int, default=HOURLY_DEMAND_BLOCK_NODES,
+                               help="Nodes per chunk file.")
+
+    sweep_parser = subparsers.add_parser("threshold-sweep", parents=[config_parser],
+                                         help="Evaluate the plant-to-node mapping for several transmission "
+                                              "capacity thresholds against --gen-capacity-for-transmission.")
+    sweep_parser.add_argument("--thresholds", type=_comma_list,
+                              default=[str(threshold) for threshold in TRANSMISSION_THRESHOLD_SWEEP],
+                              help="Comma-separated thresholds in MW (default %(default)s).")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the local collation service with warm in-memory caches.")
+    serve_parser.add_argument("--host", default=SERVICE_HOST, help="Interface to bind to (default 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port to listen on.")
+    serve_parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE,
+                              help="Number of per-configuration results kept in memory.")
+    serve_parser.add_argument("--no-warm", action="store_true", help="Do not pre-load the default configuration.")
+    return parser
+
+
+def run_config_from_args(args: argparse.Namespace) -> RunConfig:
+    """
+    Build a RunConfig from parsed arguments, using config.py for anything not given.
+
+    :param args: Parsed `run`, `validate` or `sensitivity` arguments.
+    :return: The run configuration.
+    """
+    overrides = {
+        "year_of_analysis": args.year,
+        "fes_scenario": args.scenario.upper() if args.scenario else None,
+        "selected_tags": [tag.upper() for tag in args.tags] if args.tags else None,
+        "consider_demand_types": [t.upper() for t in args.demand_types] if args.demand_types else None,
+        "gen_capacity_for_transmission": args.gen_capacity_for_transmission,
+        "output_formats": [fmt.lower() for fmt in args.formats] if getattr(args, "formats", None) else None,
+        "output_dir": args.output_dir,
+        "etysb_file_path": args.etys_file,
+        "excel_reader": args.excel_reader,
+        "demand_file_path": args.demand_file,
+        "intra_hvdc_source": args.intra_hvdc_source,
+        "demand_allocation": args.demand_allocation,
+        "demand_allocation_weights_file_path": args.demand_allocation_weights,
+        "collapse_zero_impedance": getattr(args, "collapse_zero_impedance", None),
+        "reduce_below_kv": getattr(args, "reduce_below_kv", None),
+        "fail_on_invalid_input": getattr(args, "fail_on_invalid_input", None),
+        "run_id": getattr(args, "run_id", None),
+    }
+    run_config = default_run_config(**{key: value for key, value in overrides.items() if value is not None})
+    if getattr(args, "run_scoped", False) and not run_config.run_id:
+        run_config = run_config.with_run_id()
+    return run_config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point for the `collate` console script.
+
+    :param argv: Argument list (defaults to sys.argv[1:]).
+    :return: Process exit code.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    if args.command == "run":
+        try:
+            run_config = run_config_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+        from src.main import combine_outputs
+        from src.data_processing.input_validation import InputValidationError
+        try:
+            combine_outputs(run_config, verify=args.verify)
+        except (InputValidationError, ImportError) as e:
+            print(e, file=sys.stderr)
+            return 1
+    elif args.command == "validate":
+        try:
+            run_config = run_config_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+        from src.data_processing.input_validation import validate_inputs
+        report = validate_inputs(run_config)
+        print(report.summary() or "No input issues found.")
+        return 0 if report.ok else 1
+    elif args.command == "runs":
+        from src.data_processing.output_files import read_manifest
+        manifest = read_manifest(args.output_dir or default_run_config().output_dir)
+        if manifest.empty:
+            print("No completed runs recorded.")
+        else:
+            columns = ["run_id", "completed", "year_of_analysis", "fes_scenario", "selected_tags", "output_formats"]
+            print(manifest[columns].to_string(index=False))
+    elif args.command == "sensitivity":
+        try:
+            run_config = run_config_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+        from src.data_processing.network_data import get_network_data
+        from src.data_processing.sensitivity import network_sensitivities, save_sensitivities
+        result = network_sensitivities(get_network_data(run_config), args.branches, args.branches,
+                                       lodf=not args.no_lodf)
+        save_sensitivities(result, run_config.output_path("SENSITIVITY", "npz"))
+    elif args.command == "diff":
+        from src.data_processing.network_diff import compare_workbooks, write_network_diff
+        run_config = default_run_config(**({"output_dir": args.output_dir} if args.output_dir else {}))
+        changes = compare_workbooks(args.old, args.new, [tag.upper() for tag in args.tags] if args.tags else None,
+                                    args.year, args.excel_reader or run_config.excel_reader)
+        write_network_diff(changes, run_config.output_path("NETWORK_DIFF", "xlsx"))
+    elif args.command == "hourly-demand":
+        try:
+            run_config = run_config_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+        from src.data_processing.demand_profiles import build_hourly_demand
+        build_hourly_demand(run_config, args.profiles, args.block_nodes)
+    elif args.command == "threshold-sweep":
+        try:
+            run_config = run_config_from_args(args)
+            thresholds = [float(threshold) for threshold in args.thresholds]
+        except ValueError as e:
+            parser.error(str(e))
+        from src.data_processing.threshold_sweep import run_threshold_sweep, write_threshold_sweep
+        sweep = run_threshold_sweep(run_config, thresholds)
+        print(sweep.summary().to_string(index=False))
+        write_threshold_sweep(sweep, run_config.output_path("THRESHOLD_SWEEP", "xlsx"))
+    elif args.command == "serve":
+        from src.service import serve
+        serve(args.host, args.port, cache_size=args.cache_size, warm=not args.no_warm)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
+import hashlib
 import os
+import uuid
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from typing import FrozenSet, Optional, Tuple
 
 # ---------------------------
 # Network Model Data Collation Configuration
@@ -17,6 +21,29 @@ SELECTED_TAGS = {'NGET'}
 IGNORE_DER = 1 # YET TO CONFIGURE?
 # 1 = YES, 0 = NO
 GEN_CAPACITY_FOR_TRANSMISSION = 100
+TRANSMISSION_THRESHOLD_SWEEP = [50, 100, 200]
+# Thresholds (MW) evaluated by `collate threshold-sweep` against GEN_CAPACITY_FOR_TRANSMISSION
+OUTPUT_FORMATS = {"xlsx"}
+# "xlsx" = FULL_GRID workbook, "sqlite" = indexed SQLite database of the same tables,
+# "parquet" / "csv" = one file per table in a FULL_GRID_<date> directory,
+# "matpower" / "pandapower" / "psse" = simulator case (MATPOWER .m, pandapower JSON, PSS/E v33 RAW)
+# "geojson" / "geoparquet" = node points and branch lines for GIS tools in a FULL_GRID_<date>/geo directory
+COLLAPSE_ZERO_IMPEDANCE = False
+# Simulator cases only: merge buses joined by zero-impedance (busbar / zero length) branches
+REDUCE_BELOW_KV = None
+# Simulator cases only: Kron-reduce nodes below this voltage (e.g. 275 keeps the 275/400kV network), None = no reduction
+FAIL_ON_INVALID_INPUT = False
+# True = stop before processing if input validation finds errors (e.g. duplicate mapping keys), False = log them
+EXCEL_READER = "streaming"
+# Engine for reading the ETYS workbook: "streaming" (cell values only, fastest), "openpyxl" (pandas default) or
+# "calamine" (requires python-calamine); all produce identical DataFrames
+RUN_SCOPED_OUTPUTS = False
+# True = write each run to its own output_data/runs/<run id> directory (safe for concurrent runs), False = output_data
+INTRA_HVDC_SOURCE = "workbook"
+# Intra HVDC links: "workbook" (sheet B-5-1 of the ETYS workbook) or "csv" (INTRA_HVDC_FILE_PATH)
+DEMAND_ALLOCATION = "first"
+# Demand on GSPs matching several ETYS nodes: "first" (all on the first matching node), "equal" (split equally),
+# "weights" (split with DEMAND_ALLOCATION_WEIGHTS_FILE_PATH) or "transformer" (by connected transformer rating)
 
 
 # ---------------------------
@@ -24,7 +51,7 @@ GEN_CAPACITY_FOR_TRANSMISSION = 100
 # ---------------------------
 
 PROJECT_DIR = os.path.dirname(os.path.dirname(__file__))
-date_str = datetime.now().strftime("%d-%m-%Y")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
 ETYSB_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/etys_appendix_b_2024.xlsx")
 COORDINATES_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/substation_coordinates.csv")
@@ -33,12 +60,244 @@ IC_REGISTER_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/interconnector_reg
 TEC_REGISTER_MAPPING_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/tec_register_mapping.csv")
 IC_REGISTER_MAPPING_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/ic_register_mapping.csv")
 DEMAND_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/fes_2024_active_power_demand_data.csv")
+INTRA_HVDC_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/internal_hvdc_etysappb2024.csv")
+DEMAND_ALLOCATION_WEIGHTS_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/demand_allocation_weights.csv")
+DEMAND_PROFILES_FILE_PATH = os.path.join(PROJECT_DIR, "input_data/demand_profiles.csv")
 
-NETWORK_OUTPUT_FILE_PATH = os.path.join(PROJECT_DIR, f"output_data/NODE_NETWORK_DATA_{date_str}.xlsx")
-PLANT_OUTPUT_FILE_PATH = os.path.join(PROJECT_DIR, f"output_data/PLANT_DATA_{date_str}.xlsx")
-DEMAND_OUTPUT_FILE_PATH = os.path.join(PROJECT_DIR, f"output_data/DEMAND_DATA_{date_str}.xlsx")
-HVDC_OUTPUT_FILE_PATH = os.path.join(PROJECT_DIR, f"output_data/INTRA_HVDC_{date_str}.xlsx")
-FULL_GRID_OUTPUT_FILE_PATH = os.path.join(PROJECT_DIR, f"output_data/FULL_GRID_{date_str}.xlsx")
+# Dated output paths are computed on first access (see __getattr__), not when this module is imported.
+_DATED_OUTPUT_FILES = {
+    "NETWORK_OUTPUT_FILE_PATH": "output_data/NODE_NETWORK_DATA_{date_str}.xlsx",
+    "PLANT_OUTPUT_FILE_PATH": "output_data/PLANT_DATA_{date_str}.xlsx",
+    "DEMAND_OUTPUT_FILE_PATH": "output_data/DEMAND_DATA_{date_str}.xlsx",
+    "HVDC_OUTPUT_FILE_PATH": "output_data/INTRA_HVDC_{date_str}.xlsx",
+    "FULL_GRID_OUTPUT_FILE_PATH": "output_data/FULL_GRID_{date_str}.xlsx",
+    "SQLITE_OUTPUT_FILE_PATH": "output_data/FULL_GRID_{date_str}.sqlite",
+}
 
 SHEET_ASSOCIATIONS = {"a": "SHET", "b": "SPT", "c": "NGET", "d": "OFTO", "1": "All"}
 
+OUTPUT_DIR = os.path.join(PROJECT_DIR, "output_data")
+RUNS_DIR = "runs"
+MANIFEST_DIR = "manifest"
+# Number of per-configuration results kept in memory (least recently used are evicted first).
+RESULT_CACHE_SIZE = 8
+# Number of TO network partitions computed in parallel on a cold start.
+NETWORK_PARTITION_WORKERS = 4
+# Persistent memo of resolved ETYS_Node assignments shared by all runs (None disables it), and the number of
+# node lists (ETYS workbook editions / tag selections) whose assignments are kept in it.
+NODE_MATCH_MEMO_PATH = os.path.join(PROJECT_DIR, "cache", "node_matches.sqlite")
+NODE_MATCH_MEMO_NODE_LISTS = 16
+# Nodes per chunk of the hourly demand output (256 nodes x 8760 hours x 8 types of float32 is about 72 MB).
+HOURLY_DEMAND_BLOCK_NODES = 256
+# Run pandas in copy-on-write mode: cached results and filtered frames share memory until modified (see
+# data_processing/cache.py). False restores the eager copies, e.g. for validation.memory_benchmark.
+PANDAS_COPY_ON_WRITE = True
+# Local collation service (collate serve).
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+VALID_OUTPUT_FORMATS = {
+    "xlsx", "sqlite", "parquet", "csv", "matpower", "pandapower", "psse", "geojson", "geoparquet"
+}
+VALID_EXCEL_READERS = {"streaming", "openpyxl", "calamine"}
+VALID_INTRA_HVDC_SOURCES = {"workbook", "csv"}
+VALID_DEMAND_ALLOCATIONS = {"first", "equal", "weights", "transformer"}
+VALID_TAGS = {tag for tag in SHEET_ASSOCIATIONS.values() if tag != "All"}
+
+
+def __getattr__(name: str):
+    # Lazily provide date_str and the dated *_OUTPUT_FILE_PATH constants.
+    if name == "date_str":
+        value = datetime.now().strftime("%d-%m-%Y")
+    elif name in _DATED_OUTPUT_FILES:
+        value = os.path.join(PROJECT_DIR, _DATED_OUTPUT_FILES[name].format(date_str=__getattr__("date_str")))
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+# ---------------------------
+# Run Configuration
+# ---------------------------
+
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    Typed, immutable set of parameters for a single collation run.
+
+    The module-level constants above are only used as defaults (see default_run_config), so a long-lived process
+    can run several configurations side by side by passing different RunConfig objects through the pipeline.
+    """
+    year_of_analysis: int
+    fes_scenario: str
+    consider_demand_types: Tuple[str, ...]
+    selected_tags: FrozenSet[str]
+    ignore_der: int
+    gen_capacity_for_transmission: float
+    output_formats: FrozenSet[str]
+    etysb_file_path: str
+    coordinates_file_path: str
+    tec_register_file_path: str
+    ic_register_file_path: str
+    tec_register_mapping_file_path: str
+    ic_register_mapping_file_path: str
+    demand_file_path: str
+    output_dir: str
+    collapse_zero_impedance: bool = False
+    reduce_below_kv: Optional[float] = None
+    fail_on_invalid_input: bool = False
+    excel_reader: str = "streaming"
+    intra_hvdc_source: str = "workbook"
+    intra_hvdc_file_path: Optional[str] = None
+    demand_allocation: str = "first"
+    demand_allocation_weights_file_path: Optional[str] = None
+    run_id: Optional[str] = None
+    date_str: str = field(default_factory=lambda: datetime.now().strftime("%d-%m-%Y"))
+
+    def __post_init__(self):
+        unknown_tags = set(self.selected_tags) - VALID_TAGS
+        if unknown_tags:
+            raise ValueError(f"Unknown TO tags {sorted(unknown_tags)}; expected a subset of {sorted(VALID_TAGS)}.")
+        unknown_formats = set(self.output_formats) - VALID_OUTPUT_FORMATS
+        if unknown_formats:
+            raise ValueError(
+                f"Unknown output formats {sorted(unknown_formats)}; expected a subset of {sorted(VALID_OUTPUT_FORMATS)}."
+            )
+        if self.excel_reader not in VALID_EXCEL_READERS:
+            raise ValueError(
+                f"Unknown Excel reader {self.excel_reader!r}; expected one of {sorted(VALID_EXCEL_READERS)}."
+            )
+        if self.intra_hvdc_source not in VALID_INTRA_HVDC_SOURCES:
+            raise ValueError(
+                f"Unknown Intra HVDC source {self.intra_hvdc_source!r}; "
+                f"expected one of {sorted(VALID_INTRA_HVDC_SOURCES)}."
+            )
+        if self.demand_allocation not in VALID_DEMAND_ALLOCATIONS:
+            raise ValueError(
+                f"Unknown demand allocation {self.demand_allocation!r}; "
+                f"expected one of {sorted(VALID_DEMAND_ALLOCATIONS)}."
+            )
+
+    def data_key(self) -> tuple:
+        """Return the fields that determine the collated data (i.e. everything except output settings)."""
+        return (
+            self.year_of_analysis, self.fes_scenario, self.consider_demand_types, tuple(sorted(self.selected_tags)),
+            self.ignore_der, self.gen_capacity_for_transmission, self.etysb_file_path, self.coordinates_file_path,
+            self.tec_register_file_path, self.ic_register_file_path, self.tec_register_mapping_file_path,
+            self.ic_register_mapping_file_path, self.demand_file_path, self.demand_allocation,
+            self.demand_allocation_weights_file_path, self.intra_hvdc_source, self.intra_hvdc_file_path,
+        )
+
+    def replace(self, **changes) -> "RunConfig":
+        """Return a copy of this configuration with the given fields replaced."""
+        return replace(self, **changes)
+
+    def config_hash(self) -> str:
+        """Return a short hash of the settings that determine the outputs (data and output settings)."""
+        key = (self.data_key(), tuple(sorted(self.output_formats)), self.collapse_zero_impedance, self.reduce_below_kv)
+        return hashlib.sha256(repr(key).encode()).hexdigest()[:12]
+
+    def with_run_id(self, run_id: Optional[str] = None) -> "RunConfig":
+        """
+        Return a copy of this configuration that writes its outputs to a run-scoped directory.
+
+        :param run_id: Run ID, or None to generate one (see new_run_id).
+        :return: The run configuration.
+        """
+        return replace(self, run_id=run_id or new_run_id(self))
+
+    @property
+    def run_output_dir(self) -> str:
+        """Directory the run writes to: <output_dir>/runs/<run_id> for run-scoped runs, else output_dir."""
+        if self.run_id:
+            return os.path.join(self.output_dir, RUNS_DIR, self.run_id)
+        return self.output_dir
+
+    def output_path(self, stem: str, extension: Optional[str] = None) -> str:
+        """
+        Build a dated output path, e.g. output_path("FULL_GRID", "xlsx") -> <run_output_dir>/FULL_GRID_<date>.xlsx.
+
+        :param stem: File name prefix.
+        :param extension: File extension, or None for a directory.
+        :return: Absolute output path.
+        """
+        name = f"{stem}_{self.date_str}" + (f".{extension}" if extension else "")
+        return os.path.join(self.run_output_dir, name)
+
+    @property
+    def network_output_file_path(self) -> str:
+        return self.output_path("NODE_NETWORK_DATA", "xlsx")
+
+    @property
+    def plant_output_file_path(self) -> str:
+        return self.output_path("PLANT_DATA", "xlsx")
+
+    @property
+    def demand_output_file_path(self) -> str:
+        return self.output_path("DEMAND_DATA", "xlsx")
+
+    @property
+    def hvdc_output_file_path(self) -> str:
+        return self.output_path("INTRA_HVDC", "xlsx")
+
+    @property
+    def full_grid_output_file_path(self) -> str:
+        return self.output_path("FULL_GRID", "xlsx")
+
+    @property
+    def sqlite_output_file_path(self) -> str:
+        return self.output_path("FULL_GRID", "sqlite")
+
+
+def new_run_id(run_config: RunConfig) -> str:
+    """
+    Generate a unique run ID: <timestamp>-<config hash>-<random suffix>, e.g. 20250204-153012-1a2b3c4d5e6f-9f8e.
+
+    :param run_config: Configuration of the run.
+    :return: The run ID.
+    """
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{run_config.config_hash()}-{uuid.uuid4().hex[:4]}"
+
+
+def default_run_config(**overrides) -> RunConfig:
+    """
+    Build a RunConfig from the module-level settings in this file, applying any overrides.
+
+    The settings are read when this function is called (not when the module is imported).
+
+    :param overrides: RunConfig field values that take precedence over the module settings.
+    :return: The run configuration.
+    """
+    settings = dict(
+        year_of_analysis=int(YEAR_OF_ANALYSIS),
+        fes_scenario=FES_SCENARIO,
+        consider_demand_types=tuple(CONSIDER_DEMAND_TYPES),
+        selected_tags=frozenset(SELECTED_TAGS),
+        ignore_der=IGNORE_DER,
+        gen_capacity_for_transmission=GEN_CAPACITY_FOR_TRANSMISSION,
+        output_formats=frozenset(OUTPUT_FORMATS),
+        etysb_file_path=ETYSB_FILE_PATH,
+        coordinates_file_path=COORDINATES_FILE_PATH,
+        tec_register_file_path=TEC_REGISTER_FILE_PATH,
+        ic_register_file_path=IC_REGISTER_FILE_PATH,
+        tec_register_mapping_file_path=TEC_REGISTER_MAPPING_FILE_PATH,
+        ic_register_mapping_file_path=IC_REGISTER_MAPPING_FILE_PATH,
+        demand_file_path=DEMAND_FILE_PATH,
+        output_dir=OUTPUT_DIR,
+        collapse_zero_impedance=COLLAPSE_ZERO_IMPEDANCE,
+        reduce_below_kv=REDUCE_BELOW_KV,
+        fail_on_invalid_input=FAIL_ON_INVALID_INPUT,
+        excel_reader=EXCEL_READER,
+        intra_hvdc_source=INTRA_HVDC_SOURCE,
+        intra_hvdc_file_path=INTRA_HVDC_FILE_PATH,
+        demand_allocation=DEMAND_ALLOCATION,
+        demand_allocation_weights_file_path=DEMAND_ALLOCATION_WEIGHTS_FILE_PATH,
+    )
+    settings.update(overrides)
+    settings["consider_demand_types"] = tuple(settings["consider_demand_types"])
+    settings["selected_tags"] = frozenset(settings["selected_tags"])
+    settings["output_formats"] = frozenset(settings["output_formats"])
+    run_config = RunConfig(**settings)
+    if RUN_SCOPED_OUTPUTS and "run_id" not in overrides:
+        run_config = run_config.with_run_id()
+    return run_config
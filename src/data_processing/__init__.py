@@ -0,0 +1,29 @@
+"""
+Pipeline stages for the network model data collation.
+
+The stage entry points are exposed lazily: `from src.data_processing import get_network_data` only imports the
+defining module when the name is first requested, so importing the package itself costs nothing.
+"""
+
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "get_network_data": "src.data_processing.network_data",
+    "process_plant_data": "src.data_processing.plant_data",
+    "load_demand_data": "src.data_processing.load_data",
+    "process_intra_hvdc_data": "src.data_processing.intra_hvdc",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,200 @@
+"""
+Sanity checks and outlier detection for the circuit parameters of ETYS Appendix B.
+
+Typos in the R/X/B percentages, ratings or lengths (zero impedance, R and X swapped, an impedance per km far from
+the norm for the voltage) otherwise only show up as a diverging load flow much later. All checks work on whole
+columns:
+
+  - rule checks: negative parameters, zero R and X on a line with a length, X/R below 1 on a line at 132kV or
+    above (R and X probably swapped) and a zero winter rating;
+  - outliers: R, X and B per km and X/R of the lines (OHL, Cable, Composite with a length) are compared within their
+    group of derived voltage and circuit type. The quartiles of each group are computed in one grouped quantile on
+    log10 values (the parameters vary by orders of magnitude) and values outside
+    [Q1 - OUTLIER_IQR_FACTOR * IQR, Q3 + OUTLIER_IQR_FACTOR * IQR] are flagged. Groups with fewer than
+    MIN_GROUP_SIZE lines are not tested.
+
+The derived voltage is taken from the 5th character of Node 1 (else Node 2, see node_attributes.VOLTAGE_MAPPING)
+and otherwise from the Voltage (kV) / Rated AC Voltage (kV) columns of the OFTO sheets. Non-numeric parameters
+("TBC") are skipped. The result is one row per flagged branch and check ("Branch Anomalies" sheet /
+branch_anomalies table).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List
+from src.data_processing.node_attributes import VOLTAGE_DIGIT_POSITION, VOLTAGE_MAPPING
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Circuit types with an impedance proportional to their length.
+LINE_TYPES = ("OHL", "Cable", "Composite")
+# Series devices (their reactance may legitimately be negative).
+SERIES_COMPENSATION_TYPES = ("Series Capacitor", "Series Compensation", "SSSC")
+
+OUTLIER_IQR_FACTOR = 3.0
+MIN_GROUP_SIZE = 10
+MIN_XR_VOLTAGE_KV = 132
+
+# Checks.
+NEGATIVE_PARAMETER = "Negative parameter"
+ZERO_IMPEDANCE = "Zero impedance"
+LOW_XR = "X/R below 1"
+ZERO_RATING = "Zero rating"
+OUTLIER = "Outlier"
+
+ERROR = "error"
+WARNING = "warning"
+
+PARAMETER_COLUMNS: List[str] = [
+    "Sheet_Name", "Node 1", "Node 2", "Circuit Type", "Voltage (kV)", "Length (km)", "R (% on 100MVA)",
+    "X (% on 100MVA)", "B (% on 100MVA)", "Winter Rating (MVA)", "R per km", "X per km", "B per km", "X/R",
+]
+OUTLIER_METRICS: List[str] = ["R per km", "X per km", "B per km", "X/R"]
+ANOMALY_COLUMNS: List[str] = [
+    "Check", "Severity", "Sheet_Name", "Node 1", "Node 2", "Circuit Type", "Voltage (kV)", "Parameter", "Value",
+    "Group Median", "Lower Bound", "Upper Bound", "Detail",
+]
+
+
+def _numeric(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[name], errors="coerce")
+
+
+def derived_voltage(df: pd.DataFrame) -> pd.Series:
+    """
+    Derive the voltage (kV) of each branch from its node names, falling back to the voltage columns.
+
+    :param df: Circuit data with Node 1 / Node 2 columns.
+    :return: Voltage (kV) per branch (NaN if unknown).
+    """
+    voltage = pd.Series(np.nan, index=df.index)
+    for end in ("Node 1", "Node 2"):
+        digit = df[end].astype(str).str.strip().str[VOLTAGE_DIGIT_POSITION]
+        voltage = voltage.fillna(pd.to_numeric(digit.map(VOLTAGE_MAPPING), errors="coerce"))
+    for col in ("Voltage (kV)", "Rated AC Voltage (kV)"):
+        voltage = voltage.fillna(_numeric(df, col))
+    return voltage
+
+
+def branch_parameters(circuit_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the per-km impedance and X/R ratio of every circuit.
+
+    :param circuit_df: Concatenated circuit data (e.g. circuit_data_filtered).
+    :return: DataFrame with the PARAMETER_COLUMNS aligned with circuit_df; per-km values are NaN for circuits
+        without a length and for non-line circuit types.
+    """
+    r, x, b = (_numeric(circuit_df, f"{name} (% on 100MVA)") for name in ("R", "X", "B"))
+    length = _numeric(circuit_df, "OHL Length (km)").fillna(0) + _numeric(circuit_df, "Cable Length (km)").fillna(0)
+    circuit_type = circuit_df["Circuit Type"] if "Circuit Type" in circuit_df.columns else \
+        pd.Series(None, index=circuit_df.index, dtype=object)
+    per_km = circuit_type.isin(LINE_TYPES) & (length > 0)
+    km = length.where(per_km)
+    return pd.DataFrame({
+        "Sheet_Name": circuit_df["Sheet_Name"] if "Sheet_Name" in circuit_df.columns else None,
+        "Node 1": circuit_df["Node 1"],
+        "Node 2": circuit_df["Node 2"],
+        "Circuit Type": circuit_type,
+        "Voltage (kV)": derived_voltage(circuit_df),
+        "Length (km)": length,
+        "R (% on 100MVA)": r,
+        "X (% on 100MVA)": x,
+        "B (% on 100MVA)": b,
+        "Winter Rating (MVA)": _numeric(circuit_df, "Winter Rating (MVA)"),
+        "R per km": r / km,
+        "X per km": x / km,
+        "B per km": b / km,
+        "X/R": (x / r.where(r > 0)).where(circuit_type.isin(LINE_TYPES)),
+    }, index=circuit_df.index, columns=PARAMETER_COLUMNS)
+
+
+def _rule_anomalies(params: pd.DataFrame) -> pd.DataFrame:
+    """Rows of the rule checks (one per branch, check and parameter)."""
+    is_line = params["Circuit Type"].isin(LINE_TYPES)
+    r, x = params["R (% on 100MVA)"], params["X (% on 100MVA)"]
+    checks = [
+        (NEGATIVE_PARAMETER, ERROR, "R (% on 100MVA)", r < 0, "Negative resistance"),
+        (NEGATIVE_PARAMETER, ERROR, "X (% on 100MVA)",
+         (x < 0) & ~params["Circuit Type"].isin(SERIES_COMPENSATION_TYPES), "Negative reactance"),
+        (NEGATIVE_PARAMETER, ERROR, "B (% on 100MVA)", params["B (% on 100MVA)"] < 0, "Negative susceptance"),
+        (NEGATIVE_PARAMETER, ERROR, "Length (km)", params["Length (km)"] < 0, "Negative length"),
+        (NEGATIVE_PARAMETER, ERROR, "Winter Rating (MVA)", params["Winter Rating (MVA)"] < 0, "Negative rating"),
+        (ZERO_IMPEDANCE, WARNING, "Length (km)", is_line & (params["Length (km)"] > 0) & (r == 0) & (x == 0),
+         "R and X are 0 on a line with a length"),
+        (LOW_XR, WARNING, "X/R", (params["X/R"] < 1) & (params["Voltage (kV)"] >= MIN_XR_VOLTAGE_KV),
+         f"X < R on a line at {MIN_XR_VOLTAGE_KV}kV or above (R and X swapped?)"),
+        (ZERO_RATING, WARNING, "Winter Rating (MVA)", params["Winter Rating (MVA)"] == 0, "Winter rating is 0"),
+    ]
+    parts = []
+    for check, severity, parameter, flagged, detail in checks:
+        rows = params[flagged.fillna(False).to_numpy(dtype=bool)]
+        if rows.empty:
+            continue
+        parts.append(pd.DataFrame({
+            "Check": check, "Severity": severity, "Sheet_Name": rows["Sheet_Name"], "Node 1": rows["Node 1"],
+            "Node 2": rows["Node 2"], "Circuit Type": rows["Circuit Type"], "Voltage (kV)": rows["Voltage (kV)"],
+            "Parameter": parameter, "Value": rows[parameter], "Detail": detail,
+        }, index=rows.index))
+    return pd.concat(parts) if parts else pd.DataFrame()
+
+
+def _outlier_anomalies(params: pd.DataFrame) -> pd.DataFrame:
+    """Rows of the grouped-quantile outlier check."""
+    keys = ["Voltage (kV)", "Circuit Type"]
+    long = params[keys + OUTLIER_METRICS].melt(id_vars=keys, var_name="Parameter", value_name="Value",
+                                               ignore_index=False)
+    long = long[(long["Value"] > 0) & np.isfinite(long["Value"])].dropna(subset=keys)
+    if long.empty:  # No line with a positive per-km value or X/R to compare.
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    long["log"] = np.log10(long["Value"])
+    grouped = long.groupby(keys + ["Parameter"])["log"]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "median", "q3"]
+    stats["count"] = grouped.size()
+    stats = stats[stats["count"] >= MIN_GROUP_SIZE]
+    iqr = stats["q3"] - stats["q1"]
+    stats["lower"] = stats["q1"] - OUTLIER_IQR_FACTOR * iqr
+    stats["upper"] = stats["q3"] + OUTLIER_IQR_FACTOR * iqr
+
+    tested = long.join(stats, on=keys + ["Parameter"], how="inner")
+    flagged = tested[(tested["log"] < tested["lower"]) | (tested["log"] > tested["upper"])]
+    rows = params.loc[flagged.index]
+    return pd.DataFrame({
+        "Check": OUTLIER, "Severity": WARNING, "Sheet_Name": rows["Sheet_Name"].to_numpy(),
+        "Node 1": rows["Node 1"].to_numpy(), "Node 2": rows["Node 2"].to_numpy(),
+        "Circuit Type": rows["Circuit Type"].to_numpy(), "Voltage (kV)": rows["Voltage (kV)"].to_numpy(),
+        "Parameter": flagged["Parameter"].to_numpy(), "Value": flagged["Value"].to_numpy(),
+        "Group Median": 10 ** flagged["median"].to_numpy(), "Lower Bound": 10 ** flagged["lower"].to_numpy(),
+        "Upper Bound": 10 ** flagged["upper"].to_numpy(),
+        "Detail": np.where(flagged["log"] > flagged["upper"], "Above", "Below") + " the range of "
+        + flagged["count"].astype(int).astype(str).to_numpy() + " lines of the same voltage and type",
+    }, index=flagged.index, columns=ANOMALY_COLUMNS)
+
+
+def check_branch_parameters(circuit_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Run the rule checks and the outlier detection on the circuit data.
+
+    :param circuit_df: Concatenated circuit data (e.g. circuit_data_filtered).
+    :return: DataFrame with the ANOMALY_COLUMNS, one row per flagged branch and check, in circuit order.
+    """
+    if circuit_df.empty or not {"Node 1", "Node 2"} <= set(circuit_df.columns):
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    params = branch_parameters(circuit_df.reset_index(drop=True))
+    parts = [part for part in (_rule_anomalies(params), _outlier_anomalies(params)) if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    anomalies = pd.concat(parts).reindex(columns=ANOMALY_COLUMNS)
+    anomalies = anomalies.rename_axis("_row").sort_values(["_row", "Check"], kind="stable").reset_index(drop=True)
+    counts = anomalies.groupby(["Check", "Severity"]).size()
+    logger.warning("⚠️ Branch parameter checks: " + ", ".join(
+        f"{count} {check.lower()} ({severity})" for (check, severity), count in counts.items()
+    ) + f" in {len(circuit_df)} circuits.")
+    return anomalies
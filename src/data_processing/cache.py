@@ -0,0 +1,171 @@
+"""
+In-process caches for intermediate pipeline results.
+
+Results are keyed on everything that can change them (input file signatures and the relevant RunConfig fields),
+so one process can serve several run configurations without stale or cross-contaminated results. Cached
+DataFrames are copied on the way out so callers are free to modify what they receive.
+
+With PANDAS_COPY_ON_WRITE (the default) pandas runs in copy-on-write mode, enabled before the first stage computes
+anything. The copies handed out are then shallow: they share memory with the cached instance and a column is only
+copied when either side modifies it, so a cache hit (e.g. the 30+ parsed ETYS sheets) costs no memory.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from src.config import PANDAS_COPY_ON_WRITE
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Every ResultCache created in the process, for reporting and clearing.
+_REGISTRY: List["ResultCache"] = []
+_pandas_configured = False
+
+
+def configure_pandas(copy_on_write: bool = PANDAS_COPY_ON_WRITE) -> None:
+    """
+    Set the pandas copy-on-write mode (imports pandas). Called by ResultCache before a stage first runs.
+
+    :param copy_on_write: Enable copy-on-write.
+    """
+    global _pandas_configured
+    pd.set_option("mode.copy_on_write", bool(copy_on_write))
+    _pandas_configured = True
+
+
+def copy_on_write_enabled() -> bool:
+    """Return True if pandas runs in copy-on-write mode."""
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def file_signature(file_path: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """
+    Identify the current contents of a file by absolute path, modification time and size.
+
+    :param file_path: Path to the file.
+    :return: Tuple of (absolute path, mtime in ns, size in bytes); mtime/size are None if the file is missing.
+    """
+    abs_path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return abs_path, None, None
+    return abs_path, stat.st_mtime_ns, stat.st_size
+
+
+def copy_result(value: Any) -> Any:
+    """
+    Copy a cached result so the caller cannot modify the cached instance.
+
+    DataFrames are copied (shallow copies under copy-on-write, deep copies otherwise); dictionaries, lists and
+    tuples are copied recursively; other values are returned as is.
+
+    :param value: Cached value.
+    :return: Independent copy of the value.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not copy_on_write_enabled())
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(copy_result(item) for item in value)
+    return value
+
+
+class ResultCache:
+    """
+    Thread-safe keyed cache with optional least-recently-used eviction.
+
+    :param name: Name used in log messages.
+    :param maxsize: Maximum number of entries kept, or None for no limit.
+    """
+
+    def __init__(self, name: str, maxsize: Optional[int] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _REGISTRY.append(self)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return a copy of the cached value for key, computing and storing it first if needed.
+
+        :param key: Hashable cache key.
+        :param compute: Zero-argument callable producing the value on a cache miss.
+        :return: Copy of the cached value.
+        """
+        if not _pandas_configured:
+            configure_pandas()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy_result(self._entries[key])
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    evicted_key, _ = self._entries.popitem(last=False)
+                    logger.info(f"Evicted entry from '{self.name}' cache: {evicted_key}")
+        return copy_result(value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts and the current number of entries."""
+        with self._lock:
+            return {"name": self.name, "entries": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def all_cache_stats() -> List[Dict[str, Any]]:
+    """Return the statistics of every cache in the process."""
+    return [cache.stats() for cache in _REGISTRY]
+
+
+def clear_all_caches() -> None:
+    """Clear every cache in the process."""
+    for cache in _REGISTRY:
+        cache.clear()
+
+
+_CSV_CACHE = ResultCache("csv files")
+
+
+def read_csv_cached(file_path: str, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Read a CSV file, reusing the parsed DataFrame while the file is unchanged on disk.
+
+    :param file_path: Path to the CSV file.
+    :param read_csv_kwargs: Keyword arguments passed to pandas.read_csv (must be hashable).
+    :return: Copy of the parsed DataFrame.
+    """
+    key = (file_signature(file_path), tuple(sorted(read_csv_kwargs.items())))
+    return _CSV_CACHE.get_or_compute(key, lambda: pd.read_csv(file_path, **read_csv_kwargs))
+
@@ -0,0 +1,668 @@
+"""
+Exports the collated data directly to power-system case formats: MATPOWER (.m), pandapower (JSON) and PSS/E RAW
+(version 33).
+
+build_case assembles a bus/branch model from the collated outputs:
+  - Buses: every node in all_nodes_df. The base kV is the derived voltage, with OFTO nodes (whose names do not
+    follow the 5th digit convention) filled from the OFTO "Voltage (kV)" / "Voltage Ratio (kV)" columns, from a
+    voltage in the node name ("Offshore 220kV-1") or from the other end of a circuit.
+  - Branches: filtered circuits and transformers with R/X/B converted from % on 100MVA to per unit. Seasonal
+    ratings map to rate A/B/C = Winter/Spring/Summer (transformers carry a single rating). Branches whose
+    impedance is "TBC" or whose ends are not buses are excluded and counted in the log.
+  - Loads and generation: from the nodal balance table (Demand Total, Generation Total, IC Import/IC Export).
+    One aggregate generator per node with connected capacity, dispatched at 0 MW (the exporters do not
+    choose a dispatch). Interconnectors are generators with Pmin = -export and Pmax = import capacity.
+  - Reactive compensation: capacitors and reactors become fixed shunts (MVAr Generation - MVAr Absorption);
+    SVC, STATCOM and Sync Comp units become 0 MW generators with Q limits.
+  - HVDC: Intra HVDC links between two buses become DC lines with the converter MVAr limits. Links with an end
+    that is not a bus (e.g. multi-terminal hubs) are excluded and counted in the log.
+  - Slack: the bus with the largest generation capacity.
+
+All records are formatted column-wise (DataFrame.to_csv into a buffer) rather than row by row.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from src.data_processing.output_files import write_text_atomic
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+BASE_MVA = 100.0
+FREQUENCY_HZ = 50.0
+
+# Compensation types modelled as fixed shunts; every other type is modelled as a 0 MW generator with Q limits.
+FIXED_SHUNT_TYPES = {"Mechanically Switched Capacitor", "Shunt Reactor", "Shunt Reactor - SGT tertiary"}
+
+BUS_COLUMNS: List[str] = ["Node", "Bus", "Base kV", "Type", "Area", "Pd", "Qd", "Gs", "Bs"]
+BRANCH_COLUMNS: List[str] = [
+    "From Bus", "To Bus", "From Node", "To Node", "Circuit", "R", "X", "B", "Rate A", "Rate B", "Rate C",
+    "Is Transformer",
+]
+GENERATOR_COLUMNS: List[str] = ["Bus", "Node", "ID", "Kind", "Pg", "Pmax", "Pmin", "Qmax", "Qmin"]
+DC_LINE_COLUMNS: List[str] = [
+    "Name", "From Bus", "To Bus", "From Node", "To Node", "Pmax", "Qmin From", "Qmax From", "Qmin To", "Qmax To",
+    "Rated DC kV",
+]
+
+# PSS/E type codes.
+PQ_BUS, PV_BUS, SLACK_BUS = 1, 2, 3
+
+
+@dataclass
+class PowerSystemCase:
+    """
+    In-memory bus/branch case shared by the exporters. Quantities are per unit on BASE_MVA, MW or MVAr.
+
+    :param buses: One row per bus (BUS_COLUMNS); Bus numbers are 1-based.
+    :param branches: One row per AC branch (BRANCH_COLUMNS).
+    :param generators: One row per generator (GENERATOR_COLUMNS).
+    :param dc_lines: One row per point-to-point HVDC link (DC_LINE_COLUMNS).
+    :param areas: Area number -> Relevant TO name.
+    :param excluded: Count of source rows left out of the case, by reason.
+    """
+    buses: pd.DataFrame
+    branches: pd.DataFrame
+    generators: pd.DataFrame
+    dc_lines: pd.DataFrame
+    areas: Dict[int, str]
+    excluded: Dict[str, int] = field(default_factory=dict)
+
+
+# ============================================================================
+# Case assembly
+# ============================================================================
+
+def _numeric(df: pd.DataFrame, column: str) -> pd.Series:
+    """Numeric view of a column ("TBC" and missing columns become NaN)."""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[column], errors="coerce")
+
+
+def _bus_voltages(nodes_df: pd.DataFrame, circuits: pd.DataFrame, transformers: pd.DataFrame) -> pd.Series:
+    """
+    Base kV per node: the derived voltage, then OFTO voltages, then a voltage in the node name (OFTO nodes such as
+    "Offshore 220kV-1"), then the voltage at the other end of a circuit (followed along chains of circuits).
+
+    :return: Series of base kV indexed by node name (NaN where still unknown).
+    """
+    base_kv = pd.Series(pd.to_numeric(nodes_df["Voltage (Derived)"], errors="coerce").to_numpy(),
+                        index=nodes_df["Node"].to_numpy())
+
+    ofto_kv = []
+    if "Voltage (kV)" in circuits.columns:
+        kv = _numeric(circuits, "Voltage (kV)")
+        ofto_kv += [pd.Series(kv.to_numpy(), index=circuits[col].to_numpy()) for col in ("Node 1", "Node 2")]
+    if "Voltage Ratio (kV)" in transformers.columns:
+        ratio = transformers["Voltage Ratio (kV)"].astype("string").str.split("/", expand=True)
+        if ratio.shape[1] >= 2:
+            for position, col in enumerate(("Node 1", "Node 2")):
+                kv = pd.to_numeric(ratio[position], errors="coerce")
+                ofto_kv.append(pd.Series(kv.to_numpy(), index=transformers[col].to_numpy()))
+    if ofto_kv:
+        known = pd.concat(ofto_kv).dropna()
+        known = known[~known.index.duplicated()]
+        base_kv = base_kv.fillna(known.reindex(base_kv.index))
+
+    named_kv = pd.Series(base_kv.index, dtype="string").str.extract(r"(\d+(?:\.\d+)?)\s*kV", flags=re.IGNORECASE)
+    base_kv = base_kv.fillna(pd.Series(pd.to_numeric(named_kv[0]).to_numpy(), index=base_kv.index))
+
+    if not circuits.empty:
+        ends = pd.DataFrame({"a": circuits["Node 1"].to_numpy(), "b": circuits["Node 2"].to_numpy()})
+        ends = pd.concat([ends, ends.rename(columns={"a": "b", "b": "a"})], ignore_index=True)
+        # Repeat along chains of circuits (e.g. a string of OFTO nodes behind one node of known voltage).
+        while base_kv.isna().any():
+            ends["kv"] = ends["b"].map(base_kv)
+            neighbour = ends.dropna(subset=["kv"]).drop_duplicates("a").set_index("a")["kv"]
+            filled = base_kv.fillna(neighbour.reindex(base_kv.index))
+            if filled.isna().sum() == base_kv.isna().sum():
+                break
+            base_kv = filled
+    return base_kv
+
+
+def _branches(df: pd.DataFrame, bus_numbers: pd.Series, is_transformer: bool) -> pd.DataFrame:
+    """Per-unit branch records from a circuit or transformer table (rows that cannot be modelled are dropped)."""
+    winter = _numeric(df, "Winter Rating (MVA)")
+    if is_transformer:
+        winter = winter.fillna(_numeric(df, "Rating(MVA)"))
+        spring = summer = winter
+    else:
+        spring, summer = _numeric(df, "Spring Rating (MVA)"), _numeric(df, "Summer Rating (MVA)")
+    branches = pd.DataFrame({
+        "From Bus": df["Node 1"].map(bus_numbers),
+        "To Bus": df["Node 2"].map(bus_numbers),
+        "From Node": df["Node 1"],
+        "To Node": df["Node 2"],
+        "R": _numeric(df, "R (% on 100MVA)") / 100,
+        "X": _numeric(df, "X (% on 100MVA)") / 100,
+        "B": _numeric(df, "B (% on 100MVA)").fillna(0) / 100,
+        "Rate A": winter.fillna(0),
+        "Rate B": spring.fillna(winter).fillna(0),
+        "Rate C": summer.fillna(winter).fillna(0),
+        "Is Transformer": is_transformer,
+    })
+    return branches
+
+
+def build_case(outputs: Dict[str, object]) -> PowerSystemCase:
+    """
+    Assemble a bus/branch case from the collated outputs.
+
+    :param outputs: Result of main.collate_outputs (network data, nodal balance, reactive and intra HVDC tables).
+    :return: The PowerSystemCase.
+    """
+    network = outputs["network"]
+    nodes_df = network.get("all_nodes_df", pd.DataFrame())
+    circuits = network.get("circuit_data_filtered", pd.DataFrame())
+    transformers = network.get("transformer_data_filtered", pd.DataFrame())
+    reactive = network.get("reactive_data_filtered", pd.DataFrame())
+    balance = outputs.get("nodal_balance", pd.DataFrame())
+    intra_hvdc = outputs.get("intra_hvdc", pd.DataFrame())
+    excluded: Dict[str, int] = {}
+
+    nodes = nodes_df["Node"].astype(str).reset_index(drop=True)
+    bus_numbers = pd.Series(np.arange(1, len(nodes) + 1), index=nodes.to_numpy())
+    base_kv = _bus_voltages(nodes_df, circuits, transformers).reindex(nodes.to_numpy())
+    excluded["buses with unknown base kV (set to 0)"] = int(base_kv.isna().sum())
+    first_to = nodes_df["Relevant TO"].fillna("").astype(str).str.split(",").str[0].str.strip().replace("", "Unknown")
+    area_codes, area_names = pd.factorize(first_to, sort=True)
+
+    buses = pd.DataFrame({
+        "Node": nodes,
+        "Bus": bus_numbers.to_numpy(),
+        "Base kV": base_kv.fillna(0).to_numpy(),
+        "Type": PQ_BUS,
+        "Area": area_codes + 1,
+        "Pd": 0.0, "Qd": 0.0, "Gs": 0.0, "Bs": 0.0,
+    })
+
+    # Branches.
+    parts = [_branches(df, bus_numbers, is_tx) for df, is_tx in ((circuits, False), (transformers, True))
+             if not df.empty]
+    branches = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=BRANCH_COLUMNS)
+    no_impedance = branches["R"].isna() | branches["X"].isna()
+    no_bus = branches["From Bus"].isna() | branches["To Bus"].isna()
+    excluded["branches with TBC impedance"] = int(no_impedance.sum())
+    excluded["branches with an end that is not a bus"] = int((no_bus & ~no_impedance).sum())
+    branches = branches[~(no_impedance | no_bus)].reset_index(drop=True)
+    branches[["From Bus", "To Bus"]] = branches[["From Bus", "To Bus"]].astype(int)
+    branches["Circuit"] = branches.groupby(["From Bus", "To Bus"]).cumcount() + 1
+    branches = branches[BRANCH_COLUMNS]
+
+    # Loads and generation from the nodal balance.
+    generators = []
+    if not balance.empty:
+        node_balance = balance.set_index("Node").reindex(nodes.to_numpy()).fillna(0)
+        if "Demand Total" in node_balance.columns:
+            buses["Pd"] = node_balance["Demand Total"].to_numpy()
+        gen_cap = node_balance.get("Generation Total", pd.Series(0.0, index=node_balance.index))
+        has_gen = gen_cap > 0
+        generators.append(pd.DataFrame({
+            "Node": gen_cap.index[has_gen], "ID": "G", "Kind": "Generation",
+            "Pmax": gen_cap[has_gen].to_numpy(), "Pmin": 0.0, "Qmax": 0.0, "Qmin": 0.0,
+        }))
+        ic_import = node_balance.get("IC Import", pd.Series(0.0, index=node_balance.index))
+        ic_export = node_balance.get("IC Export", pd.Series(0.0, index=node_balance.index))
+        has_ic = (ic_import > 0) | (ic_export > 0)
+        generators.append(pd.DataFrame({
+            "Node": ic_import.index[has_ic], "ID": "IC", "Kind": "Interconnector",
+            "Pmax": ic_import[has_ic].to_numpy(), "Pmin": -ic_export[has_ic].to_numpy(), "Qmax": 0.0, "Qmin": 0.0,
+        }))
+
+    # Reactive compensation.
+    if not reactive.empty:
+        node_col = reactive["Node"].fillna(reactive["Node 1"]) if "Node 1" in reactive.columns else reactive["Node"]
+        mvar_gen = _numeric(reactive, "MVAr Generation").fillna(0)
+        mvar_abs = _numeric(reactive, "MVAr Absorption").fillna(0)
+        in_case = node_col.isin(bus_numbers.index)
+        excluded["reactive units at a node that is not a bus"] = int((~in_case).sum())
+        fixed = reactive["Compensation Type"].isin(FIXED_SHUNT_TYPES) & in_case
+        shunt_mvar = (mvar_gen - mvar_abs)[fixed].groupby(node_col[fixed]).sum()
+        buses["Bs"] = nodes.map(shunt_mvar).fillna(0.0).to_numpy()
+        dynamic = ~reactive["Compensation Type"].isin(FIXED_SHUNT_TYPES) & in_case
+        generators.append(pd.DataFrame({
+            "Node": node_col[dynamic].to_numpy(),
+            "ID": "Q" + (reactive.loc[dynamic].groupby(node_col[dynamic]).cumcount() + 1).astype(str).to_numpy(),
+            "Kind": reactive.loc[dynamic, "Compensation Type"].to_numpy(),
+            "Pmax": 0.0, "Pmin": 0.0,
+            "Qmax": mvar_gen[dynamic].to_numpy(), "Qmin": -mvar_abs[dynamic].to_numpy(),
+        }))
+
+    generators = [g for g in generators if not g.empty]
+    if generators:
+        gens = pd.concat(generators, ignore_index=True)
+    else:
+        gens = pd.DataFrame(columns=["Node", "ID", "Kind", "Pmax", "Pmin", "Qmax", "Qmin"])
+    gens["Bus"] = gens["Node"].map(bus_numbers)
+    gens["Pg"] = 0.0
+
+    # Bus types: PV where a generator is connected, slack at the largest generation capacity.
+    buses.loc[buses["Bus"].isin(gens["Bus"]), "Type"] = PV_BUS
+    if len(buses):
+        if gens.empty:
+            slack = 0
+            gens = pd.DataFrame([{"Node": nodes[0], "ID": "SL", "Kind": "Slack", "Pmax": 0.0, "Pmin": 0.0,
+                                  "Qmax": 0.0, "Qmin": 0.0, "Bus": 1, "Pg": 0.0}])
+        else:
+            slack = int(gens.groupby("Bus")["Pmax"].sum().idxmax()) - 1
+        buses.loc[slack, "Type"] = SLACK_BUS
+    gens = gens[GENERATOR_COLUMNS].astype({"Bus": int})
+
+    # Point-to-point HVDC links.
+    dc_lines = pd.DataFrame(columns=DC_LINE_COLUMNS)
+    if not intra_hvdc.empty:
+        from_bus, to_bus = intra_hvdc["Node 1"].map(bus_numbers), intra_hvdc["Node 2"].map(bus_numbers)
+        usable = from_bus.notna() & to_bus.notna()
+        excluded["HVDC links with an end that is not a bus"] = int((~usable).sum())
+        hvdc = intra_hvdc[usable]
+        rated_kv = hvdc["Rated Voltage (kV)"].astype("string").str.extract(r"(\d+(?:\.\d+)?)")[0]
+        dc_lines = pd.DataFrame({
+            "Name": hvdc["Interconnector Name"].astype(str) if "Interconnector Name" in hvdc.columns else "",
+            "From Bus": from_bus[usable].astype(int),
+            "To Bus": to_bus[usable].astype(int),
+            "From Node": hvdc["Node 1"],
+            "To Node": hvdc["Node 2"],
+            "Pmax": _numeric(hvdc, "Winter Rating (MVA)").fillna(0),
+            "Qmin From": -_numeric(hvdc, "Node 1 MVAr Abs").fillna(0),
+            "Qmax From": _numeric(hvdc, "Node 1 MVAr Gen").fillna(0),
+            "Qmin To": -_numeric(hvdc, "Node 2 MVAr Abs").fillna(0),
+            "Qmax To": _numeric(hvdc, "Node 2 MVAr Gen").fillna(0),
+            "Rated DC kV": pd.to_numeric(rated_kv, errors="coerce").fillna(0),
+        }).reset_index(drop=True)
+
+    excluded = {reason: count for reason, count in excluded.items() if count}
+    for reason, count in excluded.items():
+        logger.warning(f"⚠️ Case export: {count} {reason}.")
+    logger.info(f"Case built with {len(buses)} buses, {len(branches)} branches, {len(gens)} generators and "
+                f"{len(dc_lines)} DC lines.")
+    return PowerSystemCase(buses=buses, branches=branches, generators=gens, dc_lines=dc_lines,
+                           areas={i + 1: name for i, name in enumerate(area_names)}, excluded=excluded)
+
+
+# ============================================================================
+# Formatting helpers
+# ============================================================================
+
+def _format_rows(df: pd.DataFrame, sep: str = ",", line_prefix: str = "", line_suffix: str = "",
+                 float_format: str = "%.6g") -> str:
+    """
+    Format every row of a DataFrame as one delimited line in a single vectorised call.
+
+    :param df: Columns to write, in order (strings must already be quoted as the target format requires).
+    :param sep: Field separator.
+    :param line_prefix: Text written before each row.
+    :param line_suffix: Text written after each row (before the newline).
+    :param float_format: printf-style format for floats.
+    :return: The formatted lines, each terminated by a newline ("" for an empty DataFrame).
+    """
+    if df.empty:
+        return ""
+    buffer = io.StringIO()
+    df.to_csv(buffer, sep=sep, header=False, index=False, float_format=float_format,
+              lineterminator=line_suffix + "\n", quoting=csv.QUOTE_NONE, escapechar="\\")
+    text = buffer.getvalue()
+    if line_prefix:
+        text = line_prefix + text[:-1].replace("\n", "\n" + line_prefix) + "\n"
+    return text
+
+
+def _quoted(values: pd.Series, width: Optional[int] = None) -> pd.Series:
+    """Single-quote text values for MATPOWER/PSS/E (embedded quotes and commas are removed)."""
+    text = values.astype(str).str.replace(r"[',\"]", "", regex=True)
+    if width:
+        text = text.str[:width]
+    return "'" + text + "'"
+
+
+def _unique_names(values: pd.Series, width: int) -> pd.Series:
+    """
+    Names cut to width characters and made unique by a counter suffix (e.g. three 'Eastern HVDC Link n' become
+    'Eastern HVD1', 'Eastern HVD2' and 'Eastern HVD3' at 12 characters), for records that PSS/E identifies by name.
+    """
+    text = values.astype(str).str.replace(r"[',\"]", "", regex=True).str.strip().str[:width]
+    for _ in range(len(text)):
+        clashing = text.duplicated(keep=False)
+        if not clashing.any():
+            break
+        counter = (text[clashing].groupby(text[clashing]).cumcount() + 1).astype(str)
+        text[clashing] = [name[:width - len(suffix)].rstrip() + suffix
+                          for name, suffix in zip(text[clashing], counter)]
+    return text
+
+
+# ============================================================================
+# MATPOWER
+# ============================================================================
+
+def matpower_case_name(path: str) -> str:
+    """
+    MATPOWER loads a case by calling the function named after the file, so the name must be a valid identifier.
+
+    :param path: Output path.
+    :return: Function name derived from the file name (invalid characters replaced with underscores).
+    """
+    name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    return name if name and not name[0].isdigit() else f"case_{name}"
+
+
+def matpower_path(path: str) -> str:
+    """Return path with the file name replaced by its MATPOWER-safe form (see matpower_case_name)."""
+    return os.path.join(os.path.dirname(path), matpower_case_name(path) + ".m")
+
+
+def format_matpower(case: PowerSystemCase, case_name: str = "network_case") -> str:
+    """
+    Format a case as a MATPOWER version 2 case file.
+
+    :param case: The case to format.
+    :param case_name: Function name of the case.
+    :return: The file contents.
+    """
+    b, br, g, dc = case.buses, case.branches, case.generators, case.dc_lines
+    bus = pd.DataFrame({
+        "bus_i": b["Bus"], "type": b["Type"], "Pd": b["Pd"], "Qd": b["Qd"], "Gs": b["Gs"], "Bs": b["Bs"],
+        "area": b["Area"], "Vm": 1.0, "Va": 0.0, "baseKV": b["Base kV"], "zone": 1, "Vmax": 1.1, "Vmin": 0.9,
+    })
+    gen = pd.DataFrame({
+        "bus": g["Bus"], "Pg": g["Pg"], "Qg": 0.0, "Qmax": g["Qmax"], "Qmin": g["Qmin"], "Vg": 1.0,
+        "mBase": BASE_MVA, "status": 1, "Pmax": g["Pmax"], "Pmin": g["Pmin"],
+    })
+    branch = pd.DataFrame({
+        "fbus": br["From Bus"], "tbus": br["To Bus"], "r": br["R"], "x": br["X"], "b": br["B"],
+        "rateA": br["Rate A"], "rateB": br["Rate B"], "rateC": br["Rate C"],
+        "ratio": br["Is Transformer"].astype(float), "angle": 0.0, "status": 1, "angmin": -360, "angmax": 360,
+    })
+    dcline = pd.DataFrame({
+        "fbus": dc["From Bus"], "tbus": dc["To Bus"], "status": 1, "Pf": 0.0, "Pt": 0.0, "Qf": 0.0, "Qt": 0.0,
+        "Vf": 1.0, "Vt": 1.0, "Pmin": -dc["Pmax"], "Pmax": dc["Pmax"], "QminF": dc["Qmin From"],
+        "QmaxF": dc["Qmax From"], "QminT": dc["Qmin To"], "QmaxT": dc["Qmax To"], "loss0": 0.0, "loss1": 0.0,
+    })
+
+    def matrix(name: str, df: pd.DataFrame) -> str:
+        header = "%\t" + "\t".join(df.columns) + "\n"
+        return f"{header}mpc.{name} = [\n{_format_rows(df, sep=chr(9), line_prefix=chr(9), line_suffix=';')}];\n"
+
+    names = _format_rows(pd.DataFrame({"name": _quoted(b["Node"])}), line_prefix="\t", line_suffix=";")
+    return (
+        f"function mpc = {case_name}\n"
+        f"%{case_name.upper()}  Network case exported by network_model_data_collation.\n\n"
+        "%% MATPOWER Case Format : Version 2\n"
+        "mpc.version = '2';\n\n"
+        f"%% system MVA base\nmpc.baseMVA = {BASE_MVA:g};\n\n"
+        f"%% bus data\n{matrix('bus', bus)}\n"
+        f"%% generator data\n{matrix('gen', gen)}\n"
+        f"%% branch data\n{matrix('branch', branch)}\n"
+        f"%% dc line data (requires toggle_dcline)\n{matrix('dcline', dcline)}\n"
+        f"%% bus names\nmpc.bus_name = {{\n{names}}};\n"
+    )
+
+
+def write_matpower(case: PowerSystemCase, path: str) -> str:
+    """
+    Write a case as a MATPOWER .m file.
+
+    :param case: The case to write.
+    :param path: Output path; the file name is made MATPOWER-safe (see matpower_path).
+    :return: The path written.
+    """
+    path = matpower_path(path)
+    write_text_atomic(format_matpower(case, matpower_case_name(path)), path)
+    return path
+
+
+# ============================================================================
+# pandapower
+# ============================================================================
+
+def _pandapower_frame(df: pd.DataFrame) -> Dict[str, object]:
+    """Encode a DataFrame the way pandapower's to_json does."""
+    return {
+        "_module": "pandas.core.frame",
+        "_class": "DataFrame",
+        "_object": df.to_json(orient="split", double_precision=10),
+        "orient": "split",
+        "dtype": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "is_multiindex": False,
+        "is_multicolumn": False,
+    }
+
+
+def pandapower_tables(case: PowerSystemCase) -> Dict[str, pd.DataFrame]:
+    """
+    Convert a case into pandapower element tables (bus, load, gen, shunt, line, trafo, dcline).
+
+    Per-unit branch data is converted to ohms and nF on the from-bus voltage (lines are given a length of 1 km);
+    transformer impedances are rebased from 100MVA to the transformer rating.
+
+    :param case: The case to convert.
+    :return: Mapping of pandapower table name to DataFrame. Element indices are 0-based bus positions.
+    """
+    b, br, g, dc = case.buses, case.branches, case.generators, case.dc_lines
+    bus_index = b["Bus"] - 1
+    kv = b["Base kV"].to_numpy()
+
+    bus = pd.DataFrame({"name": b["Node"], "vn_kv": kv, "type": "b", "zone": b["Area"].map(case.areas),
+                        "in_service": True})
+    load = pd.DataFrame({
+        "name": b["Node"], "bus": bus_index, "p_mw": b["Pd"], "q_mvar": b["Qd"], "const_z_percent": 0.0,
+        "const_i_percent": 0.0, "sn_mva": np.nan, "scaling": 1.0, "in_service": True, "type": "wye",
+    })[b["Pd"].to_numpy() != 0].reset_index(drop=True)
+    shunt = pd.DataFrame({
+        "bus": bus_index, "name": b["Node"], "q_mvar": -b["Bs"], "p_mw": b["Gs"], "vn_kv": kv, "step": 1,
+        "max_step": 1, "in_service": True,
+    })[b["Bs"].to_numpy() != 0].reset_index(drop=True)
+    slack_bus = b.loc[b["Type"] == SLACK_BUS, "Bus"]
+    gen = pd.DataFrame({
+        "name": g["Node"] + " " + g["ID"], "bus": g["Bus"] - 1, "p_mw": g["Pg"], "vm_pu": 1.0, "sn_mva": np.nan,
+        "min_q_mvar": g["Qmin"], "max_q_mvar": g["Qmax"], "scaling": 1.0, "slack": False, "in_service": True,
+        "type": g["Kind"], "controllable": True, "max_p_mw": g["Pmax"], "min_p_mw": g["Pmin"], "slack_weight": 0.0,
+    })
+    if not slack_bus.empty:
+        first_at_slack = gen.index[g["Bus"].to_numpy() == slack_bus.iloc[0]][:1]
+        gen.loc[first_at_slack, ["slack", "slack_weight"]] = [True, 1.0]
+
+    lines, trafos = br[~br["Is Transformer"]], br[br["Is Transformer"]]
+    from_kv = kv[lines["From Bus"].to_numpy() - 1]
+    z_base = np.where(from_kv > 0, from_kv ** 2 / BASE_MVA, np.nan)
+    rating = lines["Rate A"].to_numpy()
+    line = pd.DataFrame({
+        "name": lines["From Node"] + "-" + lines["To Node"] + " " + lines["Circuit"].astype(str),
+        "std_type": None, "from_bus": lines["From Bus"] - 1, "to_bus": lines["To Bus"] - 1, "length_km": 1.0,
+        "r_ohm_per_km": lines["R"].to_numpy() * z_base, "x_ohm_per_km": lines["X"].to_numpy() * z_base,
+        "c_nf_per_km": lines["B"].to_numpy() / z_base / (2 * np.pi * FREQUENCY_HZ) * 1e9, "g_us_per_km": 0.0,
+        "max_i_ka": np.divide(rating, np.sqrt(3) * from_kv, out=np.full(len(rating), 99999.0),
+                              where=(rating > 0) & (from_kv > 0)),
+        "df": 1.0, "parallel": 1, "type": "ol", "in_service": True,
+    }).reset_index(drop=True)
+
+    # HV side first; impedances rebased from 100MVA to the rating.
+    kv_1, kv_2 = kv[trafos["From Bus"].to_numpy() - 1], kv[trafos["To Bus"].to_numpy() - 1]
+    swap = kv_2 > kv_1
+    sn = np.where(trafos["Rate A"].to_numpy() > 0, trafos["Rate A"].to_numpy(), BASE_MVA)
+    z_pct = np.hypot(trafos["R"].to_numpy(), trafos["X"].to_numpy()) * 100 * sn / BASE_MVA
+    trafo = pd.DataFrame({
+        "name": trafos["From Node"] + "-" + trafos["To Node"] + " " + trafos["Circuit"].astype(str),
+        "std_type": None,
+        "hv_bus": np.where(swap, trafos["To Bus"], trafos["From Bus"]) - 1,
+        "lv_bus": np.where(swap, trafos["From Bus"], trafos["To Bus"]) - 1,
+        "sn_mva": sn, "vn_hv_kv": np.maximum(kv_1, kv_2), "vn_lv_kv": np.minimum(kv_1, kv_2),
+        "vk_percent": z_pct, "vkr_percent": trafos["R"].to_numpy() * 100 * sn / BASE_MVA,
+        "pfe_kw": 0.0, "i0_percent": 0.0, "shift_degree": 0.0, "tap_side": None, "tap_neutral": np.nan,
+        "tap_min": np.nan, "tap_max": np.nan, "tap_step_percent": np.nan, "tap_step_degree": np.nan,
+        "tap_pos": np.nan, "tap_phase_shifter": False, "parallel": 1, "df": 1.0, "in_service": True,
+    }).reset_index(drop=True)
+
+    dcline = pd.DataFrame({
+        "name": dc["Name"], "from_bus": dc["From Bus"] - 1, "to_bus": dc["To Bus"] - 1, "p_mw": 0.0,
+        "loss_percent": 0.0, "loss_mw": 0.0, "vm_from_pu": 1.0, "vm_to_pu": 1.0, "max_p_mw": dc["Pmax"],
+        "min_q_from_mvar": dc["Qmin From"], "min_q_to_mvar": dc["Qmin To"], "max_q_from_mvar": dc["Qmax From"],
+        "max_q_to_mvar": dc["Qmax To"], "in_service": True,
+    })
+    return {"bus": bus, "load": load, "gen": gen, "shunt": shunt, "line": line, "trafo": trafo, "dcline": dcline}
+
+
+def format_pandapower_json(case: PowerSystemCase, name: str = "network_case") -> str:
+    """
+    Format a case in pandapower's JSON layout (readable with pandapower.from_json; missing element tables are
+    added by pandapower on load).
+
+    :param case: The case to format.
+    :param name: Network name.
+    :return: The JSON document.
+    """
+    net = {name_: _pandapower_frame(df) for name_, df in pandapower_tables(case).items()}
+    net.update({
+        "name": name, "f_hz": FREQUENCY_HZ, "sn_mva": BASE_MVA,
+        "std_types": {"line": {}, "trafo": {}, "trafo3w": {}},
+        "version": "2.13.1", "format_version": "2.13.1",
+    })
+    return json.dumps({"_module": "pandapower.auxiliary", "_class": "pandapowerNet", "_object": net}, indent=1)
+
+
+def write_pandapower_json(case: PowerSystemCase, path: str) -> str:
+    """
+    Write a case as a pandapower JSON file.
+
+    :param case: The case to write.
+    :param path: Output path.
+    :return: The path written.
+    """
+    write_text_atomic(format_pandapower_json(case, os.path.splitext(os.path.basename(path))[0]), path)
+    return path
+
+
+# ============================================================================
+# PSS/E RAW (version 33)
+# ============================================================================
+
+def format_psse_raw(case: PowerSystemCase, title: str = "network_case") -> str:
+    """
+    Format a case as a PSS/E version 33 RAW file.
+
+    HVDC links are written as VSC DC lines (converter 1 controls DC voltage, converter 2 power) with the
+    converter MVAr limits; line-commutated links are approximated the same way. PSS/E identifies VSC DC lines by
+    name, so the names are cut to 12 characters and made unique (the pandapower output keeps the full names).
+
+    :param case: The case to format.
+    :param title: Case title (first heading line).
+    :return: The file contents.
+    """
+    b, br, g, dc = case.buses, case.branches, case.generators, case.dc_lines
+
+    bus = pd.DataFrame({
+        "I": b["Bus"], "NAME": _quoted(b["Node"], 12), "BASKV": b["Base kV"], "IDE": b["Type"], "AREA": b["Area"],
+        "ZONE": 1, "OWNER": 1, "VM": 1.0, "VA": 0.0, "NVHI": 1.1, "NVLO": 0.9, "EVHI": 1.1, "EVLO": 0.9,
+    })
+    loads = b[b["Pd"] != 0]
+    load = pd.DataFrame({
+        "I": loads["Bus"], "ID": "'1'", "STATUS": 1, "AREA": loads["Area"], "ZONE": 1, "PL": loads["Pd"],
+        "QL": loads["Qd"], "IP": 0.0, "IQ": 0.0, "YP": 0.0, "YQ": 0.0, "OWNER": 1, "SCALE": 1, "INTRPT": 0,
+    })
+    shunts = b[b["Bs"] != 0]
+    shunt = pd.DataFrame({"I": shunts["Bus"], "ID": "'1'", "STATUS": 1, "GL": shunts["Gs"], "BL": shunts["Bs"]})
+    gen = pd.DataFrame({
+        "I": g["Bus"], "ID": _quoted(g["ID"], 2), "PG": g["Pg"], "QG": 0.0, "QT": g["Qmax"], "QB": g["Qmin"],
+        "VS": 1.0, "IREG": 0, "MBASE": BASE_MVA, "ZR": 0.0, "ZX": 1.0, "RT": 0.0, "XT": 0.0, "GTAP": 1.0,
+        "STAT": 1, "RMPCT": 100.0, "PT": g["Pmax"], "PB": g["Pmin"], "O1": 1, "F1": 1.0, "WMOD": 0, "WPF": 1.0,
+    })
+    lines, trafos = br[~br["Is Transformer"]], br[br["Is Transformer"]]
+    branch = pd.DataFrame({
+        "I": lines["From Bus"], "J": lines["To Bus"], "CKT": _quoted(lines["Circuit"], 2), "R": lines["R"],
+        "X": lines["X"], "B": lines["B"], "RATEA": lines["Rate A"], "RATEB": lines["Rate B"],
+        "RATEC": lines["Rate C"], "GI": 0.0, "BI": 0.0, "GJ": 0.0, "BJ": 0.0, "ST": 1, "MET": 1, "LEN": 0.0,
+        "O1": 1, "F1": 1.0,
+    })
+
+    # Two-winding transformers are four-line records; the lines are formatted per column block and interleaved.
+    tx_blocks = [
+        pd.DataFrame({
+            "I": trafos["From Bus"], "J": trafos["To Bus"], "K": 0, "CKT": _quoted(trafos["Circuit"], 2),
+            "CW": 1, "CZ": 1, "CM": 1, "MAG1": 0.0, "MAG2": trafos["B"], "NMETR": 2, "NAME": "'            '",
+            "STAT": 1, "O1": 1, "F1": 1.0, "VECGRP": "'            '",
+        }),
+        pd.DataFrame({"R1-2": trafos["R"], "X1-2": trafos["X"], "SBASE1-2": BASE_MVA}),
+        pd.DataFrame({
+            "WINDV1": 1.0, "NOMV1": 0.0, "ANG1": 0.0, "RATA1": trafos["Rate A"], "RATB1": trafos["Rate B"],
+            "RATC1": trafos["Rate C"], "COD1": 0, "CONT1": 0, "RMA1": 1.1, "RMI1": 0.9, "VMA1": 1.1, "VMI1": 0.9,
+            "NTP1": 33, "TAB1": 0, "CR1": 0.0, "CX1": 0.0, "CNXA1": 0.0,
+        }, index=trafos.index),
+        pd.DataFrame({"WINDV2": 1.0, "NOMV2": 0.0}, index=trafos.index),
+    ]
+    transformer = _interleave([_format_rows(block) for block in tx_blocks])
+
+    area = pd.DataFrame({
+        "I": list(case.areas), "ISW": 0, "PDES": 0.0, "PTOL": 10.0,
+        "ARNAME": _quoted(pd.Series(list(case.areas.values()), dtype=object), 12),
+    })
+    vsc_blocks = [
+        pd.DataFrame({"NAME": _quoted(_unique_names(dc["Name"], 12)), "MDC": 1, "RDC": 0.0, "O1": 1, "F1": 1.0}),
+        pd.DataFrame({
+            "IBUS": dc["From Bus"], "TYPE": 1, "MODE": 1, "DCSET": dc["Rated DC kV"], "ACSET": 1.0, "ALOSS": 0.0,
+            "BLOSS": 0.0, "MINLOSS": 0.0, "SMAX": dc["Pmax"], "IMAX": 0.0, "PWF": 1.0, "MAXQ": dc["Qmax From"],
+            "MINQ": dc["Qmin From"], "REMOT": 0, "RMPCT": 100.0,
+        }),
+        pd.DataFrame({
+            "IBUS": dc["To Bus"], "TYPE": 2, "MODE": 1, "DCSET": 0.0, "ACSET": 1.0, "ALOSS": 0.0,
+            "BLOSS": 0.0, "MINLOSS": 0.0, "SMAX": dc["Pmax"], "IMAX": 0.0, "PWF": 1.0, "MAXQ": dc["Qmax To"],
+            "MINQ": dc["Qmin To"], "REMOT": 0, "RMPCT": 100.0,
+        }),
+    ]
+    vsc = _interleave([_format_rows(block) for block in vsc_blocks])
+
+    sections = [
+        ("BUS", _format_rows(bus)), ("LOAD", _format_rows(load)), ("FIXED SHUNT", _format_rows(shunt)),
+        ("GENERATOR", _format_rows(gen)), ("BRANCH", _format_rows(branch)), ("TRANSFORMER", transformer),
+        ("AREA", _format_rows(area)), ("TWO-TERMINAL DC", ""), ("VOLTAGE SOURCE CONVERTER", vsc),
+        ("IMPEDANCE CORRECTION", ""), ("MULTI-TERMINAL DC", ""), ("MULTI-SECTION LINE", ""), ("ZONE", ""),
+        ("INTER-AREA TRANSFER", ""), ("OWNER", ""), ("FACTS DEVICE", ""), ("SWITCHED SHUNT", ""),
+        ("GNE DEVICE", ""), ("INDUCTION MACHINE", ""),
+    ]
+    parts = [f"0, {BASE_MVA:.2f}, 33, 0, 1, {FREQUENCY_HZ:.2f}     / PSS/E-33 RAW created by network_model_data_collation\n",
+             f"{title}\n", "\n"]
+    for position, (name, body) in enumerate(sections):
+        parts.append(body)
+        following = f", BEGIN {sections[position + 1][0]} DATA" if position + 1 < len(sections) else ""
+        parts.append(f"0 / END OF {name} DATA{following}\n")
+    parts.append("Q\n")
+    return "".join(parts)
+
+
+def _interleave(blocks: List[str]) -> str:
+    """Interleave equally long blocks of lines record by record (line i of every block, then line i+1, ...)."""
+    if not blocks or not blocks[0]:
+        return ""
+    lines = np.column_stack([np.array(block.splitlines(), dtype=object) for block in blocks])
+    return "\n".join(lines.ravel()) + "\n"
+
+
+def write_psse_raw(case: PowerSystemCase, path: str) -> str:
+    """
+    Write a case as a PSS/E version 33 RAW file.
+
+    :param case: The case to write.
+    :param path: Output path.
+    :return: The path written.
+    """
+    write_text_atomic(format_psse_raw(case, os.path.splitext(os.path.basename(path))[0]), path)
+    return path
+
+
+# Output format -> (file extension, writer).
+CASE_WRITERS = {
+    "matpower": ("m", write_matpower),
+    "pandapower": ("json", write_pandapower_json),
+    "psse": ("raw", write_psse_raw),
+}
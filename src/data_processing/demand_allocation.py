@@ -0,0 +1,239 @@
+"""
+Allocates GSP demand across several ETYS nodes with a sparse GSP x node weight matrix.
+
+By default ("first") each GSP is assigned to the single node found by the exact -> 5-char -> 4-char cascade
+(see node_attributes.resolve_etys_nodes). A GSP whose name matches several nodes at the same cascade level (e.g. a
+site with two 132kV nodes) can instead be split across all of them:
+  - "equal": equal shares.
+  - "weights": shares configured in a CSV file with GSP, ETYS_Node and Weight columns (normalised per GSP); GSPs
+    not listed are split equally.
+  - "transformer": shares proportional to the total rating of the transformers connected to each node (equal
+    shares if none of the candidate nodes has a rated transformer).
+
+Every row of the weight matrix sums to 1, so each GSP's demand is conserved. The node demand per FES type is
+W^T D, where D is the GSP x type demand matrix: one sparse product covering every type. GSPs without any
+candidate node are returned unallocated and reported as unmatched in the nodal balance.
+
+Requires scipy (optional dependency: `pip install scipy`) for the allocation modes other than "first".
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from src.data_processing.node_attributes import build_node_attribute_table
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+FIRST_NODE = "first"
+EQUAL_SPLIT = "equal"
+CONFIGURED_WEIGHTS = "weights"
+TRANSFORMER_RATING = "transformer"
+ALLOCATION_MODES = (FIRST_NODE, EQUAL_SPLIT, CONFIGURED_WEIGHTS, TRANSFORMER_RATING)
+
+ALLOCATION_COLUMNS = ["GSP", "ETYS_Node", "Weight"]
+
+# Tolerance of the per-GSP conservation check (each weight matrix row must sum to 1).
+CONSERVATION_TOLERANCE = 1e-9
+
+
+@dataclass
+class DemandAllocation:
+    """
+    Sparse GSP x node allocation.
+
+    :param gsps: GSP of each matrix row.
+    :param nodes: ETYS node of each matrix column.
+    :param matrix: scipy CSR matrix of weights (rows of allocated GSPs sum to 1, rows of unallocated GSPs are 0).
+    """
+    gsps: pd.Index
+    nodes: pd.Index
+    matrix: object
+
+    def table(self) -> pd.DataFrame:
+        """
+        Return the non-zero weights as a long table.
+
+        :return: DataFrame with the ALLOCATION_COLUMNS.
+        """
+        coo = self.matrix.tocoo()
+        return pd.DataFrame({
+            "GSP": self.gsps[coo.row], "ETYS_Node": self.nodes[coo.col], "Weight": coo.data,
+        }, columns=ALLOCATION_COLUMNS).sort_values(["GSP", "ETYS_Node"], ignore_index=True)
+
+
+def _require_scipy():
+    try:
+        import scipy.sparse
+    except ImportError as e:
+        raise ImportError("Demand allocation requires scipy; install it with `pip install scipy`.") from e
+    return scipy
+
+
+def candidate_nodes(gsps: pd.Index, nodes_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    List every node tied at the cascade level that resolves each GSP: the exact node, else all nodes sharing the
+    first 5 characters, else all nodes at the 4-character site.
+
+    :param gsps: GSP names.
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :return: DataFrame with GSP and ETYS_Node columns (GSPs without candidates are absent).
+    """
+    attributes = build_node_attribute_table(nodes_df).drop_duplicates("Node")
+    names = pd.DataFrame({"GSP": gsps.astype(str)})
+    names["Prefix5"] = names["GSP"].str[:5]
+    names["Site Code"] = names["GSP"].str[:4]
+
+    exact = names[names["GSP"].isin(attributes["Node"])].assign(ETYS_Node=lambda df: df["GSP"])
+    rest = names[~names["GSP"].isin(attributes["Node"])]
+    by_prefix = rest.merge(attributes[["Prefix5", "Node"]], on="Prefix5")
+    rest = rest[~rest["GSP"].isin(by_prefix["GSP"])]
+    by_site = rest.merge(attributes[["Site Code", "Node"]], on="Site Code")
+    matched = pd.concat([by_prefix, by_site], ignore_index=True).rename(columns={"Node": "ETYS_Node"})
+    return pd.concat([exact[["GSP", "ETYS_Node"]], matched[["GSP", "ETYS_Node"]]], ignore_index=True)
+
+
+def transformer_ratings(transformer_df: pd.DataFrame) -> pd.Series:
+    """
+    Total transformer rating (MVA) connected to each node (either winding).
+
+    :param transformer_df: Transformer data with Node 1, Node 2 and Winter Rating (MVA) / Rating(MVA) columns.
+    :return: Series of MVA indexed by node.
+    """
+    if transformer_df.empty:
+        return pd.Series(dtype=float)
+    rating = pd.Series(np.nan, index=transformer_df.index)
+    for col in ("Winter Rating (MVA)", "Rating(MVA)"):
+        if col in transformer_df.columns:
+            rating = rating.fillna(pd.to_numeric(transformer_df[col], errors="coerce"))
+    ends = pd.concat([
+        pd.DataFrame({"Node": transformer_df[col].astype(str).str.strip(), "MVA": rating.fillna(0.0)})
+        for col in ("Node 1", "Node 2") if col in transformer_df.columns
+    ], ignore_index=True)
+    return ends.groupby("Node")["MVA"].sum()
+
+
+def read_allocation_weights(file_path: str) -> pd.DataFrame:
+    """
+    Read configured allocation weights.
+
+    :param file_path: CSV file with GSP, ETYS_Node and Weight columns (GSP underscores are removed, as in the
+        demand data).
+    :return: DataFrame with the ALLOCATION_COLUMNS.
+    """
+    from src.data_processing.cache import read_csv_cached
+    weights = read_csv_cached(file_path)
+    missing = [col for col in ALLOCATION_COLUMNS if col not in weights.columns]
+    if missing:
+        raise ValueError(f"Demand allocation weights file {file_path} is missing columns {missing}.")
+    weights = weights[ALLOCATION_COLUMNS]
+    weights["GSP"] = weights["GSP"].astype(str).str.replace("_", "", regex=False)
+    weights["Weight"] = pd.to_numeric(weights["Weight"], errors="coerce").fillna(0.0)
+    return weights
+
+
+def build_demand_allocation(gsps: pd.Index, nodes_df: pd.DataFrame, mode: str,
+                            transformer_df: Optional[pd.DataFrame] = None,
+                            weights_df: Optional[pd.DataFrame] = None) -> DemandAllocation:
+    """
+    Build the GSP x node weight matrix.
+
+    :param gsps: GSP names (unique).
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :param mode: EQUAL_SPLIT, CONFIGURED_WEIGHTS or TRANSFORMER_RATING.
+    :param transformer_df: Transformer data (TRANSFORMER_RATING).
+    :param weights_df: Configured weights (CONFIGURED_WEIGHTS), see read_allocation_weights.
+    :return: The DemandAllocation.
+    """
+    if mode not in ALLOCATION_MODES or mode == FIRST_NODE:
+        raise ValueError(f"Unknown demand allocation mode {mode!r}; expected one of {ALLOCATION_MODES[1:]}.")
+    scipy = _require_scipy()
+    gsps = pd.Index(gsps.astype(str)).unique()
+    nodes = pd.Index(build_node_attribute_table(nodes_df)["Node"]).unique()
+    pairs = candidate_nodes(gsps, nodes_df)
+    pairs["Weight"] = 1.0
+
+    if mode == TRANSFORMER_RATING:
+        ratings = transformer_ratings(transformer_df if transformer_df is not None else pd.DataFrame())
+        pairs["Weight"] = pairs["ETYS_Node"].map(ratings).fillna(0.0)
+        unrated = pairs.groupby("GSP")["Weight"].transform("sum") <= 0
+        pairs.loc[unrated, "Weight"] = 1.0
+    elif mode == CONFIGURED_WEIGHTS and weights_df is not None:
+        configured = weights_df[weights_df["GSP"].isin(gsps) & (weights_df["Weight"] > 0)]
+        unknown = ~configured["ETYS_Node"].isin(nodes)
+        if unknown.any():
+            logger.warning(f"⚠️ Ignoring {int(unknown.sum())} configured demand weights for nodes not in the network: "
+                           f"{sorted(configured.loc[unknown, 'ETYS_Node'].unique())[:5]}")
+            configured = configured[~unknown]
+        pairs = pd.concat([pairs[~pairs["GSP"].isin(configured["GSP"])], configured], ignore_index=True)
+
+    pairs = pairs.groupby(["GSP", "ETYS_Node"], as_index=False, sort=False)["Weight"].sum()
+    pairs["Weight"] = pairs["Weight"] / pairs.groupby("GSP")["Weight"].transform("sum")
+    pairs = pairs[pairs["Weight"] > 0]
+    matrix = scipy.sparse.csr_matrix(
+        (pairs["Weight"].to_numpy(), (gsps.get_indexer(pairs["GSP"]), nodes.get_indexer(pairs["ETYS_Node"]))),
+        shape=(len(gsps), len(nodes)),
+    )
+    row_sums = np.asarray(matrix.sum(axis=1)).ravel()
+    allocated = row_sums > 0
+    if not np.allclose(row_sums[allocated], 1.0, rtol=0, atol=CONSERVATION_TOLERANCE):
+        raise ValueError("Demand allocation weights do not sum to 1 for every GSP.")
+    split = np.diff(matrix.indptr) > 1
+    logger.info(f"Demand allocation ({mode}): {int(allocated.sum())} of {len(gsps)} GSPs allocated, "
+                f"{int(split.sum())} split across several nodes.")
+    return DemandAllocation(gsps, nodes, matrix)
+
+
+def allocate_demand(demand_df: pd.DataFrame, allocation: DemandAllocation) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Distribute demand onto nodes: node demand = W^T D for the GSP x type demand matrix D.
+
+    :param demand_df: Demand data with GSP, type and value columns.
+    :param allocation: Result of build_demand_allocation for the demand GSPs.
+    :return: Tuple of (DataFrame with ETYS_Node, type and value columns, one row per node and type with demand;
+        demand rows of GSPs without any candidate node).
+    """
+    values = pd.to_numeric(demand_df["value"], errors="coerce").fillna(0.0)
+    by_gsp = values.groupby([demand_df["GSP"].astype(str), demand_df["type"]]).sum().unstack("type", fill_value=0.0)
+    by_gsp = by_gsp.reindex(allocation.gsps, fill_value=0.0)
+    node_values = allocation.matrix.T @ by_gsp.to_numpy()
+    node_demand = pd.DataFrame(node_values, index=pd.Index(allocation.nodes, name="ETYS_Node"),
+                               columns=by_gsp.columns).stack().rename("value").reset_index()
+    node_demand = node_demand[node_demand["value"] != 0].reset_index(drop=True)
+
+    allocated_gsps = allocation.gsps[np.asarray(allocation.matrix.sum(axis=1)).ravel() > 0]
+    unallocated = demand_df[~demand_df["GSP"].astype(str).isin(allocated_gsps)]
+    total, allocated_total = values.sum(), node_demand["value"].sum()
+    unallocated_total = values[unallocated.index].sum() if not unallocated.empty else 0.0
+    if not np.isclose(allocated_total + unallocated_total, total):
+        raise ValueError(f"Demand allocation lost demand: {total:.3f} MW in, {allocated_total:.3f} MW allocated, "
+                         f"{unallocated_total:.3f} MW unallocated.")
+    return node_demand, unallocated
+
+
+def build_run_demand_allocation(demand_df: pd.DataFrame, nodes_df: pd.DataFrame, transformer_df: pd.DataFrame,
+                                run_config) -> Optional[DemandAllocation]:
+    """
+    Build the demand allocation selected by run_config.demand_allocation.
+
+    :param demand_df: Demand data with a GSP column.
+    :param nodes_df: DataFrame containing network node data with a 'Node' column (all_nodes_df).
+    :param transformer_df: Filtered transformer data (used by TRANSFORMER_RATING).
+    :param run_config: Run configuration.
+    :return: The DemandAllocation, or None for FIRST_NODE (demand stays on its ETYS_Node).
+    """
+    mode = run_config.demand_allocation
+    if mode == FIRST_NODE or demand_df.empty or "GSP" not in demand_df.columns or "Node" not in nodes_df.columns:
+        return None
+    weights_df = None
+    if mode == CONFIGURED_WEIGHTS:
+        if not run_config.demand_allocation_weights_file_path:
+            raise ValueError("Demand allocation 'weights' requires demand_allocation_weights_file_path.")
+        weights_df = read_allocation_weights(run_config.demand_allocation_weights_file_path)
+    gsps = demand_df["GSP"].dropna().astype(str)
+    return build_demand_allocation(pd.Index(gsps[gsps != ""]), nodes_df, mode, transformer_df, weights_df)
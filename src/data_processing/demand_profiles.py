@@ -0,0 +1,229 @@
+"""
+Expands the nodal peak demand into hourly nodal demand time series.
+
+The filtered FES demand (one peak MW value per GSP and type, after ETYS_Node assignment and the optional demand
+allocation) is summed per node and type and multiplied by normalised per-type profiles:
+
+    demand[node, hour, type] = peak[node, type] * profile[hour, type]
+
+The profiles file is a CSV with one row per hour (8760 or 8784) and one column per FES demand type (R, E, C, ...);
+each column is scaled so that its largest absolute value is 1. Columns that are not demand types (e.g. a timestamp)
+are ignored, except that the first one is kept as the hour labels.
+
+A year of whole-GB demand does not need to fit in memory: the node x hour x type float32 array is computed and
+written in blocks of nodes, each block as its own .npy chunk next to an index.json holding the nodes, types, hour
+labels and chunk layout. open_hourly_demand memory-maps the chunks, so a node's series or the GB total per hour is
+read without loading the other chunks.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Iterator, List, Optional, Tuple
+from src.config import CONSIDER_DEMAND_TYPES, DEMAND_PROFILES_FILE_PATH, HOURLY_DEMAND_BLOCK_NODES, RunConfig
+from src.data_processing.demand_allocation import DemandAllocation, allocate_demand
+from src.data_processing.output_files import atomic_directory
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+CHUNK_FILE = "chunk_{number:05d}.npy"
+DTYPE = "float32"
+
+
+def read_demand_profiles(file_path: str = DEMAND_PROFILES_FILE_PATH,
+                         demand_types: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read and normalise per-type hourly demand profiles.
+
+    :param file_path: CSV with one row per hour and one column per demand type.
+    :param demand_types: Types whose profiles are required (all type columns of the file if None).
+    :return: DataFrame of hours x types, each column scaled to a peak absolute value of 1, indexed by the hour
+        labels (the first non-type column, or 0..n-1).
+    :raises ValueError: If a required type has no profile column.
+    """
+    from src.data_processing.cache import read_csv_cached
+    raw = read_csv_cached(file_path)
+    known_types = set(demand_types or CONSIDER_DEMAND_TYPES)
+    type_columns = [col for col in raw.columns if str(col).strip() in known_types]
+    missing = sorted(known_types - {str(col).strip() for col in type_columns}) if demand_types else []
+    if missing:
+        raise ValueError(f"Demand profiles file {file_path} has no profile for demand types {missing}.")
+    label_columns = [col for col in raw.columns if col not in type_columns]
+    profiles = raw[type_columns].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    profiles.columns = [str(col).strip() for col in type_columns]
+    profiles.index = pd.Index(raw[label_columns[0]].astype(str) if label_columns else raw.index.astype(str),
+                              name="Hour")
+    peak = profiles.abs().max()
+    flat = peak <= 0
+    if flat.any():
+        logger.warning(f"⚠️ Demand profiles for types {list(peak.index[flat])} are all zero.")
+    profiles = profiles / peak.where(~flat, 1.0)
+    logger.info(f"Read {len(profiles.columns)} demand profiles with {len(profiles)} hours from {file_path}.")
+    return profiles
+
+
+def nodal_peak_demand(demand_df: pd.DataFrame, demand_allocation: Optional[DemandAllocation] = None) -> pd.DataFrame:
+    """
+    Sum the peak demand per node and type.
+
+    :param demand_df: Demand data with ETYS_Node, type and value columns.
+    :param demand_allocation: Optional GSP x node allocation (see demand_allocation).
+    :return: DataFrame of nodes x types (MW), nodes with any demand only; demand without a node is dropped with a
+        warning.
+    """
+    if demand_allocation is not None and not demand_df.empty:
+        demand_df, unallocated = allocate_demand(demand_df, demand_allocation)
+        unmatched_mw = pd.to_numeric(unallocated["value"], errors="coerce").sum()
+    else:
+        unmatched_mw = pd.to_numeric(demand_df.loc[demand_df["ETYS_Node"].isna(), "value"], errors="coerce").sum()
+        demand_df = demand_df[demand_df["ETYS_Node"].notna()]
+    if unmatched_mw:
+        logger.warning(f"⚠️ {unmatched_mw:.1f} MW of demand has no ETYS node and is left out of the hourly demand.")
+    values = pd.to_numeric(demand_df["value"], errors="coerce").fillna(0.0)
+    peak = values.groupby([demand_df["ETYS_Node"].astype(str), demand_df["type"].astype(str)]).sum()
+    return peak.unstack("type", fill_value=0.0).rename_axis(index="ETYS_Node", columns=None)
+
+
+def _node_blocks(n_nodes: int, block_nodes: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, n_nodes, block_nodes):
+        yield start, min(start + block_nodes, n_nodes)
+
+
+def write_hourly_demand(peak_df: pd.DataFrame, profiles: pd.DataFrame, output_dir: str,
+                        block_nodes: int = HOURLY_DEMAND_BLOCK_NODES) -> str:
+    """
+    Compute the node x hour x type demand block by block and write it as memory-mappable chunks.
+
+    :param peak_df: Nodes x types peak demand (MW), see nodal_peak_demand.
+    :param profiles: Hours x types normalised profiles, see read_demand_profiles.
+    :param output_dir: Directory to write (replaced atomically if it exists).
+    :param block_nodes: Nodes per chunk.
+    :return: output_dir.
+    """
+    types = [t for t in peak_df.columns if t in profiles.columns]
+    missing = [t for t in peak_df.columns if t not in profiles.columns]
+    if missing:
+        raise ValueError(f"No demand profile for demand types {missing}.")
+    peak = peak_df[types].to_numpy(dtype=DTYPE)
+    shape = profiles[types].to_numpy(dtype=DTYPE)
+    n_nodes, n_hours = len(peak_df), len(profiles)
+    chunks = []
+    with atomic_directory(output_dir) as temporary:
+        for number, (start, stop) in enumerate(_node_blocks(n_nodes, block_nodes)):
+            name = CHUNK_FILE.format(number=number)
+            block = np.lib.format.open_memmap(os.path.join(temporary, name), mode="w+", dtype=DTYPE,
+                                              shape=(stop - start, n_hours, len(types)))
+            np.multiply(peak[start:stop, None, :], shape[None, :, :], out=block)
+            block.flush()
+            del block
+            chunks.append({"file": name, "start": start, "stop": stop})
+        index = {
+            "nodes": [str(node) for node in peak_df.index],
+            "types": types,
+            "hours": [str(hour) for hour in profiles.index],
+            "dtype": DTYPE,
+            "units": "MW",
+            "chunks": chunks,
+        }
+        with open(os.path.join(temporary, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+    size_mb = n_nodes * n_hours * len(types) * np.dtype(DTYPE).itemsize / 1e6
+    logger.info(f"Hourly demand for {n_nodes} nodes x {n_hours} hours x {len(types)} types ({size_mb:.0f} MB, "
+                f"{len(chunks)} chunks) saved to {output_dir}.")
+    return output_dir
+
+
+class HourlyDemand:
+    """
+    Read access to hourly demand written by write_hourly_demand; chunks are memory-mapped when read.
+
+    :param path: Directory written by write_hourly_demand.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        self.nodes = pd.Index(index["nodes"], name="ETYS_Node")
+        self.types = pd.Index(index["types"], name="type")
+        self.hours = pd.Index(index["hours"], name="Hour")
+        self.chunks = index["chunks"]
+        self._chunk_starts = np.array([chunk["start"] for chunk in self.chunks], dtype=int)
+
+    def chunk(self, number: int) -> np.ndarray:
+        """
+        Memory-map one chunk.
+
+        :param number: Chunk number.
+        :return: Read-only array of (chunk nodes) x hours x types.
+        """
+        return np.load(os.path.join(self.path, self.chunks[number]["file"]), mmap_mode="r")
+
+    def iter_chunks(self) -> Iterator[Tuple[pd.Index, np.ndarray]]:
+        """Yield (nodes, array) for every chunk in node order."""
+        for number, chunk in enumerate(self.chunks):
+            yield self.nodes[chunk["start"]:chunk["stop"]], self.chunk(number)
+
+    def node(self, node: str) -> pd.DataFrame:
+        """
+        Return the hourly demand of one node.
+
+        :param node: ETYS node name.
+        :return: DataFrame of hours x types (MW).
+        """
+        position = self.nodes.get_loc(node)
+        number = int(np.searchsorted(self._chunk_starts, position, side="right") - 1)
+        values = self.chunk(number)[position - self.chunks[number]["start"]]
+        return pd.DataFrame(np.array(values), index=self.hours, columns=self.types)
+
+    def total_by_hour(self) -> pd.DataFrame:
+        """
+        Return the demand summed over all nodes, reading one chunk at a time.
+
+        :return: DataFrame of hours x types (MW).
+        """
+        total = np.zeros((len(self.hours), len(self.types)), dtype="float64")
+        for _, values in self.iter_chunks():
+            total += values.sum(axis=0, dtype="float64")
+        return pd.DataFrame(total, index=self.hours, columns=self.types)
+
+
+def open_hourly_demand(path: str) -> HourlyDemand:
+    """
+    Open hourly demand written by write_hourly_demand.
+
+    :param path: Output directory.
+    :return: The HourlyDemand reader.
+    """
+    return HourlyDemand(path)
+
+
+def build_hourly_demand(run_config: RunConfig, profiles_file_path: str = DEMAND_PROFILES_FILE_PATH,
+                        block_nodes: int = HOURLY_DEMAND_BLOCK_NODES) -> str:
+    """
+    Run the demand (and network) stages for a configuration and write its hourly nodal demand.
+
+    :param run_config: Run configuration (demand allocation included).
+    :param profiles_file_path: Demand profiles CSV.
+    :param block_nodes: Nodes per chunk.
+    :return: Output directory (<run output dir>/HOURLY_DEMAND_<date>).
+    """
+    from src.data_processing.demand_allocation import build_run_demand_allocation
+    from src.data_processing.load_data import load_demand_data
+    from src.data_processing.network_data import get_network_data
+    demand_df = load_demand_data(run_config)
+    network_data_dict = get_network_data(run_config)
+    demand_allocation = build_run_demand_allocation(
+        demand_df, network_data_dict.get('all_nodes_df', pd.DataFrame()),
+        network_data_dict.get('transformer_data_filtered', pd.DataFrame()), run_config,
+    )
+    peak_df = nodal_peak_demand(demand_df, demand_allocation)
+    profiles = read_demand_profiles(profiles_file_path, list(peak_df.columns))
+    return write_hourly_demand(peak_df, profiles, run_config.output_path("HOURLY_DEMAND"), block_nodes)
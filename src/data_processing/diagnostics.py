@@ -0,0 +1,93 @@
+"""
+Collects data quality issues found while processing as structured rows instead of one log line per row.
+
+Stages record issues for whole columns at once (e.g. every project without an ETYS node match) with a category,
+source, project, node and capacity. Only a per-category summary is logged; the full table is written with the
+other outputs (Diagnostics sheet / diagnostics table).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+DIAGNOSTIC_COLUMNS: List[str] = [
+    "Category", "Source", "Project Number", "Project", "Node_Name", "ETYS_Node", "Capacity (MW)", "Detail"
+]
+
+# Issue categories.
+NO_NODE_MATCH = "No ETYS node match"
+HIGH_CAPACITY_LOW_VOLTAGE = "High-capacity plant on node below 275kV"
+
+
+class Diagnostics:
+    """
+    Accumulates diagnostic rows for one pipeline run.
+    """
+
+    def __init__(self):
+        self._parts: List[pd.DataFrame] = []
+
+    def record(self, category: str, source: str, project_number=None, project=None, node_name=None, node=None,
+               capacity=None, detail=None) -> None:
+        """
+        Record one issue per row of the given Series (scalars apply to every row).
+
+        All Series must have the same length. If none of the values is a Series a single row is recorded;
+        empty Series record nothing.
+
+        :param category: Issue category (see the module constants).
+        :param source: Input the rows come from, e.g. "TEC Register".
+        :param project_number: Project Number(s).
+        :param project: Project name(s).
+        :param node_name: Lookup key(s) from the mapping file.
+        :param node: Assigned ETYS node(s).
+        :param capacity: Capacity (MW).
+        :param detail: Free-text detail.
+        """
+        values = dict(zip(DIAGNOSTIC_COLUMNS, (category, source, project_number, project, node_name, node,
+                                               capacity, detail)))
+        series = [value for value in values.values() if isinstance(value, pd.Series)]
+        n_rows = len(series[0]) if series else 1
+        if n_rows:
+            values = {key: value.to_numpy() if isinstance(value, pd.Series) else value for key, value in values.items()}
+            self._parts.append(pd.DataFrame(values, index=pd.RangeIndex(n_rows), columns=DIAGNOSTIC_COLUMNS))
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    def table(self) -> pd.DataFrame:
+        """
+        Return all recorded issues.
+
+        :return: DataFrame with the DIAGNOSTIC_COLUMNS.
+        """
+        if not self._parts:
+            return pd.DataFrame(columns=DIAGNOSTIC_COLUMNS)
+        return pd.concat(self._parts, ignore_index=True)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Count issues (and sum their capacity) per category and source.
+
+        :return: DataFrame with Category, Source, Count and Capacity (MW) columns.
+        """
+        table = self.table()
+        table["Capacity (MW)"] = pd.to_numeric(table["Capacity (MW)"], errors="coerce")
+        return (
+            table.groupby(["Category", "Source"], sort=False)
+            .agg(Count=("Category", "size"), **{"Capacity (MW)": ("Capacity (MW)", "sum")})
+            .reset_index()
+        )
+
+    def log_summary(self) -> None:
+        """Log one warning per category and source."""
+        for row in self.summary().itertuples(index=False):
+            logger.warning(f"⚠️ {row.Category}: {row.Count} {row.Source} rows ({row[3]:.1f} MW).")
+        if len(self):
+            logger.info(f"{len(self)} diagnostic rows recorded (see the Diagnostics output for details).")
@@ -0,0 +1,297 @@
+"""
+Interchangeable engines for reading worksheets from an .xlsx workbook into DataFrames.
+
+- "openpyxl": pandas.read_excel with its default openpyxl engine.
+- "calamine": pandas.read_excel with the Rust calamine engine (requires python-calamine).
+- "streaming": reads the cell values straight from the worksheet XML, skipping the stylesheet, which openpyxl
+  parses in full before any cell is read (several seconds for the ETYS Appendix B workbook, whose styles.xml holds
+  thousands of named styles). Cells are converted exactly as openpyxl and pandas convert them (shared/inline
+  strings, int/float numbers, date-formatted numbers as datetimes, errors as NaN) and the rows are parsed by the
+  same pandas TextParser as read_excel, so the DataFrames are identical to the "openpyxl" engine.
+
+Select an engine with get_excel_reader(name); validation/excel_reader_benchmark.py times the engines and checks
+that they produce identical DataFrames.
+"""
+
+from __future__ import annotations
+
+import logging
+import posixpath
+import zipfile
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_WORKSHEET_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+class ExcelReader(ABC):
+    """
+    Reads worksheets of an .xlsx workbook into DataFrames, as pandas.read_excel(file_path, sheet_name, header).
+    """
+
+    name = ""
+
+    @abstractmethod
+    def read_sheets(self, file_path: str, sheet_names: Optional[List[str]] = None,
+                    header: int = 0) -> Dict[str, pd.DataFrame]:
+        """
+        Read worksheets into DataFrames.
+
+        :param file_path: Path to the workbook.
+        :param sheet_names: Sheets to read, or None for every worksheet.
+        :param header: Row (0-based) holding the column names.
+        :return: Dictionary of sheet name to DataFrame, in workbook order (or the order of sheet_names).
+        """
+
+
+class PandasExcelReader(ExcelReader):
+    """
+    Reads worksheets with pandas.ExcelFile and the given pandas engine.
+
+    :param engine: pandas Excel engine, e.g. "openpyxl" or "calamine".
+    """
+
+    def __init__(self, engine: str):
+        self.name = engine
+
+    def read_sheets(self, file_path: str, sheet_names: Optional[List[str]] = None,
+                    header: int = 0) -> Dict[str, pd.DataFrame]:
+        with pd.ExcelFile(file_path, engine=self.name) as xls:
+            return {sheet: xls.parse(sheet, header=header) for sheet in (sheet_names or xls.sheet_names)}
+
+
+class CalamineExcelReader(PandasExcelReader):
+    """Reads worksheets with pandas' calamine engine (requires python-calamine)."""
+
+    def __init__(self):
+        super().__init__("calamine")
+
+    def read_sheets(self, file_path: str, sheet_names: Optional[List[str]] = None,
+                    header: int = 0) -> Dict[str, pd.DataFrame]:
+        try:
+            import python_calamine  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The calamine Excel reader requires python-calamine; install it with `pip install python-calamine`."
+            ) from e
+        return super().read_sheets(file_path, sheet_names, header)
+
+
+class StreamingExcelReader(ExcelReader):
+    """Reads cell values from the worksheet XML without loading the workbook styles (see the module docstring)."""
+
+    name = "streaming"
+
+    def read_sheets(self, file_path: str, sheet_names: Optional[List[str]] = None,
+                    header: int = 0) -> Dict[str, pd.DataFrame]:
+        with zipfile.ZipFile(file_path) as archive:
+            sheet_paths, date1904 = _workbook_sheets(archive)
+            if sheet_names is None:
+                sheet_names = list(sheet_paths)
+            missing = [sheet for sheet in sheet_names if sheet not in sheet_paths]
+            if missing:
+                raise ValueError(f"Worksheet(s) {missing} not found in {file_path}.")
+            shared_strings = _shared_strings(archive)
+            date_styles, timedelta_styles = _date_styles(archive)
+            epoch = _epoch(date1904)
+            return {
+                sheet: _frame_from_rows(
+                    _sheet_rows(archive, sheet_paths[sheet], shared_strings, date_styles, timedelta_styles, epoch),
+                    header,
+                )
+                for sheet in sheet_names
+            }
+
+
+EXCEL_READERS: Dict[str, ExcelReader] = {
+    "openpyxl": PandasExcelReader("openpyxl"),
+    "calamine": CalamineExcelReader(),
+    "streaming": StreamingExcelReader(),
+}
+
+
+def get_excel_reader(name: str) -> ExcelReader:
+    """
+    Return the Excel reader engine with the given name.
+
+    :param name: One of the EXCEL_READERS keys.
+    :return: The reader.
+    """
+    try:
+        return EXCEL_READERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown Excel reader {name!r}; expected one of {sorted(EXCEL_READERS)}.") from None
+
+
+# ============================================================================
+# Streaming reader internals
+# ============================================================================
+
+def _workbook_sheets(archive: zipfile.ZipFile) -> Tuple[Dict[str, str], bool]:
+    """Return the worksheet name -> archive path map (workbook order) and whether the 1904 date system is used."""
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{_PACKAGE_REL_NS}Relationship") if rel.get("Type") == _WORKSHEET_REL_TYPE
+    }
+    sheet_paths = {}
+    for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+        target = targets.get(sheet.get(f"{_REL_NS}id"))
+        if target is None:  # Chartsheets and other non-worksheet parts.
+            continue
+        sheet_paths[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else \
+            posixpath.normpath(posixpath.join("xl", target))
+    properties = workbook.find(f"{_MAIN_NS}workbookPr")
+    date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+    return sheet_paths, date1904
+
+
+def _epoch(date1904: bool):
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+    return CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+
+def _text_content(node) -> str:
+    """Text of a shared or inline string: the plain <t> plus the <t> of every rich text run (as openpyxl)."""
+    snippets = []
+    plain = node.find(f"{_MAIN_NS}t")
+    if plain is not None and plain.text is not None:
+        snippets.append(plain.text)
+    for run in node.findall(f"{_MAIN_NS}r"):
+        text = run.find(f"{_MAIN_NS}t")
+        if text is not None and text.text is not None:
+            snippets.append(text.text)
+    return "".join(snippets)
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    try:
+        source = archive.read("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    root = ElementTree.fromstring(source)
+    return [_text_content(item).replace("x005F_", "") for item in root.iter(f"{_MAIN_NS}si")]
+
+
+def _date_styles(archive: zipfile.ZipFile) -> Tuple[Set[int], Set[int]]:
+    """Return the cell style indices (the s attribute of a cell) with a date and with a timedelta number format."""
+    from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+    try:
+        root = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    except KeyError:
+        return set(), set()
+    custom = {
+        int(fmt.get("numFmtId")): fmt.get("formatCode")
+        for fmt in root.iterfind(f"{_MAIN_NS}numFmts/{_MAIN_NS}numFmt")
+    }
+    date_styles, timedelta_styles = set(), set()
+    for index, xf in enumerate(root.iterfind(f"{_MAIN_NS}cellXfs/{_MAIN_NS}xf")):
+        number_format_id = int(xf.get("numFmtId", 0))
+        fmt = custom[number_format_id] if number_format_id in custom else builtin_format_code(number_format_id)
+        if is_date_format(fmt):
+            date_styles.add(index)
+        if is_timedelta_format(fmt):
+            timedelta_styles.add(index)
+    return date_styles, timedelta_styles
+
+
+def _column_index(reference: str) -> int:
+    """1-based column of a cell reference such as "AB12"."""
+    column = 0
+    for char in reference:
+        if char.isdigit():
+            break
+        column = column * 26 + ord(char.upper()) - 64
+    return column
+
+
+def _cell_value(cell, shared_strings: List[str], date_styles: Set[int], timedelta_styles: Set[int], epoch):
+    """Convert one <c> element the way openpyxl (read-only, values only) and pandas' openpyxl reader do."""
+    data_type = cell.get("t", "n")
+    if data_type == "inlineStr":
+        inline = cell.find(f"{_MAIN_NS}is")
+        return "" if inline is None else _text_content(inline)
+    value = cell.findtext(f"{_MAIN_NS}v") or None
+    if value is None:
+        return ""
+    if data_type == "n":
+        number = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+        style = int(cell.get("s") or 0)
+        if style in date_styles:
+            from openpyxl.utils.datetime import from_excel
+            try:
+                return from_excel(number, epoch, timedelta=style in timedelta_styles)
+            except (OverflowError, ValueError):
+                return np.nan
+        integer = int(number)
+        return integer if integer == number else float(number)
+    if data_type == "s":
+        return shared_strings[int(value)]
+    if data_type == "b":
+        return bool(int(value))
+    if data_type == "e":
+        return np.nan
+    if data_type == "d":
+        from openpyxl.utils.datetime import from_ISO8601
+        return from_ISO8601(value)
+    return value  # "str": cached formula result.
+
+
+def _sheet_rows(archive: zipfile.ZipFile, path: str, shared_strings: List[str], date_styles: Set[int],
+                timedelta_styles: Set[int], epoch) -> List[list]:
+    """
+    Return the cell values of a worksheet as pandas' openpyxl reader builds them: one list per row (missing rows
+    and cells as ""), trailing empty cells and rows removed and every row padded to the widest row.
+    """
+    rows: List[list] = []
+    last_row_with_data = -1
+    row_number = 0
+    with archive.open(path) as source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag != f"{_MAIN_NS}row":
+                continue
+            row_number = int(float(element.get("r"))) if element.get("r") else row_number + 1
+            while len(rows) < row_number - 1:  # Rows missing from the XML.
+                rows.append([])
+            values: list = []
+            column = 0
+            for cell in element.iterfind(f"{_MAIN_NS}c"):
+                reference = cell.get("r")
+                column = _column_index(reference) if reference else column + 1
+                if column > len(values):
+                    values.extend([""] * (column - len(values)))
+                values[column - 1] = _cell_value(cell, shared_strings, date_styles, timedelta_styles, epoch)
+            while values and values[-1] == "":
+                values.pop()
+            if values:
+                last_row_with_data = len(rows)
+            rows.append(values)
+            element.clear()
+    rows = rows[:last_row_with_data + 1]
+    if rows:
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+    return rows
+
+
+def _frame_from_rows(rows: List[list], header: int) -> pd.DataFrame:
+    """Parse cell rows into a DataFrame with the same TextParser call as pandas.read_excel."""
+    from pandas.errors import EmptyDataError
+    from pandas.io.parsers import TextParser
+    if not rows:
+        return pd.DataFrame()
+    try:
+        return TextParser(rows, header=header, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
@@ -0,0 +1,239 @@
+"""
+Geospatial export of the collated network for GIS tools.
+
+Two layers are built from the collated outputs:
+  - nodes: one point per network node at its site coordinates (see network_data.add_coordinates_and_site_name_to_nodes)
+    with site name, TO and voltage;
+  - branches: one straight line per circuit, transformer and Intra HVDC link from the Node 1 to the Node 2
+    coordinates, with type, TO and voltage of both ends, ratings, length, year and status.
+The end coordinates are joined onto the branch tables with one reindex per end. Features whose coordinates are
+unknown keep their attributes with a null geometry, and the nodes without coordinates are listed (with the number of
+branch ends at each) in missing_coordinates.csv.
+
+Formats (written together into FULL_GRID_<date>/geo):
+  - "geojson": nodes.geojson and branches.geojson (FeatureCollections, WGS84 longitude/latitude);
+  - "geoparquet": nodes.parquet and branches.parquet with the geometry stored as WKB in a 'geometry' column and the
+    GeoParquet 1.0.0 'geo' file metadata, so GeoPandas, GDAL and DuckDB read them as spatial tables. Requires
+    pyarrow (optional dependency: `pip install pyarrow`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+from src.data_processing.output_files import atomic_directory, require_pyarrow
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+GEO_FORMATS = ("geojson", "geoparquet")
+MISSING_COORDINATES_FILE = "missing_coordinates.csv"
+
+CIRCUIT_LAYER = "Circuit"
+TRANSFORMER_LAYER = "Transformer"
+HVDC_LAYER = "HVDC"
+
+NODE_COLUMNS: List[str] = ["Node", "Site Name", "Relevant TO", "Voltage (kV)", "Sheet Names", "latitude", "longitude"]
+BRANCH_COLUMNS: List[str] = [
+    "Layer", "Node 1", "Node 2", "Name", "Type", "Sheet_Name", "Node 1 Relevant TO", "Node 2 Relevant TO",
+    "Node 1 Voltage (kV)", "Node 2 Voltage (kV)", "Winter Rating (MVA)", "Summer Rating (MVA)", "Length (km)",
+    "Year", "Status",
+]
+MISSING_COORDINATE_COLUMNS: List[str] = ["Node", "Site Code", "Relevant TO", "Voltage (kV)", "Branch Ends"]
+
+# WKB records (little endian) of a point and of a two-point line string.
+_WKB_POINT = [("order", "u1"), ("type", "<u4"), ("x", "<f8"), ("y", "<f8")]
+_WKB_LINE = [("order", "u1"), ("type", "<u4"), ("points", "<u4"),
+             ("x1", "<f8"), ("y1", "<f8"), ("x2", "<f8"), ("y2", "<f8")]
+
+
+@dataclass
+class GeoLayers:
+    """
+    Node and branch layers of the network.
+
+    :param nodes: Nodes with the NODE_COLUMNS.
+    :param node_xy: Longitude/latitude per node (NaN where unknown), aligned with nodes.
+    :param branches: Branches with the BRANCH_COLUMNS.
+    :param branch_xy: Longitude/latitude of Node 1 and Node 2 per branch (n x 4, NaN where unknown).
+    :param missing_coordinates: Nodes without coordinates with the MISSING_COORDINATE_COLUMNS.
+    """
+    nodes: pd.DataFrame
+    node_xy: np.ndarray
+    branches: pd.DataFrame
+    branch_xy: np.ndarray
+    missing_coordinates: pd.DataFrame
+
+
+def _numeric(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[name], errors="coerce")
+
+
+def _text(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+
+def _branch_table(df: pd.DataFrame, layer: str) -> pd.DataFrame:
+    """Map a circuit, transformer or HVDC table onto the common branch attributes (end attributes added later)."""
+    if layer == CIRCUIT_LAYER:
+        length = _numeric(df, "OHL Length (km)").fillna(0) + _numeric(df, "Cable Length (km)").fillna(0)
+        name, branch_type = _text(df, "Station"), _text(df, "Circuit Type")
+    elif layer == TRANSFORMER_LAYER:
+        length = pd.Series(np.nan, index=df.index)
+        name, branch_type = _text(df, "Site"), _text(df, "Transformer Type")
+    else:
+        length = _numeric(df, "Length (km)")
+        name, branch_type = _text(df, "Interconnector Name"), _text(df, "Converter Type")
+    return pd.DataFrame({
+        "Layer": layer,
+        "Node 1": df["Node 1"].astype(str).str.strip(),
+        "Node 2": df["Node 2"].astype(str).str.strip(),
+        "Name": name,
+        "Type": branch_type,
+        "Sheet_Name": _text(df, "Sheet_Name"),
+        "Winter Rating (MVA)": _numeric(df, "Winter Rating (MVA)"),
+        "Summer Rating (MVA)": _numeric(df, "Summer Rating (MVA)"),
+        "Length (km)": length,
+        "Year": _text(df, "Year"),
+        "Status": _text(df, "Status"),
+    }, index=df.index).reset_index(drop=True)
+
+
+def build_geo_layers(outputs: Dict[str, object]) -> GeoLayers:
+    """
+    Build the node and branch layers from the collated outputs.
+
+    :param outputs: Result of main.collate_outputs (network tables and hvdc_branches).
+    :return: The GeoLayers.
+    """
+    network = outputs.get("network", {})
+    all_nodes = network.get("all_nodes_df", pd.DataFrame())
+    nodes = pd.DataFrame({
+        "Node": all_nodes["Node"].astype(str).str.strip(),
+        "Site Name": _text(all_nodes, "Site Name"),
+        "Relevant TO": _text(all_nodes, "Relevant TO"),
+        "Voltage (kV)": _numeric(all_nodes, "Voltage (Derived)"),
+        "Sheet Names": _text(all_nodes, "Sheet Names"),
+        "latitude": _numeric(all_nodes, "latitude"),
+        "longitude": _numeric(all_nodes, "longitude"),
+    }, columns=NODE_COLUMNS).drop_duplicates("Node").reset_index(drop=True)
+    node_xy = nodes[["longitude", "latitude"]].to_numpy(dtype=float)
+
+    sources = [
+        (network.get("circuit_data_filtered", pd.DataFrame()), CIRCUIT_LAYER),
+        (network.get("transformer_data_filtered", pd.DataFrame()), TRANSFORMER_LAYER),
+        (outputs.get("hvdc_branches", pd.DataFrame()), HVDC_LAYER),
+    ]
+    tables = [_branch_table(df, layer) for df, layer in sources if not df.empty and "Node 1" in df.columns]
+    branches = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=BRANCH_COLUMNS)
+
+    by_node = nodes.set_index("Node")
+    ends = []
+    for end in ("Node 1", "Node 2"):
+        info = by_node.reindex(branches[end])
+        branches[f"{end} Relevant TO"] = info["Relevant TO"].to_numpy()
+        branches[f"{end} Voltage (kV)"] = info["Voltage (kV)"].to_numpy()
+        ends.append(info[["longitude", "latitude"]].to_numpy(dtype=float))
+    branches = branches[BRANCH_COLUMNS]
+    branch_xy = np.hstack(ends) if ends else np.empty((0, 4))
+
+    missing = nodes[np.isnan(node_xy).any(axis=1)]
+    branch_ends = pd.concat([branches["Node 1"], branches["Node 2"]]).value_counts()
+    missing_coordinates = pd.DataFrame({
+        "Node": missing["Node"],
+        "Site Code": missing["Node"].str[:4],
+        "Relevant TO": missing["Relevant TO"],
+        "Voltage (kV)": missing["Voltage (kV)"],
+        "Branch Ends": branch_ends.reindex(missing["Node"]).fillna(0).astype(int).to_numpy(),
+    }, columns=MISSING_COORDINATE_COLUMNS).sort_values(["Branch Ends", "Node"], ascending=[False, True],
+                                                       ignore_index=True)
+
+    without_geometry = int(np.isnan(branch_xy).any(axis=1).sum())
+    if len(missing_coordinates):
+        logger.warning(f"⚠️ Geospatial export: {len(missing_coordinates)} of {len(nodes)} nodes and "
+                       f"{without_geometry} of {len(branches)} branches have no coordinates (null geometry).")
+    return GeoLayers(nodes, node_xy, branches, branch_xy, missing_coordinates)
+
+
+def _valid(xy: np.ndarray) -> np.ndarray:
+    return ~np.isnan(xy).any(axis=1)
+
+
+def _geojson(df: pd.DataFrame, xy: np.ndarray, geometry_type: str) -> Dict[str, object]:
+    """Build a GeoJSON FeatureCollection from attribute rows and their coordinates (points or two-point lines)."""
+    properties = json.loads(df.to_json(orient="records", date_format="iso"))
+    coordinates = xy.reshape(len(xy), -1, 2).tolist() if geometry_type == "LineString" else xy.tolist()
+    features = [
+        {"type": "Feature",
+         "geometry": {"type": geometry_type, "coordinates": coords} if valid else None,
+         "properties": props}
+        for props, coords, valid in zip(properties, coordinates, _valid(xy))
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _wkb(xy: np.ndarray, geometry_type: str) -> List[object]:
+    """Encode points (n x 2) or two-point line strings (n x 4) as WKB; None where a coordinate is missing."""
+    if geometry_type == "Point":
+        records = np.zeros(len(xy), dtype=_WKB_POINT)
+        records["type"] = 1
+        fields = ["x", "y"]
+    else:
+        records = np.zeros(len(xy), dtype=_WKB_LINE)
+        records["type"], records["points"] = 2, 2
+        fields = ["x1", "y1", "x2", "y2"]
+    records["order"] = 1
+    for position, field in enumerate(fields):
+        records[field] = xy[:, position]
+    encoded = np.frombuffer(records.tobytes(), dtype=np.dtype((np.void, records.dtype.itemsize))).tolist()
+    return [geometry if valid else None for geometry, valid in zip(encoded, _valid(xy))]
+
+
+def _write_geoparquet(df: pd.DataFrame, xy: np.ndarray, geometry_type: str, path: str) -> None:
+    """Write attributes plus a WKB geometry column with GeoParquet 1.0.0 metadata."""
+    pyarrow = require_pyarrow("geoparquet")
+    mixed = [col for col in df.columns if df[col].dtype == object]
+    table = pyarrow.Table.from_pandas(df.astype({col: "string" for col in mixed}), preserve_index=False)
+    table = table.append_column("geometry", pyarrow.array(_wkb(xy, geometry_type), type=pyarrow.binary()))
+    valid = xy[_valid(xy)]
+    bbox = ([float(valid[:, 0::2].min()), float(valid[:, 1::2].min()),
+             float(valid[:, 0::2].max()), float(valid[:, 1::2].max())] if len(valid) else None)
+    geo = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": [geometry_type],
+                                 **({"bbox": bbox} if bbox else {})}},
+    }
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"geo": json.dumps(geo).encode()})
+    pyarrow.parquet.write_table(table, path)
+
+
+def write_geo_layers(layers: GeoLayers, output_dir: str, formats: Iterable[str] = GEO_FORMATS) -> None:
+    """
+    Write the layers in the given formats, and the nodes without coordinates, to a directory (replaced atomically).
+
+    :param layers: Result of build_geo_layers.
+    :param output_dir: Directory to write.
+    :param formats: Subset of GEO_FORMATS.
+    """
+    formats = [fmt for fmt in GEO_FORMATS if fmt in set(formats)]
+    if "geoparquet" in formats:
+        require_pyarrow("geoparquet")
+    with atomic_directory(output_dir) as temporary:
+        for name, df, xy, geometry_type in (("nodes", layers.nodes, layers.node_xy, "Point"),
+                                            ("branches", layers.branches, layers.branch_xy, "LineString")):
+            if "geojson" in formats:
+                with open(os.path.join(temporary, f"{name}.geojson"), "w", encoding="utf-8") as f:
+                    json.dump(_geojson(df, xy, geometry_type), f)
+            if "geoparquet" in formats:
+                _write_geoparquet(df, xy, geometry_type, os.path.join(temporary, f"{name}.parquet"))
+        layers.missing_coordinates.to_csv(os.path.join(temporary, MISSING_COORDINATES_FILE), index=False)
+    logger.info(f"Geospatial layers ({', '.join(formats)}) saved to {output_dir}.")
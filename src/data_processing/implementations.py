@@ -0,0 +1,89 @@
+"""
+Selects between the accelerated (default) and reference implementations of the pipeline hot paths, and times them.
+
+The reference implementations (see reference.py) are the original row-by-row versions of the status/year filter,
+node compile, ETYS node matching and capacity rules; the processing stages dispatch to them while
+use_implementation(REFERENCE) is active. The selection is held in a context variable, so it applies to the
+current thread only and concurrent runs (e.g. in the collation service) are unaffected.
+
+Stages wrapped in timed_stage add their duration to the recorder opened by record_stage_times, which is how the
+verification mode reports a per-stage speedup.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+ACCELERATED = "accelerated"
+REFERENCE = "reference"
+IMPLEMENTATIONS = (ACCELERATED, REFERENCE)
+
+_IMPLEMENTATION: ContextVar[str] = ContextVar("implementation", default=ACCELERATED)
+_STAGE_TIMES: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_times", default=None)
+# Stages may run in worker threads that share the caller's recorder.
+_STAGE_TIMES_LOCK = threading.Lock()
+
+
+def current_implementation() -> str:
+    """Return the implementation selected for the current context."""
+    return _IMPLEMENTATION.get()
+
+
+def use_reference() -> bool:
+    """Return True if the reference implementations are selected."""
+    return _IMPLEMENTATION.get() == REFERENCE
+
+
+@contextmanager
+def use_implementation(name: str) -> Iterator[None]:
+    """
+    Select an implementation for the duration of the block.
+
+    :param name: ACCELERATED or REFERENCE.
+    """
+    if name not in IMPLEMENTATIONS:
+        raise ValueError(f"Unknown implementation {name!r}; expected one of {IMPLEMENTATIONS}.")
+    token = _IMPLEMENTATION.set(name)
+    try:
+        yield
+    finally:
+        _IMPLEMENTATION.reset(token)
+
+
+@contextmanager
+def record_stage_times() -> Iterator[Dict[str, float]]:
+    """
+    Collect the time spent in each timed_stage during the block.
+
+    :return: Dictionary of stage name to accumulated seconds, filled in as the block runs.
+    """
+    times: Dict[str, float] = {}
+    token = _STAGE_TIMES.set(times)
+    try:
+        yield times
+    finally:
+        _STAGE_TIMES.reset(token)
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """
+    Add the duration of the block to the current stage time recorder (no-op outside record_stage_times).
+
+    :param name: Stage name.
+    """
+    times = _STAGE_TIMES.get()
+    if times is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _STAGE_TIMES_LOCK:
+            times[name] = times.get(name, 0.0) + elapsed
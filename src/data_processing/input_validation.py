@@ -0,0 +1,317 @@
+"""
+Schema and integrity checks for the pipeline inputs, run before any processing.
+
+Every check works on whole columns (isin / to_numeric / str.match / duplicated), so validating all inputs takes
+milliseconds once the files are loaded. Files are read through the same caches as the pipeline stages
+(read_csv_cached, parse_all_sheets), so validation does not add a second read of any input.
+
+The checks cover:
+  - required columns of the registers, mappings, demand, coordinates and ETYS network sheets
+  - numeric / date columns that contain values the pipeline would silently coerce to NaN
+  - duplicate keys, and the extra rows a duplicate Project Number in a mapping file adds to the register merge
+  - register projects with no mapping, unknown register / ETYS Status values and non-numeric ETYS years
+  - node names that do not start with a four character site code
+
+Issues are returned as a ValidationReport (one row per failed check, with counts and example values).
+Errors are problems that change or break the collated outputs; warnings are suspicious but tolerated values.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from src.config import SHEET_ASSOCIATIONS, RunConfig, default_run_config
+from src.data_processing.cache import read_csv_cached
+from src.data_processing.network_data import (
+    CIRCUIT_SHEETS, COLUMN_RENAME_MAP, REACTIVE_SHEETS, TRANSFORMER_SHEETS, parse_all_sheets
+)
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+ERROR = "error"
+WARNING = "warning"
+
+ISSUE_COLUMNS: List[str] = ["Source", "Check", "Severity", "Column", "Count", "Examples"]
+
+# Number of offending values listed per issue.
+MAX_EXAMPLES = 5
+
+# Node names (and mapping Node_Name values) start with a four character site code.
+SITE_CODE_PATTERN = r"^[A-Z0-9]{4}"
+
+ETYS_STATUSES = {"Addition", "Change", "Removed"}
+PROJECT_STATUSES = {"Scoping", "Awaiting Consents", "Consents Approved", "Under Construction/Commissioning", "Built"}
+
+TEC_REGISTER_COLUMNS: List[str] = [
+    "Project Name", "Project Number", "HOST TO", "Plant Type", "Project Status", "Stage", "MW Effective From",
+    "MW Connected", "MW Increase / Decrease", "Cumulative Total Capacity (MW)",
+]
+TEC_NUMERIC_COLUMNS: List[str] = [
+    "Stage", "MW Connected", "MW Increase / Decrease", "Cumulative Total Capacity (MW)",
+]
+IC_REGISTER_COLUMNS: List[str] = [
+    "Project Name", "Project Number", "HOST TO", "Project Status", "Stage", "MW Effective From",
+    "MW Import - Total", "MW Export - Total", "MW Import - Increase / Decrease", "MW Export - Increase / Decrease",
+]
+IC_NUMERIC_COLUMNS: List[str] = [
+    "Stage", "MW Import - Total", "MW Export - Total", "MW Import - Increase / Decrease",
+    "MW Export - Increase / Decrease",
+]
+MAPPING_COLUMNS: List[str] = ["Project Number", "Node_Name"]
+DEMAND_COLUMNS: List[str] = ["GSP", "scenario", "year", "type", "value"]
+COORDINATE_COLUMNS: List[str] = ["Site Code", "latitude", "longitude"]
+
+BRANCH_SHEET_COLUMNS: List[str] = ["Node 1", "Node 2"]
+REACTIVE_SHEET_COLUMNS: List[str] = ["Node"]
+# Node column of the reactive sheets that have no "Node" column (the OFTO change sheet B-4-2d).
+REACTIVE_SHEET_ALTERNATIVE_NODE = "Node 1"
+# Extra columns required on the change sheets (B-x-2x), which are filtered by Status and Year.
+CHANGE_SHEET_COLUMNS: List[str] = ["Year", "Status"]
+
+
+class InputValidationError(ValueError):
+    """Raised when input validation finds errors and the run is set to fail fast."""
+
+    def __init__(self, report: "ValidationReport"):
+        self.report = report
+        super().__init__(f"Input validation failed with {len(report.errors)} error(s):\n{report.summary(ERROR)}")
+
+
+@dataclass
+class ValidationReport:
+    """
+    Result of validate_inputs.
+
+    :param issues: One row per failed check with Source, Check, Severity, Column, Count and Examples columns.
+    :param sources: Names of the inputs that were checked.
+    """
+    issues: pd.DataFrame
+    sources: List[str]
+
+    @property
+    def errors(self) -> pd.DataFrame:
+        return self.issues[self.issues["Severity"] == ERROR]
+
+    @property
+    def warnings(self) -> pd.DataFrame:
+        return self.issues[self.issues["Severity"] == WARNING]
+
+    @property
+    def ok(self) -> bool:
+        """True if no errors were found (warnings are allowed)."""
+        return self.errors.empty
+
+    def summary(self, severity: Optional[str] = None) -> str:
+        """
+        Format the issues as one line each.
+
+        :param severity: Only include issues of this severity; all issues if None.
+        :return: Multi-line summary.
+        """
+        issues = self.issues if severity is None else self.issues[self.issues["Severity"] == severity]
+        return "\n".join(
+            f"[{row.Severity}] {row.Source}: {row.Check}"
+            + (f" ({row.Column})" if row.Column else "")
+            + f" - {row.Count} value(s), e.g. {row.Examples}"
+            for row in issues.itertuples(index=False)
+        )
+
+    def raise_for_errors(self) -> None:
+        """Raise InputValidationError if the report contains errors."""
+        if not self.ok:
+            raise InputValidationError(self)
+
+
+class _IssueCollector:
+    """Accumulates issue rows while the checks run."""
+
+    def __init__(self):
+        self.rows: List[Dict[str, object]] = []
+        self.sources: List[str] = []
+
+    def add(self, source: str, check: str, severity: str, column: str, values: Iterable) -> None:
+        values = pd.Series(list(values), dtype=object)
+        if values.empty:
+            return
+        examples = values.dropna().astype(str).drop_duplicates().head(MAX_EXAMPLES).tolist()
+        self.rows.append({
+            "Source": source, "Check": check, "Severity": severity, "Column": column,
+            "Count": len(values), "Examples": ", ".join(examples),
+        })
+
+    def report(self) -> ValidationReport:
+        return ValidationReport(pd.DataFrame(self.rows, columns=ISSUE_COLUMNS), self.sources)
+
+
+def _check_required(issues: _IssueCollector, source: str, df: pd.DataFrame, columns: List[str],
+                    severity: str = ERROR) -> bool:
+    """Record missing required columns; return True if all are present."""
+    missing = [col for col in columns if col not in df.columns]
+    issues.add(source, "missing required column", severity, "", missing)
+    return not missing
+
+
+def _check_numeric(issues: _IssueCollector, source: str, df: pd.DataFrame, columns: List[str],
+                   severity: str = WARNING) -> None:
+    """Record non-blank values that pd.to_numeric cannot convert."""
+    for col in columns:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        bad = pd.to_numeric(values, errors="coerce").isna() & values.notna()
+        issues.add(source, "non-numeric value", severity, col, values[bad])
+
+
+def _check_dates(issues: _IssueCollector, source: str, df: pd.DataFrame, column: str) -> None:
+    """Record non-blank values that pd.to_datetime cannot convert (as read by the plant stage)."""
+    if column not in df.columns:
+        return
+    values = df[column]
+    bad = pd.to_datetime(values, errors="coerce").isna() & values.notna()
+    issues.add(source, "unparseable date", WARNING, column, values[bad])
+
+
+def _check_site_codes(issues: _IssueCollector, source: str, values: pd.Series, column: str) -> None:
+    """Record names that do not start with a four character site code."""
+    values = values.dropna().astype(str)
+    issues.add(source, "node name fails site-code pattern", WARNING, column,
+               values[~values.str.match(SITE_CODE_PATTERN)])
+
+
+def _check_register(issues: _IssueCollector, source: str, register_df: pd.DataFrame,
+                    mapping_source: str, mapping_df: pd.DataFrame, required: List[str],
+                    numeric: List[str]) -> None:
+    """Check a TEC/IC register against its mapping file, including the row fan-out of their merge."""
+    issues.sources += [source, mapping_source]
+    register_ok = _check_required(issues, source, register_df, required)
+    mapping_ok = _check_required(issues, mapping_source, mapping_df, MAPPING_COLUMNS)
+    _check_numeric(issues, source, register_df, numeric)
+    _check_dates(issues, source, register_df, "MW Effective From")
+    if "Project Status" in register_df.columns:
+        status = register_df["Project Status"]
+        issues.add(source, "unknown Project Status", WARNING, "Project Status",
+                   status[status.notna() & ~status.isin(PROJECT_STATUSES)])
+
+    if "Project Number" in register_df.columns:
+        numbers = register_df["Project Number"]
+        issues.add(source, "duplicate key", WARNING, "Project Number", numbers[numbers.duplicated()])
+    if not mapping_ok:
+        return
+    mapping_numbers = mapping_df["Project Number"]
+    issues.add(mapping_source, "duplicate key", WARNING, "Project Number",
+               mapping_numbers[mapping_numbers.duplicated()])
+    _check_site_codes(issues, mapping_source, mapping_df["Node_Name"], "Node_Name")
+    if not register_ok:
+        return
+
+    # A left merge gives each register row one copy per matching mapping row.
+    matches = register_df["Project Number"].map(mapping_numbers.value_counts()).fillna(0)
+    fan_out = matches > 1
+    issues.add(source, "merge with mapping adds rows", ERROR, "Project Number",
+               register_df["Project Number"][fan_out].repeat((matches[fan_out] - 1).astype(int)))
+    issues.add(source, "project missing from mapping", WARNING, "Project Number",
+               register_df["Project Number"][matches == 0])
+
+
+def _check_demand(issues: _IssueCollector, demand_df: pd.DataFrame) -> None:
+    source = "Demand"
+    issues.sources.append(source)
+    _check_required(issues, source, demand_df, DEMAND_COLUMNS)
+    _check_numeric(issues, source, demand_df, ["year"], severity=ERROR)
+    _check_numeric(issues, source, demand_df, ["value"])
+
+
+def _check_coordinates(issues: _IssueCollector, coordinates_df: pd.DataFrame) -> None:
+    source = "Coordinates"
+    issues.sources.append(source)
+    if not _check_required(issues, source, coordinates_df, COORDINATE_COLUMNS, severity=WARNING):
+        return
+    codes = coordinates_df["Site Code"]
+    issues.add(source, "duplicate key", WARNING, "Site Code", codes[codes.duplicated()])
+    _check_numeric(issues, source, coordinates_df, ["latitude", "longitude"])
+
+
+def _check_network_sheets(issues: _IssueCollector, sheets: Dict[str, pd.DataFrame],
+                          selected_tags: Iterable[str]) -> None:
+    """Check the circuit, transformer and reactive sheets used for the selected TOs."""
+    selected_tags = set(selected_tags)
+    sheet_columns = {sheet: BRANCH_SHEET_COLUMNS for sheet in CIRCUIT_SHEETS + TRANSFORMER_SHEETS}
+    sheet_columns.update({sheet: REACTIVE_SHEET_COLUMNS for sheet in REACTIVE_SHEETS})
+    if not sheets:
+        issues.add("ETYS", "workbook could not be read", ERROR, "", ["no sheets"])
+        return
+
+    for sheet, node_columns in sheet_columns.items():
+        if SHEET_ASSOCIATIONS.get(sheet[-1]) not in selected_tags:
+            continue
+        source = f"ETYS {sheet}"
+        issues.sources.append(source)
+        if sheet not in sheets:
+            issues.add(source, "missing sheet", ERROR, "", [sheet])
+            continue
+        df = sheets[sheet]
+        if sheet in REACTIVE_SHEETS and "Node" not in df.columns and REACTIVE_SHEET_ALTERNATIVE_NODE in df.columns:
+            node_columns = [REACTIVE_SHEET_ALTERNATIVE_NODE]
+        is_change_sheet = sheet[4] == "2"
+        _check_required(issues, source, df, node_columns + (CHANGE_SHEET_COLUMNS if is_change_sheet else []))
+        for col in node_columns:
+            if col in df.columns:
+                _check_site_codes(issues, source, df[col], col)
+        if "Status" in df.columns:
+            status = df["Status"]
+            issues.add(source, "unknown Status", ERROR, "Status", status[status.notna() & ~status.isin(ETYS_STATUSES)])
+        _check_numeric(issues, source, df, ["Year"], severity=ERROR)
+
+
+def validate_inputs(run_config: Optional[RunConfig] = None, raise_on_error: bool = False) -> ValidationReport:
+    """
+    Validate every pipeline input for the given configuration.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
+    :param raise_on_error: Raise InputValidationError if any error is found.
+    :return: The ValidationReport.
+    """
+    run_config = run_config or default_run_config()
+    issues = _IssueCollector()
+
+    def read(source: str, path: str) -> Optional[pd.DataFrame]:
+        try:
+            return read_csv_cached(path)
+        except Exception as e:
+            issues.sources.append(source)
+            issues.add(source, "file could not be read", ERROR, "", [f"{path}: {e}"])
+            return None
+
+    tec_df = read("TEC register", run_config.tec_register_file_path)
+    tec_mapping_df = read("TEC mapping", run_config.tec_register_mapping_file_path)
+    if tec_df is not None and tec_mapping_df is not None:
+        _check_register(issues, "TEC register", tec_df, "TEC mapping", tec_mapping_df,
+                        TEC_REGISTER_COLUMNS, TEC_NUMERIC_COLUMNS)
+    ic_df = read("IC register", run_config.ic_register_file_path)
+    ic_mapping_df = read("IC mapping", run_config.ic_register_mapping_file_path)
+    if ic_df is not None and ic_mapping_df is not None:
+        _check_register(issues, "IC register", ic_df, "IC mapping", ic_mapping_df,
+                        IC_REGISTER_COLUMNS, IC_NUMERIC_COLUMNS)
+    demand_df = read("Demand", run_config.demand_file_path)
+    if demand_df is not None:
+        _check_demand(issues, demand_df)
+    coordinates_df = read("Coordinates", run_config.coordinates_file_path)
+    if coordinates_df is not None:
+        _check_coordinates(issues, coordinates_df)
+    network_sheets = parse_all_sheets(run_config.etysb_file_path, COLUMN_RENAME_MAP, run_config.excel_reader)
+    _check_network_sheets(issues, network_sheets, run_config.selected_tags)
+
+    report = issues.report()
+    n_errors, n_warnings = len(report.errors), len(report.warnings)
+    if report.issues.empty:
+        logger.info(f"Input validation passed for {len(report.sources)} inputs.")
+    else:
+        log = logger.warning if n_errors else logger.info
+        log(f"Input validation found {n_errors} error(s) and {n_warnings} warning(s):\n{report.summary()}")
+    if raise_on_error:
+        report.raise_for_errors()
+    return report
@@ -1,44 +1,124 @@
-import pandas as pd
+"""
+Intra HVDC links (ETYS Appendix B sheet B-5-1).
+
+The links are read from the parsed workbook shared with network_data (parse_all_sheets, so the workbook is not
+opened again) or, with intra_hvdc_source = "csv", from the internal HVDC CSV, whose columns are mapped onto the
+B-5-1 layout. Links planned after the year of analysis are dropped and Year/Status are derived column-wise.
+
+build_hvdc_branches attaches the links to the node list as DC branches: endpoint TO and voltage from all_nodes_df,
+rating, DC voltage and the reactive capability of the converter at each end. Endpoints that are not network nodes
+(e.g. "Central DC Substation" of a multi-terminal link) are flagged and recorded in the diagnostics.
+"""
+
+from __future__ import annotations
+
 import logging
-from src.config import YEAR_OF_ANALYSIS, ETYSB_FILE_PATH
+from typing import List, Optional
+from src.config import LOG_FORMAT, RunConfig, default_run_config
+from src.data_processing.diagnostics import Diagnostics
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+INTRA_HVDC_SHEET = "B-5-1"
+WORKBOOK_SOURCE = "workbook"
+CSV_SOURCE = "csv"
+
+HVDC_ENDPOINT_NOT_IN_NETWORK = "HVDC endpoint not in network"
+
+# Numeric B-5-1 columns copied to the DC branches.
+RATING_COLUMNS: List[str] = [
+    "Winter Rating (MVA)", "Spring Rating (MVA)", "Summer Rating (MVA)", "Autumn Rating (MVA)"
+]
+CONVERTER_COLUMNS: List[str] = ["Node 1 MVAr Gen", "Node 1 MVAr Abs", "Node 2 MVAr Gen", "Node 2 MVAr Abs"]
+
+HVDC_BRANCH_COLUMNS: List[str] = [
+    "Node 1", "Node 2", "Interconnector Name", "Branch Type", "Converter Type", "Year", "Status",
+    "Rated DC Voltage (kV)", "Length (km)", *RATING_COLUMNS, *CONVERTER_COLUMNS,
+    "Node 1 Relevant TO", "Node 2 Relevant TO", "Node 1 Voltage (Derived)", "Node 2 Voltage (Derived)",
+    "Node 1 In Network", "Node 2 In Network",
+]
+
 
 def filter_by_planned_year(df: pd.DataFrame, target_year: int) -> pd.DataFrame:
+    """
+    Keep the links that exist or are planned by the target year and add the Year and Status columns.
+
+    :param df: B-5-1 data with a 'Planned from year' column ("Existing" or a year).
+    :param target_year: Year of analysis.
+    :return: Filtered copy with Year (planned year, NaN for existing links) and Status ("Existing"/"Addition").
+    """
     if "Planned from year" not in df.columns:
         logger.warning("'Planned from year' column not found. Skipping year-based filtering.")
         return df
 
-    df["Planned from year"] = df["Planned from year"].astype(str)
-    df["Year"] = pd.to_numeric(df["Planned from year"], errors="coerce")
+    planned = df["Planned from year"].astype(str)
+    year = pd.to_numeric(planned, errors="coerce")
+    kept = (planned.str.lower() == "existing") | (year.notna() & (year <= target_year))
+    logger.info(
+        f"Filtered out {int((~kept).sum())} rows based on 'Planned from year' > {target_year} or not 'Existing'.")
 
-    condition_existing = df["Planned from year"].str.lower() == "existing"
-    condition_numeric = df["Year"].notna() & (df["Year"] <= target_year)
+    year = year[kept]
+    return df[kept].assign(**{
+        "Planned from year": planned[kept],
+        "Year": year,
+        "Status": np.where(year.notna(), "Addition", "Existing"),
+    })
 
-    before_filter = len(df)
-    df = df[condition_existing | condition_numeric].copy()
-    after_filter = len(df)
-    logger.info(
-        f"Filtered out {before_filter - after_filter} rows based on 'Planned from year' > {target_year} or not 'Existing'.")
 
-    df["Status"] = df["Year"].apply(lambda x: "Addition" if pd.notnull(x) else "Existing")
-    return df
+def read_intra_hvdc_sheet(run_config: RunConfig) -> pd.DataFrame:
+    """
+    Return sheet B-5-1 from the parsed workbook shared with the network stage.
+
+    :param run_config: Run configuration.
+    :return: B-5-1 data (empty if the sheet is missing).
+    """
+    from src.data_processing.network_data import COLUMN_RENAME_MAP, parse_all_sheets
+    sheets = parse_all_sheets(run_config.etysb_file_path, COLUMN_RENAME_MAP, run_config.excel_reader)
+    if INTRA_HVDC_SHEET not in sheets:
+        logger.warning(f"Sheet '{INTRA_HVDC_SHEET}' not found in {run_config.etysb_file_path}.")
+        return pd.DataFrame()
+    return sheets[INTRA_HVDC_SHEET]
+
+
+def read_intra_hvdc_csv(file_path: str) -> pd.DataFrame:
+    """
+    Read the internal HVDC CSV and map it onto the B-5-1 columns (Existing / Planned from year from Year).
+
+    :param file_path: Path to the CSV (a blank Year means the link exists).
+    :return: DataFrame with the B-5-1 columns.
+    """
+    from src.data_processing.cache import read_csv_cached
+    df = read_csv_cached(file_path, encoding="utf-8-sig")
+    df.columns = df.columns.astype(str).str.strip()
+    year = pd.to_numeric(df["Year"], errors="coerce")
+    planned = year.astype("Int64").astype(str).where(year.notna(), "Existing")
+    return df.drop(columns=["Year"]).assign(**{
+        "Existing": np.where(year.isna(), "Yes", "No"),
+        "Planned from year": planned,
+    })
 
 
-def process_intra_hvdc_data() -> pd.DataFrame:
+def process_intra_hvdc_data(run_config: Optional[RunConfig] = None) -> pd.DataFrame:
     """
-    Processes the Intra HVDC data by reading the specified sheet,
+    Processes the Intra HVDC data by reading sheet B-5-1 (or the CSV source),
     filtering rows, and adding 'Year' and 'Status' columns.
     Returns the processed DataFrame.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
     """
+    run_config = run_config or default_run_config()
     try:
-        logger.info(f"Reading sheet 'B-5-1' from {ETYSB_FILE_PATH}...")
-        df = pd.read_excel(ETYSB_FILE_PATH, sheet_name="B-5-1", header=1)
-        df.columns = df.columns.astype(str).str.strip()
-        df = filter_by_planned_year(df, YEAR_OF_ANALYSIS)
+        if run_config.intra_hvdc_source == CSV_SOURCE:
+            logger.info(f"Reading Intra HVDC data from {run_config.intra_hvdc_file_path}...")
+            df = read_intra_hvdc_csv(run_config.intra_hvdc_file_path)
+        else:
+            logger.info(f"Reading sheet '{INTRA_HVDC_SHEET}' from {run_config.etysb_file_path}...")
+            df = read_intra_hvdc_sheet(run_config)
+        df = filter_by_planned_year(df, run_config.year_of_analysis)
         logger.info("Successfully processed Intra HVDC data.")
         return df
     except Exception as e:
@@ -46,7 +126,66 @@ def process_intra_hvdc_data() -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def build_hvdc_branches(intra_hvdc_df: pd.DataFrame, nodes_df: pd.DataFrame,
+                        diagnostics: Optional[Diagnostics] = None) -> pd.DataFrame:
+    """
+    Attach the Intra HVDC links to the network nodes as DC branches.
+
+    :param intra_hvdc_df: Result of process_intra_hvdc_data.
+    :param nodes_df: DataFrame containing network node data (all_nodes_df).
+    :param diagnostics: Collector for endpoints that are not network nodes; if None, a warning is logged instead.
+    :return: DataFrame with the HVDC_BRANCH_COLUMNS, one row per link.
+    """
+    if intra_hvdc_df.empty or "Node 1" not in intra_hvdc_df.columns:
+        return pd.DataFrame(columns=HVDC_BRANCH_COLUMNS)
+
+    def numeric(name: str) -> pd.Series:
+        if name not in intra_hvdc_df.columns:
+            return pd.Series(np.nan, index=intra_hvdc_df.index)
+        return pd.to_numeric(intra_hvdc_df[name], errors="coerce")
+
+    links = intra_hvdc_df.reset_index(drop=True)
+    node_info = nodes_df.assign(Node=nodes_df["Node"].astype(str)).drop_duplicates("Node").set_index("Node") \
+        if "Node" in nodes_df.columns else pd.DataFrame()
+    rated_kv = links["Rated Voltage (kV)"].astype("string").str.extract(r"(\d+(?:\.\d+)?)")[0] \
+        if "Rated Voltage (kV)" in links.columns else pd.Series(None, index=links.index, dtype="string")
+    branches = pd.DataFrame({
+        "Node 1": links["Node 1"].astype(str).str.strip(),
+        "Node 2": links["Node 2"].astype(str).str.strip(),
+        "Interconnector Name": links.get("Interconnector Name"),
+        "Branch Type": "DC",
+        "Converter Type": links.get("Type"),
+        "Year": links.get("Year"),
+        "Status": links.get("Status"),
+        "Rated DC Voltage (kV)": pd.to_numeric(rated_kv, errors="coerce"),
+    })
+    branches["Length (km)"] = numeric("Length(km)").to_numpy()
+    for col in RATING_COLUMNS + CONVERTER_COLUMNS:
+        branches[col] = numeric(col).to_numpy()
+    for end in ("Node 1", "Node 2"):
+        info = node_info.reindex(branches[end]) if not node_info.empty else pd.DataFrame(index=branches[end])
+        for col in ("Relevant TO", "Voltage (Derived)"):
+            branches[f"{end} {col}"] = info[col].to_numpy() if col in info.columns else None
+        branches[f"{end} In Network"] = branches[end].isin(node_info.index).to_numpy()
+    branches = branches[HVDC_BRANCH_COLUMNS]
+
+    log_summary = diagnostics is None
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+    for end in ("Node 1", "Node 2"):
+        missing = branches[~branches[f"{end} In Network"]]
+        diagnostics.record(
+            HVDC_ENDPOINT_NOT_IN_NETWORK, "Intra HVDC", project=missing["Interconnector Name"],
+            node_name=missing[end], capacity=missing["Winter Rating (MVA)"], detail=f"{end} of the link",
+        )
+    if log_summary:
+        diagnostics.log_summary()
+    logger.info(f"{len(branches)} Intra HVDC links attached as DC branches.")
+    return branches
+
+
 # Retain the existing main if you still want to run this module standalone.
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     processed_df = process_intra_hvdc_data()
     # If desired, you can save the output here.
@@ -3,16 +3,20 @@ Processes demand data by sorting the FES workbook export file based on criteria
 Associates ETYS node name to each row.
 """
 
+from __future__ import annotations
+
 
-import os
-import pandas as pd
-from src import config
 import logging
+from src.config import LOG_FORMAT, RunConfig, default_run_config
 from src.data_processing.network_data import get_network_data
+from src.data_processing.cache import read_csv_cached
+from src.data_processing.node_attributes import resolve_etys_nodes
+from src.data_processing.output_files import atomic_path
 from typing import Optional
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
 
-# Configure logging per best practice.
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
@@ -29,41 +33,23 @@ def lookup_etys_node(gsp: Optional[str], nodes_df: pd.DataFrame) -> Optional[str
     """
     if not gsp:
         return None
-
-    # Exact match.
-    exact_matches = nodes_df[nodes_df["Node"] == gsp]
-    if not exact_matches.empty:
-        return exact_matches.iloc[0]["Node"]
-
-    # First 5 characters match.
-    gsp_str = str(gsp)
-    prefix5 = gsp_str[:5]
-    partial_matches5 = nodes_df[nodes_df["Node"].str[:5] == prefix5]
-    if not partial_matches5.empty:
-        return partial_matches5.iloc[0]["Node"]
-
-    # First 4 characters match.
-    prefix4 = gsp_str[:4]
-    partial_matches4 = nodes_df[nodes_df["Node"].str[:4] == prefix4]
-    if not partial_matches4.empty:
-        return partial_matches4.iloc[0]["Node"]
-
-    return None
+    return resolve_etys_nodes(pd.Series([gsp], dtype=object), nodes_df).iloc[0]
 
 
 def add_etys_node_to_demand(df: pd.DataFrame, nodes_df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds a new column 'ETYS_Node' to the demand DataFrame based on the 'GSP' column.
 
+    All GSPs are resolved at once against the shared node attribute table (see node_attributes).
+
     :param df: Demand DataFrame with a 'GSP' column.
     :param nodes_df: DataFrame containing network node data with a 'Node' column.
-    :return: Updated DataFrame with the 'ETYS_Node' column.
+    :return: DataFrame with the 'ETYS_Node' column added.
     """
-    df["ETYS_Node"] = df["GSP"].apply(lambda x: lookup_etys_node(x, nodes_df))
-    return df
+    return df.assign(ETYS_Node=resolve_etys_nodes(df["GSP"], nodes_df))
 
 
-def load_demand_data() -> pd.DataFrame:
+def load_demand_data(run_config: Optional[RunConfig] = None) -> pd.DataFrame:
     """
     Loads and processes the FES active power demand data.
     This includes:
@@ -73,17 +59,19 @@ def load_demand_data() -> pd.DataFrame:
       - Filtering the data based on year, scenario, and demand types.
       - Adding the ETYS_Node column using network node data.
 
+    :param run_config: Run configuration; defaults to the settings in config.py.
     :return: The filtered and updated pandas DataFrame.
     """
+    run_config = run_config or default_run_config()
     logger.info("Starting to load demand data.")
 
     # Load the CSV file.
     try:
-        df = pd.read_csv(config.DEMAND_FILE_PATH)
-        logger.info(f"Loaded {len(df)} rows from {config.DEMAND_FILE_PATH}.")
+        df = read_csv_cached(run_config.demand_file_path)
+        logger.info(f"Loaded {len(df)} rows from {run_config.demand_file_path}.")
     except Exception as e:
-        logger.exception(f"Failed to load demand data from {config.DEMAND_FILE_PATH}: {e}")
-        raise FileNotFoundError(f"Error reading file at {config.DEMAND_FILE_PATH}: {e}")
+        logger.exception(f"Failed to load demand data from {run_config.demand_file_path}: {e}")
+        raise FileNotFoundError(f"Error reading file at {run_config.demand_file_path}: {e}")
 
     # Remove underscores from the "GSP" column if it exists.
     if "GSP" in df.columns:
@@ -93,8 +81,8 @@ def load_demand_data() -> pd.DataFrame:
         logger.warning("Column 'GSP' not found in demand data.")
 
     # Convert YEAR_OF_ANALYSIS to two-digit representation.
-    year_two_digits = int(str(config.YEAR_OF_ANALYSIS)[-2:])
-    logger.info(f"YEAR_OF_ANALYSIS {config.YEAR_OF_ANALYSIS} converted to two digits: {year_two_digits}.")
+    year_two_digits = int(str(run_config.year_of_analysis)[-2:])
+    logger.info(f"YEAR_OF_ANALYSIS {run_config.year_of_analysis} converted to two digits: {year_two_digits}.")
 
     # Ensure 'year' column exists and is numeric.
     if "year" not in df.columns:
@@ -105,13 +93,13 @@ def load_demand_data() -> pd.DataFrame:
     # Apply filters based on year, scenario, and demand types.
     filtered_df = df[
         (df["year"] == year_two_digits) &
-        (df["scenario"] == config.FES_SCENARIO) &
-        (df["type"].isin(config.CONSIDER_DEMAND_TYPES))
-        ].copy()
+        (df["scenario"] == run_config.fes_scenario) &
+        (df["type"].isin(run_config.consider_demand_types))
+        ]
     logger.info(f"After filtering, {len(filtered_df)} rows remain.")
 
     # Retrieve network node data.
-    nodes_df = get_network_data().get("all_nodes_df", pd.DataFrame())
+    nodes_df = get_network_data(run_config).get("all_nodes_df", pd.DataFrame())
     if nodes_df.empty:
         logger.warning("No network node data available; skipping ETYS_Node population.")
     else:
@@ -128,9 +116,8 @@ def export_demand_data(df: pd.DataFrame, output_path: str) -> None:
     :param df: DataFrame to export.
     :param output_path: Path to the output Excel file.
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
     try:
-        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+        with atomic_path(output_path) as temporary, pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
             df.to_excel(writer, sheet_name="Demand Data", index=False)
         logger.info(f"Demand data exported successfully to {output_path}.")
     except Exception as e:
@@ -138,18 +125,22 @@ def export_demand_data(df: pd.DataFrame, output_path: str) -> None:
         raise
 
 
-def main() -> None:
+def main(run_config: Optional[RunConfig] = None) -> None:
     """
     Main function to process and export FES active power demand data.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
     """
+    run_config = run_config or default_run_config()
     logger.info("Beginning demand data processing.")
     try:
-        data = load_demand_data()
-        export_demand_data(data, config.DEMAND_OUTPUT_FILE_PATH)
+        data = load_demand_data(run_config)
+        export_demand_data(data, run_config.demand_output_file_path)
         logger.info("Demand data processing complete.")
     except Exception as e:
         logger.exception("An error occurred during demand data processing.")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     main()
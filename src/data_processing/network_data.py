@@ -2,25 +2,37 @@
 Pulls network data from ETYS sheets (regions defined in config.py sheet.
 Sorts and compiles network data into dataframes corresponding to asset type.
 Dataframes form part of a dictionary which is exportable into single xlsx file (default)
+
+The concatenate, status/year filter and node extraction stages run per transmission owner partition (the a/b/c/d
+sheet suffixes in SHEET_ASSOCIATIONS). Each partition is cached on its own, so any tag selection is assembled as a
+union of cached partitions; partitions missing from the cache are computed in parallel. This relies on the change
+sheets only adding, changing or removing branches listed in the same TO's sheets.
 """
 
+from __future__ import annotations
+
 import warnings
 warnings.filterwarnings("ignore", message="Cannot parse header or footer so it will be ignored")
 
-import pandas as pd
 import logging
-from typing import Dict, List, Set, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Dict, List, Any, Tuple, Optional
 from src.config import (
-    ETYSB_FILE_PATH,
-    COORDINATES_FILE_PATH,
-    SHEET_ASSOCIATIONS,
-    SELECTED_TAGS,
-    YEAR_OF_ANALYSIS,
-    NETWORK_OUTPUT_FILE_PATH
+    EXCEL_READER, LOG_FORMAT, NETWORK_PARTITION_WORKERS, RESULT_CACHE_SIZE, SHEET_ASSOCIATIONS, VALID_TAGS, RunConfig,
+    default_run_config
 )
+from src.data_processing import reference
+from src.data_processing.cache import ResultCache, file_signature, read_csv_cached
+from src.data_processing.excel_readers import get_excel_reader
+from src.data_processing.implementations import current_implementation, timed_stage, use_reference
+from src.data_processing.node_attributes import VOLTAGE_MAPPING, derive_voltage, site_codes  # noqa: F401
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
-# Configure logging to include timestamps, log level and message.
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -47,6 +59,11 @@ REACTIVE_SHEETS: List[str] = [
 # Combined list of all network data sheets.
 NETWORK_DATA_SHEETS: List[str] = CIRCUIT_SHEETS + TRANSFORMER_SHEETS + REACTIVE_SHEETS
 
+# Columns holding node names in the network data sheets.
+NODE_COLUMNS: List[str] = ["Node 1", "Node 2", "Node"]
+
+NODE_INFO_COLUMNS: List[str] = ["Node", "Voltage (Derived)", "Sheet Names", "Relevant TO"]
+
 # Mapping to standardise column names from the Excel file.
 COLUMN_RENAME_MAP: Dict[str, str] = {
     "Node1": "Node 1",
@@ -63,45 +80,61 @@ COLUMN_RENAME_MAP: Dict[str, str] = {
     "MVar Absorption": "MVAr Absorption",
 }
 
-# Mapping for deriving voltage based on a digit in the node name.
-VOLTAGE_MAPPING: Dict[str, str] = {
-    "1": "132",
-    "2": "275",
-    "3": "33",
-    "4": "400",
-    "5": "11",
-    "6": "66",
-    "7": "25",
-    "8": "22",
-}
+# Parsed workbooks keyed by file signature, and network results keyed by the inputs they depend on.
+_WORKBOOK_CACHE = ResultCache("parsed workbooks", maxsize=RESULT_CACHE_SIZE)
+_NETWORK_CACHE = ResultCache("network data", maxsize=RESULT_CACHE_SIZE)
+# Filtered data of one TO partition, keyed by workbook signature, sheet suffix and year of analysis.
+_PARTITION_CACHE = ResultCache("network partitions", maxsize=RESULT_CACHE_SIZE * len(VALID_TAGS))
 
 
 # ============================================================================
 # Data Parsing and Processing Functions
 # ============================================================================
 
-def parse_all_sheets(file_path: str, rename_map: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+def parse_all_sheets(file_path: str, rename_map: Dict[str, str],
+                     excel_reader: str = EXCEL_READER) -> Dict[str, pd.DataFrame]:
     """
     Load and parse all sheets from an Excel file.
 
     Each sheet is read with header=1, extra spaces are stripped from column names,
-    and columns are renamed using the provided map.
+    and columns are renamed using the provided map. Results are cached per file signature, rename map and reader,
+    so the workbook is only parsed again if it changes on disk.
+
+    :param file_path: Path to the Excel file.
+    :param rename_map: Dictionary mapping original column names to standardised names.
+    :param excel_reader: Reader engine (see excel_readers.py); every engine gives the same result.
+    :return: A dictionary mapping sheet names to their corresponding DataFrames.
+    """
+    key = (file_signature(file_path), tuple(sorted(rename_map.items())), excel_reader)
+    return _WORKBOOK_CACHE.get_or_compute(key, lambda: _parse_all_sheets(file_path, rename_map, excel_reader))
+
+
+def read_workbook_sheets(file_path: str, rename_map: Dict[str, str], excel_reader: str = EXCEL_READER,
+                         sheet_names: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Read sheets with header=1, strip the column names and rename them with rename_map (uncached; errors propagate).
 
     :param file_path: Path to the Excel file.
     :param rename_map: Dictionary mapping original column names to standardised names.
+    :param excel_reader: Reader engine (see excel_readers.py).
+    :param sheet_names: Sheets to read, or None for all.
     :return: A dictionary mapping sheet names to their corresponding DataFrames.
     """
-    logger.info("Loading and parsing Excel file...")
+    sheets_dict = get_excel_reader(excel_reader).read_sheets(file_path, sheet_names, header=1)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for sheet_name, df in sheets_dict.items():
+        df.columns = df.columns.astype(str).str.strip() # Strip to ensure column names are clean strings.
+        if debug:
+            logger.debug(f"Columns in '{sheet_name}': {df.columns.tolist()}")
+        df.rename(columns=rename_map, inplace=True)
+    return sheets_dict
+
+
+def _parse_all_sheets(file_path: str, rename_map: Dict[str, str], excel_reader: str) -> Dict[str, pd.DataFrame]:
+    logger.info(f"Loading and parsing Excel file ({excel_reader} reader)...")
     try:
-        xls = pd.ExcelFile(file_path)
-        sheets_dict: Dict[str, pd.DataFrame] = {}
-        for sheet_name in xls.sheet_names:
-            logger.info(f"Parsing sheet: {sheet_name}")
-            df = xls.parse(sheet_name, header=1)
-            df.columns = df.columns.astype(str).str.strip() # Strip to ensure column names are clean strings.
-            logger.info(f"Columns in '{sheet_name}': {df.columns.tolist()}")
-            df.rename(columns=rename_map, inplace=True)
-            sheets_dict[sheet_name] = df
+        sheets_dict = read_workbook_sheets(file_path, rename_map, excel_reader)
+        logger.info(f"Parsed {len(sheets_dict)} sheets ({sum(len(df) for df in sheets_dict.values())} rows).")
         return sheets_dict
     except Exception as e:
         logger.exception(f"Error parsing sheets from {file_path}")
@@ -129,7 +162,8 @@ def filter_relevant_sheets_data(all_data: Dict[str, pd.DataFrame],
 
 
 def concatenate_sheets(sheet_list: List[str],
-                       sheets_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+                       sheets_data: Dict[str, pd.DataFrame],
+                       ignore_index: bool = True) -> pd.DataFrame:
     """
     Concatenate sheets from a given list that exist in sheets_data.
 
@@ -137,6 +171,8 @@ def concatenate_sheets(sheet_list: List[str],
 
     :param sheet_list: List of sheet names to concatenate.
     :param sheets_data: Dictionary mapping sheet names to DataFrames.
+    :param ignore_index: Number the rows of the result consecutively; if False each row keeps its row number
+        within its sheet.
     :return: A single concatenated DataFrame.
     """
     dfs = [
@@ -144,26 +180,28 @@ def concatenate_sheets(sheet_list: List[str],
         for sheet in sheet_list if sheet in sheets_data
     ]
     if dfs:
-        return pd.concat(dfs, ignore_index=True)
+        return pd.concat(dfs, ignore_index=ignore_index)
     else:
         return pd.DataFrame()
 
 
-def concatenate_and_process_sheets(sheets_data: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def concatenate_and_process_sheets(sheets_data: Dict[str, pd.DataFrame],
+                                   ignore_index: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Concatenate the circuit, transformer and reactive compensation data sheets separately.
 
     :param sheets_data: Dictionary of relevant sheets.
+    :param ignore_index: Passed to concatenate_sheets.
     :return: Tuple of DataFrames (circuit, transformer, reactive).
     """
     logger.info("Concatenating and processing sheets.")
     try:
-        circuit_df = concatenate_sheets(CIRCUIT_SHEETS, sheets_data)
+        circuit_df = concatenate_sheets(CIRCUIT_SHEETS, sheets_data, ignore_index)
         logger.info("Circuit sheets concatenated.")
-        transformer_df = concatenate_sheets(TRANSFORMER_SHEETS, sheets_data)
+        transformer_df = concatenate_sheets(TRANSFORMER_SHEETS, sheets_data, ignore_index)
         transformer_df['Transformer Type'] = 'Transformer'
         logger.info("Transformer sheets concatenated.")
-        reactive_df = concatenate_sheets(REACTIVE_SHEETS, sheets_data)
+        reactive_df = concatenate_sheets(REACTIVE_SHEETS, sheets_data, ignore_index)
         logger.info("Reactive sheets concatenated.")
         return circuit_df, transformer_df, reactive_df
     except Exception as e:
@@ -181,47 +219,52 @@ def filter_data_based_on_status_and_year(df: pd.DataFrame, year: int, is_reactiv
     - For "Removed" rows, any matching rows already in the filtered set are removed.
     - For "Change" rows, any matching rows are removed and the new row is added.
 
+    Rows match on (Node 1, Node 2), or on Node for reactive data; rows with a blank node never match.
+    Processing the rows in order is equivalent to keeping each kept row unless a later in-year Removed/Change row
+    matches it, which is evaluated for all rows at once with a groupby.
+
     :param df: The DataFrame to filter.
     :param year: The target year for analysis.
     :param is_reactive: Whether the DataFrame is reactive data (affects column selection).
     :return: Filtered DataFrame.
     """
     logger.info("Filtering data based on status and year.")
-    filtered_rows = []
-    for _, row in df.iterrows():
-        status = row.get("Status")
-        row_year = row.get("Year")
-        # Include row if Status or Year is missing.
-        if pd.isna(status) or pd.isna(row_year):
-            filtered_rows.append(row)
-            continue
-        # Exclude rows beyond the target year.
-        if row_year > year:
-            continue
-        if status == "Addition":
-            filtered_rows.append(row)
-        elif status == "Removed":
-            if is_reactive:
-                filtered_rows = [r for r in filtered_rows if r.get("Node") != row.get("Node")]
-            else:
-                filtered_rows = [
-                    r for r in filtered_rows
-                    if (r.get("Node 1"), r.get("Node 2")) != (row.get("Node 1"), row.get("Node 2"))
-                ]
-        elif status == "Change":
-            if is_reactive:
-                filtered_rows = [r for r in filtered_rows if r.get("Node") != row.get("Node")]
-            else:
-                filtered_rows = [
-                    r for r in filtered_rows
-                    if (r.get("Node 1"), r.get("Node 2")) != (row.get("Node 1"), row.get("Node 2"))
-                ]
-            filtered_rows.append(row)
-    result_df = pd.DataFrame(filtered_rows, columns=df.columns)
+    with timed_stage("status/year filter"):
+        if use_reference():
+            result_df = reference.filter_data_based_on_status_and_year(df, year, is_reactive)
+        else:
+            result_df = _filter_status_and_year(df, year, is_reactive)
     logger.info("Data filtering completed.")
     return result_df
 
 
+def _filter_status_and_year(df: pd.DataFrame, year: int, is_reactive: bool) -> pd.DataFrame:
+    missing = pd.Series(np.nan, index=df.index)
+    status = df["Status"] if "Status" in df.columns else missing
+    row_year = pd.to_numeric(df["Year"], errors="coerce") if "Year" in df.columns else missing
+
+    undated = status.isna() | row_year.isna()
+    in_year = ~undated & (row_year <= year)
+    kept = undated | (in_year & status.isin(["Addition", "Change"]))
+    removes = in_year & status.isin(["Removed", "Change"])
+
+    key_cols = [col for col in (["Node"] if is_reactive else ["Node 1", "Node 2"]) if col in df.columns]
+    if key_cols:
+        # Position of the last Removed/Change row for each key; earlier rows with that key are dropped.
+        position = pd.Series(np.arange(len(df)), index=df.index)
+        last_removal = (
+            position.where(removes, -1)
+            .groupby([df[col] for col in key_cols], dropna=True, sort=False).transform("max")
+        )
+        removed = last_removal.notna() & (last_removal > position)
+    else:
+        # Without key columns every row matches, so only rows after the last Removed/Change row remain.
+        position = np.arange(len(df))
+        removed = pd.Series(position < (position[removes.to_numpy()].max() if removes.any() else -1),
+                            index=df.index)
+    return df[kept & ~removed]
+
+
 def split_data_by_type(df: pd.DataFrame, column: str) -> Dict[Any, pd.DataFrame]:
     """
     Split a DataFrame into sub-DataFrames based on the unique values in a specified column.
@@ -236,18 +279,6 @@ def split_data_by_type(df: pd.DataFrame, column: str) -> Dict[Any, pd.DataFrame]
     return {}
 
 
-def derive_voltage(node_name: str) -> str:
-    """
-    Derive a voltage (in kV) value from the node name based on the digit in the 5th character (note this may not work for OFTO sheets due to naming inconsistencies!).
-
-    :param node_name: The node name string.
-    :return: The derived voltage or 'Unknown' if not applicable.
-    """
-    if len(node_name) >= 5 and node_name[4].isdigit():
-        return VOLTAGE_MAPPING.get(node_name[4], "Unknown")
-    return "Unknown"
-
-
 def compile_node_info(*dfs: pd.DataFrame) -> pd.DataFrame:
     """
     Compile a unique, sorted list of nodes from the provided DataFrames.
@@ -257,51 +288,78 @@ def compile_node_info(*dfs: pd.DataFrame) -> pd.DataFrame:
       - A comma-separated list of the sheet names where the node appears.
       - A comma-separated list of the "Relevant TO" values derived from the sheet names.
 
+    The node/sheet pairs are gathered column-wise and aggregated with a single groupby.
+
     :param dfs: DataFrames to compile node information from.
     :return: A DataFrame containing node info.
     """
-    node_info: Dict[str, Set[str]] = {}  # Map node -> set of sheet names
+    if use_reference():
+        with timed_stage("node compile"):
+            return reference.compile_node_info(*dfs)
+    return aggregate_node_sheet_pairs(node_sheet_pairs(*dfs))
+
+
+def node_sheet_pairs(*dfs: pd.DataFrame) -> pd.DataFrame:
+    """
+    List the distinct (node, sheet) pairs in the node columns of the provided DataFrames.
+
+    :param dfs: DataFrames to take node names from.
+    :return: DataFrame with 'Node' and 'Sheet_Name' columns (blank Sheet_Name where the DataFrame has none).
+    """
+    with timed_stage("node compile"):
+        return _node_sheet_pairs(dfs)
+
+
+def _node_sheet_pairs(dfs) -> pd.DataFrame:
+    pairs = []
     for df in dfs:
-        if "Sheet_Name" not in df.columns:
+        node_cols = [col for col in NODE_COLUMNS if col in df.columns]
+        if not node_cols:
             continue
-        for col in ["Node 1", "Node 2", "Node"]:
-            if col in df.columns:
-                for _, row in df.iterrows():
-                    node_val = row.get(col)
-                    if pd.isna(node_val):
-                        continue
-                    node_val = str(node_val).strip()
-                    sheet_name = row.get("Sheet_Name")
-                    if not sheet_name:
-                        continue
-                    node_info.setdefault(node_val, set()).add(sheet_name)
-    # Build output list with additional derived details.
-    data = []
-    for node, sheets in node_info.items():
-        sheet_list = sorted(sheets)
-        relevant_to_set = {SHEET_ASSOCIATIONS.get(s[-1], "Unknown") for s in sheet_list if s}
-        data.append({
-            "Node": node,
-            "Voltage (Derived)": derive_voltage(node),
-            "Sheet Names": ", ".join(sheet_list),
-            "Relevant TO": ", ".join(sorted(relevant_to_set))
-        })
-    # Include nodes that might not have any associated sheet info.
-    nodes_already = set(node_info.keys())
-    for df in dfs:
-        for col in ["Node 1", "Node 2", "Node"]:
-            if col in df.columns:
-                for node_val in df[col].dropna().unique():
-                    node_val = str(node_val).strip()
-                    if node_val not in nodes_already:
-                        data.append({
-                            "Node": node_val,
-                            "Voltage (Derived)": derive_voltage(node_val),
-                            "Sheet Names": "",
-                            "Relevant TO": ""
-                        })
-                        nodes_already.add(node_val)
-    nodes_df = pd.DataFrame(data)
+        # Nodes from DataFrames without sheet info are still listed, with blank sheet details.
+        sheets = df["Sheet_Name"] if "Sheet_Name" in df.columns else pd.Series("", index=df.index)
+        long_df = df[node_cols].assign(Sheet_Name=sheets.fillna("")).melt(id_vars="Sheet_Name", value_name="Node Value")
+        pairs.append(long_df[["Node Value", "Sheet_Name"]].dropna(subset=["Node Value"]))
+    if not pairs:
+        return pd.DataFrame(columns=["Node", "Sheet_Name"])
+
+    pairs_df = pd.concat(pairs, ignore_index=True).rename(columns={"Node Value": "Node"})
+    pairs_df["Node"] = pairs_df["Node"].astype(str).str.strip()
+    return pairs_df.drop_duplicates()
+
+
+def aggregate_node_sheet_pairs(pairs_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the node information table from (node, sheet) pairs (see node_sheet_pairs).
+
+    :param pairs_df: DataFrame with 'Node' and 'Sheet_Name' columns.
+    :return: A DataFrame containing node info, sorted by node.
+    """
+    with timed_stage("node compile"):
+        return _aggregate_node_sheet_pairs(pairs_df)
+
+
+def _aggregate_node_sheet_pairs(pairs_df: pd.DataFrame) -> pd.DataFrame:
+    if pairs_df.empty:
+        return pd.DataFrame(columns=NODE_INFO_COLUMNS)
+    pairs_df = pairs_df.drop_duplicates()
+    all_nodes = pd.Index(pairs_df["Node"].unique())
+
+    with_sheet = pairs_df[pairs_df["Sheet_Name"] != ""].sort_values(["Node", "Sheet_Name"])
+    sheet_names = with_sheet.groupby("Node", sort=False)["Sheet_Name"].agg(", ".join)
+    relevant_to = (
+        with_sheet.assign(TO=with_sheet["Sheet_Name"].str[-1].map(SHEET_ASSOCIATIONS).fillna("Unknown"))
+        .drop_duplicates(["Node", "TO"])
+        .sort_values(["Node", "TO"])
+        .groupby("Node", sort=False)["TO"].agg(", ".join)
+    )
+
+    nodes_df = pd.DataFrame({
+        "Node": all_nodes,
+        "Voltage (Derived)": all_nodes.map(derive_voltage),
+        "Sheet Names": sheet_names.reindex(all_nodes, fill_value="").to_numpy(),
+        "Relevant TO": relevant_to.reindex(all_nodes, fill_value="").to_numpy(),
+    })
     nodes_df = nodes_df.sort_values("Node").reset_index(drop=True)
     return nodes_df
 
@@ -345,8 +403,8 @@ def add_coordinates_and_site_name_to_nodes(nodes_df: pd.DataFrame,
     :return: Enhanced nodes DataFrame with latitude, longitude, and site names.
     """
     try:
-        coords_df = pd.read_csv(coordinates_file)
-        nodes_df["Site_Code"] = nodes_df["Node"].astype(str).str[:4]
+        coords_df = read_csv_cached(coordinates_file)
+        nodes_df["Site_Code"] = site_codes(nodes_df["Node"])
         merged_df = pd.merge(
             nodes_df,
             coords_df[["Site Code", "latitude", "longitude"]],
@@ -362,10 +420,13 @@ def add_coordinates_and_site_name_to_nodes(nodes_df: pd.DataFrame,
         return nodes_df
 
 
-def get_network_data() -> Dict[str, Any]:
+def get_network_data(run_config: Optional[RunConfig] = None) -> Dict[str, Any]:
     """
     Process the input Excel file and compile network data.
 
+    Results are cached per ETYS workbook, coordinates file, selected tags and year of analysis, so repeated calls
+    (e.g. from the plant and demand stages) within one process only compute the network once per configuration.
+
     The function returns a dictionary containing:
       - 'circuit_data_filtered'
       - 'transformer_data_filtered'
@@ -373,32 +434,156 @@ def get_network_data() -> Dict[str, Any]:
       - 'filtered_dataframes': A dict of DataFrames split by type (if applicable)
       - 'all_nodes_df': A compiled DataFrame with node details (voltage, coordinates, site name, etc.)
 
+    :param run_config: Run configuration; defaults to the settings in config.py.
     :return: Dictionary with the processed network data.
     """
+    run_config = run_config or default_run_config()
+    key = (
+        file_signature(run_config.etysb_file_path),
+        file_signature(run_config.coordinates_file_path),
+        tuple(sorted(run_config.selected_tags)),
+        run_config.year_of_analysis,
+        current_implementation(),
+    )
+    return _NETWORK_CACHE.get_or_compute(key, lambda: _compute_network_data(run_config))
+
+
+def partition_suffixes(tags) -> List[str]:
+    """
+    Return the sheet suffixes (TO partitions) that belong to the given tags, in SHEET_ASSOCIATIONS order.
+
+    :param tags: Selected TO tags.
+    :return: List of sheet suffixes, e.g. ["c", "d"] for {"NGET", "OFTO"}.
+    """
+    return [suffix for suffix, tag in SHEET_ASSOCIATIONS.items() if tag in tags]
+
+
+def _compute_partition(all_sheets_data: Dict[str, pd.DataFrame], suffix: str, year: int) -> Dict[str, pd.DataFrame]:
+    """Concatenate, filter and extract the nodes of the network sheets of one TO partition."""
+    sheets_data = {name: df for name, df in all_sheets_data.items() if name[-1] == suffix}
+    # Rows keep their row number within their sheet so the union can restore the order of a combined run.
+    circuit_data, transformer_data, reactive_data = concatenate_and_process_sheets(sheets_data, ignore_index=False)
+    circuit_data_filtered = filter_data_based_on_status_and_year(circuit_data, year)
+    transformer_data_filtered = filter_data_based_on_status_and_year(transformer_data, year)
+    reactive_data_filtered = filter_data_based_on_status_and_year(reactive_data, year, is_reactive=True)
+    return {
+        'circuit_data_filtered': circuit_data_filtered,
+        'transformer_data_filtered': transformer_data_filtered,
+        'reactive_data_filtered': reactive_data_filtered,
+        'node_pairs': node_sheet_pairs(circuit_data_filtered, transformer_data_filtered, reactive_data_filtered),
+    }
+
+
+def get_network_partitions(file_path: str, all_sheets_data: Dict[str, pd.DataFrame], suffixes: List[str],
+                           year: int) -> List[Dict[str, pd.DataFrame]]:
+    """
+    Return the filtered data of each TO partition, computing the partitions missing from the cache in parallel.
+
+    :param file_path: Path to the ETYS workbook (used in the cache key).
+    :param all_sheets_data: Parsed workbook (see parse_all_sheets).
+    :param suffixes: Sheet suffixes of the partitions (see partition_suffixes).
+    :param year: Year of analysis.
+    :return: One dictionary per suffix with the filtered circuit, transformer and reactive data and node pairs.
+    """
+    signature = file_signature(file_path)
+
+    def partition(suffix: str) -> Dict[str, pd.DataFrame]:
+        return _PARTITION_CACHE.get_or_compute(
+            (signature, suffix, year), lambda: _compute_partition(all_sheets_data, suffix, year)
+        )
+
+    missing = [suffix for suffix in suffixes if (signature, suffix, year) not in _PARTITION_CACHE]
+    results = {}
+    workers = min(NETWORK_PARTITION_WORKERS, len(missing))
+    if workers > 1:
+        logger.info(f"Computing {len(missing)} network partitions with {workers} workers.")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Each task runs in a copy of the caller's context (implementation selection, stage timers).
+            futures = [pool.submit(copy_context().run, partition, suffix) for suffix in missing]
+            results = {suffix: future.result() for suffix, future in zip(missing, futures)}
+    return [results[suffix] if suffix in results else partition(suffix) for suffix in suffixes]
+
+
+def _union_partitions(frames: List[pd.DataFrame], sheet_list: List[str], suffixes: List[str],
+                      all_sheets_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine the filtered partition DataFrames of one asset type as if their sheets had been concatenated and
+    filtered together: same column order, rows numbered by their position in the combined sheets and in that order.
+
+    :param frames: Filtered DataFrames of the partitions (rows numbered within their sheet).
+    :param sheet_list: Sheets of the asset type, in processing order (e.g. CIRCUIT_SHEETS).
+    :param suffixes: Sheet suffixes of the partitions.
+    :param all_sheets_data: Parsed workbook.
+    :return: The combined DataFrame.
+    """
+    sheets = [sheet for sheet in sheet_list if sheet[-1] in suffixes and sheet in all_sheets_data]
+    template = concatenate_sheets(sheets, {sheet: all_sheets_data[sheet].iloc[:0] for sheet in sheets})
+    union = pd.concat([df for df in frames if not df.empty] or frames)
+    columns = list(template.columns) + [col for col in union.columns if col not in template.columns]
+    if union.empty:
+        return union.reindex(columns=columns)
+
+    lengths = pd.Series([len(all_sheets_data[sheet]) for sheet in sheets], index=sheets)
+    offsets = lengths.cumsum() - lengths
+    union.index = union["Sheet_Name"].map(offsets).to_numpy() + union.index.to_numpy()
+    return union.sort_index()[columns]
+
+
+def _compute_network_data(run_config: RunConfig) -> Dict[str, Any]:
     # Parse all sheets from the Excel file.
-    all_sheets_data = parse_all_sheets(ETYSB_FILE_PATH, COLUMN_RENAME_MAP)
+    all_sheets_data = parse_all_sheets(run_config.etysb_file_path, COLUMN_RENAME_MAP, run_config.excel_reader)
     # Build site name mapping using index sheets.
     site_name_mapping = compile_site_name_mapping(all_sheets_data, INDEX_SHEETS)
     # Filter sheets based on associations and selected tags.
-    relevant_sheets_data = filter_relevant_sheets_data(all_sheets_data, SHEET_ASSOCIATIONS, SELECTED_TAGS)
+    relevant_sheets_data = filter_relevant_sheets_data(all_sheets_data, SHEET_ASSOCIATIONS,
+                                                      run_config.selected_tags)
     if not relevant_sheets_data:
         raise ValueError("No relevant sheets found.")
 
-    # Concatenate and filter data.
+    if use_reference():
+        return _compute_reference_network_data(run_config, relevant_sheets_data, site_name_mapping)
+
+    # Concatenate and filter data per TO partition, then combine the selected partitions.
+    suffixes = partition_suffixes(run_config.selected_tags)
+    partitions = get_network_partitions(run_config.etysb_file_path, all_sheets_data, suffixes,
+                                        run_config.year_of_analysis)
+    circuit_data_filtered, transformer_data_filtered, reactive_data_filtered = (
+        _union_partitions([partition[key] for partition in partitions], sheet_list, suffixes, all_sheets_data)
+        for key, sheet_list in (('circuit_data_filtered', CIRCUIT_SHEETS),
+                                ('transformer_data_filtered', TRANSFORMER_SHEETS),
+                                ('reactive_data_filtered', REACTIVE_SHEETS))
+    )
+
+    all_nodes_df = aggregate_node_sheet_pairs(pd.concat([partition['node_pairs'] for partition in partitions]))
+    return _network_result(run_config, circuit_data_filtered, transformer_data_filtered, reactive_data_filtered,
+                           all_nodes_df, site_name_mapping)
+
+
+def _compute_reference_network_data(run_config: RunConfig, relevant_sheets_data: Dict[str, pd.DataFrame],
+                                    site_name_mapping: Dict[str, str]) -> Dict[str, Any]:
+    # All selected sheets are processed together, without partitions.
     circuit_data, transformer_data, reactive_data = concatenate_and_process_sheets(relevant_sheets_data)
-    circuit_data_filtered = filter_data_based_on_status_and_year(circuit_data, YEAR_OF_ANALYSIS)
-    transformer_data_filtered = filter_data_based_on_status_and_year(transformer_data, YEAR_OF_ANALYSIS)
-    reactive_data_filtered = filter_data_based_on_status_and_year(reactive_data, YEAR_OF_ANALYSIS, is_reactive=True)
+    circuit_data_filtered = filter_data_based_on_status_and_year(circuit_data, run_config.year_of_analysis)
+    transformer_data_filtered = filter_data_based_on_status_and_year(transformer_data, run_config.year_of_analysis)
+    reactive_data_filtered = filter_data_based_on_status_and_year(reactive_data, run_config.year_of_analysis,
+                                                                   is_reactive=True)
+    all_nodes_df = compile_node_info(circuit_data_filtered, transformer_data_filtered, reactive_data_filtered)
+    return _network_result(run_config, circuit_data_filtered, transformer_data_filtered, reactive_data_filtered,
+                           all_nodes_df, site_name_mapping)
 
+
+def _network_result(run_config: RunConfig, circuit_data_filtered: pd.DataFrame,
+                    transformer_data_filtered: pd.DataFrame, reactive_data_filtered: pd.DataFrame,
+                    all_nodes_df: pd.DataFrame, site_name_mapping: Dict[str, str]) -> Dict[str, Any]:
     # Optionally, split filtered data by type for output.
     filtered_dataframes: Dict[Any, pd.DataFrame] = {}
     filtered_dataframes.update(split_data_by_type(circuit_data_filtered, "Circuit Type"))
     filtered_dataframes.update(split_data_by_type(transformer_data_filtered, "Transformer Type"))
     filtered_dataframes.update(split_data_by_type(reactive_data_filtered, "Compensation Type"))
 
-    # Compile node information and merge with coordinates and site names.
-    all_nodes_df = compile_node_info(circuit_data_filtered, transformer_data_filtered, reactive_data_filtered)
-    all_nodes_df = add_coordinates_and_site_name_to_nodes(all_nodes_df, COORDINATES_FILE_PATH, site_name_mapping)
+    # Merge node information with coordinates and site names.
+    all_nodes_df = add_coordinates_and_site_name_to_nodes(all_nodes_df, run_config.coordinates_file_path,
+                                                         site_name_mapping)
 
     return {
         'circuit_data_filtered': circuit_data_filtered,
@@ -409,17 +594,28 @@ def get_network_data() -> Dict[str, Any]:
     }
 
 
-def main() -> None:
+def clear_network_caches() -> None:
+    """Clear the cached network results and partitions (the parsed workbook cache is kept)."""
+    _NETWORK_CACHE.clear()
+    _PARTITION_CACHE.clear()
+
+
+def main(run_config: Optional[RunConfig] = None) -> None:
     """
     Main function to process network data and write the results to an Excel file.
 
     The output file includes a 'Nodes' sheet and additional sheets from split filtered data.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
     """
+    run_config = run_config or default_run_config()
+    network_output_file_path = run_config.network_output_file_path
     logger.info("Starting sheet processing.")
     try:
-        data = get_network_data()
+        data = get_network_data(run_config)
         # Write output to an Excel file using xlsxwriter.
-        with pd.ExcelWriter(NETWORK_OUTPUT_FILE_PATH, engine="xlsxwriter") as writer:
+        with atomic_path(network_output_file_path) as temporary, \
+                pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
             # Write the Nodes sheet.
             nodes_sheet_name = "Nodes"
             data['all_nodes_df'].to_excel(writer, sheet_name=nodes_sheet_name, index=False)
@@ -430,10 +626,11 @@ def main() -> None:
                 safe_sheet_name = sheet_name[:31].replace("/", "_").replace("\\", "_")
                 df.to_excel(writer, sheet_name=safe_sheet_name, index=False)
                 logger.info(f"Saved sheet: {safe_sheet_name}")
-        logger.info(f"Processing complete. Data saved to {NETWORK_OUTPUT_FILE_PATH}")
+        logger.info(f"Processing complete. Data saved to {network_output_file_path}")
     except Exception as e:
         logger.exception("An error occurred during processing.")
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     main()
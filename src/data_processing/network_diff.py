@@ -0,0 +1,244 @@
+"""
+Compares the circuits, transformers and reactive compensation of two ETYS Appendix B workbooks (e.g. the 2024 and
+2025 releases).
+
+Both workbooks go through parse_all_sheets and concatenate_and_process_sheets, optionally followed by the
+status/year filter (to compare the network as built in a given year). Every asset gets a key:
+  - circuits and transformers: Sheet_Name, Node 1 and Node 2 (in sorted order, so a branch entered the other way
+    round is the same asset) and a Circuit ID numbering parallel branches in sheet order;
+  - reactive compensation: Sheet_Name, Node and a Device ID numbering the devices at the node in sheet order.
+
+The key columns (without the ID) and the remaining (parameter) columns are hashed with
+pandas.util.hash_pandas_object. Assets with the same key and parameter hash in both releases are paired first, so
+removing or reordering one asset does not shift the ID of the others; the remaining assets are paired by key in
+sheet order and those whose parameter hash differs are compared column by column (numbers within a relative
+NUMERIC_TOLERANCE are equal), all vectorised. The reported ID is the asset's position in its own release. The
+result is one long table with a row per added asset, removed asset and changed parameter.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional
+from src.config import EXCEL_READER, SHEET_ASSOCIATIONS
+from src.data_processing.network_data import (
+    COLUMN_RENAME_MAP, concatenate_and_process_sheets, filter_data_based_on_status_and_year,
+    filter_relevant_sheets_data, parse_all_sheets
+)
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT = "Circuit"
+TRANSFORMER = "Transformer"
+REACTIVE = "Reactive"
+
+ADDED = "Added"
+REMOVED = "Removed"
+CHANGED = "Changed"
+
+# Columns identifying an asset (besides its ID, which numbers assets sharing the same key columns).
+ASSET_KEYS: Dict[str, List[str]] = {
+    CIRCUIT: ["Sheet_Name", "Node 1", "Node 2"],
+    TRANSFORMER: ["Sheet_Name", "Node 1", "Node 2"],
+    REACTIVE: ["Sheet_Name", "Node"],
+}
+ASSET_ID_COLUMNS: Dict[str, str] = {CIRCUIT: "Circuit ID", TRANSFORMER: "Circuit ID", REACTIVE: "Device ID"}
+
+# Relative tolerance for numeric parameters (values rewritten with a different float precision are not changes).
+NUMERIC_TOLERANCE = 1e-9
+
+CHANGE_COLUMNS: List[str] = [
+    "Asset", "Change", "Sheet_Name", "Node 1", "Node 2", "Node", "ID", "Column", "Old Value", "New Value"
+]
+
+
+def read_network_assets(file_path: str, tags=None, year: Optional[int] = None,
+                        excel_reader: str = EXCEL_READER) -> Dict[str, pd.DataFrame]:
+    """
+    Read the circuit, transformer and reactive tables of a workbook.
+
+    :param file_path: Path to the ETYS Appendix B workbook.
+    :param tags: TO tags to include (all if None).
+    :param year: If given, keep the assets in service in that year (status/year filter).
+    :param excel_reader: Excel reader engine.
+    :return: Dictionary of asset type (CIRCUIT, TRANSFORMER, REACTIVE) to DataFrame.
+    """
+    sheets = parse_all_sheets(file_path, COLUMN_RENAME_MAP, excel_reader)
+    if not sheets:
+        raise ValueError(f"No sheets could be read from {file_path}.")
+    tags = list(tags) if tags else list(SHEET_ASSOCIATIONS.values())
+    circuit_df, transformer_df, reactive_df = concatenate_and_process_sheets(
+        filter_relevant_sheets_data(sheets, SHEET_ASSOCIATIONS, tags)
+    )
+    if year is not None:
+        circuit_df = filter_data_based_on_status_and_year(circuit_df, year)
+        transformer_df = filter_data_based_on_status_and_year(transformer_df, year)
+        reactive_df = filter_data_based_on_status_and_year(reactive_df, year, is_reactive=True)
+    return {CIRCUIT: circuit_df, TRANSFORMER: transformer_df, REACTIVE: reactive_df}
+
+
+def keyed_assets(df: pd.DataFrame, asset: str) -> pd.DataFrame:
+    """
+    Normalise an asset table and add its ID column (see the module docstring).
+
+    :param df: Circuit, transformer or reactive table.
+    :param asset: CIRCUIT, TRANSFORMER or REACTIVE.
+    :return: Copy of df with stripped node names (sorted for branches) and the ID column.
+    """
+    keys, id_column = ASSET_KEYS[asset], ASSET_ID_COLUMNS[asset]
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return df.reindex(columns=list(df.columns) + [id_column])
+    nodes = {col: df[col].astype(str).str.strip() if col in df.columns else pd.Series("", index=df.index)
+             for col in keys if col != "Sheet_Name"}
+    if "Node 1" in nodes:
+        first, second = nodes["Node 1"], nodes["Node 2"]
+        swap = first > second
+        nodes["Node 1"], nodes["Node 2"] = first.where(~swap, second), second.where(~swap, first)
+    df = df.assign(**nodes)
+    df[id_column] = df.groupby(keys, sort=False).cumcount() + 1
+    return df
+
+
+def _hash(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    # categorize=False: categorizing hashes the first of equal values (0 and 0.0) it meets, which depends on row order.
+    return pd.util.hash_pandas_object(df[columns].astype(object).where(df[columns].notna(), None), index=False,
+                                      categorize=False)
+
+
+def diff_assets(old_df: pd.DataFrame, new_df: pd.DataFrame, asset: str) -> pd.DataFrame:
+    """
+    Compare one asset table of two releases.
+
+    :param old_df: Table of the old release.
+    :param new_df: Table of the new release.
+    :param asset: CIRCUIT, TRANSFORMER or REACTIVE.
+    :return: DataFrame with the CHANGE_COLUMNS.
+    """
+    key_columns, id_column = ASSET_KEYS[asset], ASSET_ID_COLUMNS[asset]
+    old, new = keyed_assets(old_df, asset), keyed_assets(new_df, asset)
+    if old.empty and new.empty:
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    parameters = [col for col in old.columns if col in set(new.columns) and col not in key_columns + [id_column]]
+    for df in (old, new):
+        for col in key_columns + [id_column]:
+            if col not in df.columns:
+                df[col] = None
+        df["_key"], df["_params"] = _hash(df, key_columns), _hash(df, parameters)
+        df["_copy"] = df.groupby(["_key", "_params"], sort=False).cumcount()
+
+    # Unchanged assets: the n-th copy of an identical asset in one release pairs with the n-th copy in the other.
+    unchanged = old[["_key", "_params", "_copy"]].reset_index().merge(
+        new[["_key", "_params", "_copy"]].reset_index(), on=["_key", "_params", "_copy"], suffixes=("_old", "_new")
+    )
+    old, new = old.drop(index=unchanged["index_old"]), new.drop(index=unchanged["index_new"])
+    for df in (old, new):
+        df["_pair"] = df.groupby("_key", sort=False).cumcount()
+
+    joined = old[["_key", "_pair", "_params"]].reset_index().merge(
+        new[["_key", "_pair", "_params"]].reset_index(), on=["_key", "_pair"], how="outer", suffixes=("_old", "_new"),
+        indicator=True
+    )
+    removed = old.loc[joined.loc[joined["_merge"] == "left_only", "index_old"].astype(int)]
+    added = new.loc[joined.loc[joined["_merge"] == "right_only", "index_new"].astype(int)]
+    both = joined[(joined["_merge"] == "both") & (joined["_params_old"] != joined["_params_new"])]
+
+    parts = [_asset_rows(removed, asset, REMOVED), _asset_rows(added, asset, ADDED)]
+    if not both.empty:
+        before = old.loc[both["index_old"].astype(int), parameters].reset_index(drop=True)
+        after = new.loc[both["index_new"].astype(int), parameters].reset_index(drop=True)
+        differs = pd.DataFrame({col: _differs(before[col], after[col]) for col in parameters})
+        rows, cols = np.nonzero(differs.to_numpy())
+        changed_assets = new.loc[both["index_new"].astype(int)].reset_index(drop=True).iloc[rows]
+        changed = _asset_rows(changed_assets, asset, CHANGED)
+        changed["Column"] = np.asarray(parameters, dtype=object)[cols]
+        changed["Old Value"] = before.to_numpy()[rows, cols]
+        changed["New Value"] = after.to_numpy()[rows, cols]
+        parts.append(changed)
+    return pd.concat(parts, ignore_index=True)[CHANGE_COLUMNS]
+
+
+def _differs(before: pd.Series, after: pd.Series) -> np.ndarray:
+    """Element-wise difference of two aligned columns (both missing = equal, numbers within NUMERIC_TOLERANCE)."""
+    differs = (before.ne(after) & ~(before.isna() & after.isna())).to_numpy()
+    old_numbers, new_numbers = pd.to_numeric(before, errors="coerce"), pd.to_numeric(after, errors="coerce")
+    numeric = (old_numbers.notna() & new_numbers.notna()).to_numpy()
+    close = np.isclose(old_numbers.to_numpy(dtype=float), new_numbers.to_numpy(dtype=float),
+                       rtol=NUMERIC_TOLERANCE, atol=0)
+    return np.where(numeric, ~close, differs)
+
+
+def _asset_rows(df: pd.DataFrame, asset: str, change: str) -> pd.DataFrame:
+    """One output row per asset of df (without Column/Old Value/New Value)."""
+    return pd.DataFrame({
+        "Asset": asset,
+        "Change": change,
+        "Sheet_Name": df["Sheet_Name"].to_numpy(),
+        "Node 1": df["Node 1"].to_numpy() if "Node 1" in ASSET_KEYS[asset] else None,
+        "Node 2": df["Node 2"].to_numpy() if "Node 2" in ASSET_KEYS[asset] else None,
+        "Node": df["Node"].to_numpy() if "Node" in ASSET_KEYS[asset] else None,
+        "ID": df[ASSET_ID_COLUMNS[asset]].to_numpy(),
+    }, index=pd.RangeIndex(len(df)), columns=CHANGE_COLUMNS)
+
+
+def diff_networks(old_assets: Dict[str, pd.DataFrame], new_assets: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Compare every asset table of two releases.
+
+    :param old_assets: Result of read_network_assets for the old release.
+    :param new_assets: Result of read_network_assets for the new release.
+    :return: DataFrame with the CHANGE_COLUMNS.
+    """
+    return pd.concat([
+        diff_assets(old_assets.get(asset, pd.DataFrame()), new_assets.get(asset, pd.DataFrame()), asset)
+        for asset in ASSET_KEYS
+    ], ignore_index=True)
+
+
+def summarise_changes(changes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count the added, removed and changed assets per asset type.
+
+    :param changes: Result of diff_networks.
+    :return: DataFrame indexed by asset type with one column per change type.
+    """
+    assets = changes.drop_duplicates(["Asset", "Change", "Sheet_Name", "Node 1", "Node 2", "Node", "ID"])
+    summary = assets.groupby(["Asset", "Change"]).size().unstack("Change", fill_value=0)
+    return summary.reindex(index=list(ASSET_KEYS), columns=[ADDED, REMOVED, CHANGED], fill_value=0)
+
+
+def compare_workbooks(old_file_path: str, new_file_path: str, tags=None, year: Optional[int] = None,
+                      excel_reader: str = EXCEL_READER) -> pd.DataFrame:
+    """
+    Compare the network assets of two workbooks.
+
+    :param old_file_path: Old ETYS Appendix B workbook.
+    :param new_file_path: New ETYS Appendix B workbook.
+    :param tags: TO tags to include (all if None).
+    :param year: If given, compare the assets in service in that year.
+    :param excel_reader: Excel reader engine.
+    :return: DataFrame with the CHANGE_COLUMNS.
+    """
+    changes = diff_networks(read_network_assets(old_file_path, tags, year, excel_reader),
+                            read_network_assets(new_file_path, tags, year, excel_reader))
+    for asset, row in summarise_changes(changes).iterrows():
+        logger.info(f"{asset}: {row[ADDED]} added, {row[REMOVED]} removed, {row[CHANGED]} changed.")
+    return changes
+
+
+def write_network_diff(changes: pd.DataFrame, output_path: str) -> None:
+    """
+    Write the summary and the changes to a workbook.
+
+    :param changes: Result of diff_networks.
+    :param output_path: Path of the workbook (written atomically).
+    """
+    with atomic_path(output_path) as temporary, pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
+        summarise_changes(changes).to_excel(writer, sheet_name="Summary")
+        changes.to_excel(writer, sheet_name="Changes", index=False)
+    logger.info(f"Network diff saved to {output_path}.")
@@ -0,0 +1,138 @@
+"""
+Builds the nodal balance table: generation, interconnector and demand aggregated per ETYS node.
+
+Once ETYS_Node has been assigned, the TEC register, IC register and demand rows are grouped per node and
+pivoted into one node x category matrix keyed to all_nodes_df:
+  - "Generation - <Plant Type>" (MW_Capacity summed by Plant Type) and "Generation Total"
+  - "IC Import" / "IC Export" (MW_Import_Capacity / MW_Export_Capacity)
+  - "Demand - <type>" (demand value summed by FES type) and "Demand Total"
+
+Every node in all_nodes_df gets a row (zeros where nothing is connected). Rows whose ETYS_Node is missing or is
+not in all_nodes_df are listed in a separate unmatched table instead of being dropped silently.
+
+With a demand allocation (see demand_allocation), demand is distributed over the allocated nodes instead of being
+placed on each row's ETYS_Node; GSPs without any candidate node are reported as unmatched.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional
+from src.data_processing.demand_allocation import DemandAllocation, allocate_demand
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = "Generation - "
+DEMAND_PREFIX = "Demand - "
+GENERATION_TOTAL = "Generation Total"
+DEMAND_TOTAL = "Demand Total"
+IC_IMPORT = "IC Import"
+IC_EXPORT = "IC Export"
+
+UNMATCHED_COLUMNS: List[str] = ["Source", "Name", "Lookup Key", "ETYS_Node", "Category", "MW"]
+
+
+def _contributions(tec_df: pd.DataFrame, ic_df: pd.DataFrame, demand_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Stack the register and demand rows into a single long table of (node, category, MW) contributions.
+
+    :param tec_df: TEC register with ETYS_Node, Plant Type and MW_Capacity columns.
+    :param ic_df: IC register with ETYS_Node, MW_Import_Capacity and MW_Export_Capacity columns.
+    :param demand_df: Demand data with ETYS_Node, type and value columns.
+    :return: Long DataFrame with Source, Name, Lookup Key, ETYS_Node, Category and MW columns.
+    """
+    def column(df: pd.DataFrame, name: str) -> pd.Series:
+        return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+    parts = []
+    if not tec_df.empty and "MW_Capacity" in tec_df.columns:
+        parts.append(pd.DataFrame({
+            "Source": "TEC Register",
+            "Name": column(tec_df, "Project Name"),
+            "Lookup Key": column(tec_df, "Node_Name"),
+            "ETYS_Node": column(tec_df, "ETYS_Node"),
+            "Category": GENERATION_PREFIX + column(tec_df, "Plant Type").fillna("Unknown").astype(str),
+            "MW": pd.to_numeric(tec_df["MW_Capacity"], errors="coerce"),
+        }))
+    for capacity_col, category in (("MW_Import_Capacity", IC_IMPORT), ("MW_Export_Capacity", IC_EXPORT)):
+        if not ic_df.empty and capacity_col in ic_df.columns:
+            parts.append(pd.DataFrame({
+                "Source": "IC Register",
+                "Name": column(ic_df, "Project Name"),
+                "Lookup Key": column(ic_df, "Node_Name"),
+                "ETYS_Node": column(ic_df, "ETYS_Node"),
+                "Category": category,
+                "MW": pd.to_numeric(ic_df[capacity_col], errors="coerce"),
+            }))
+    if not demand_df.empty and "value" in demand_df.columns:
+        parts.append(pd.DataFrame({
+            "Source": "Demand",
+            "Name": column(demand_df, "GSP"),
+            "Lookup Key": column(demand_df, "GSP"),
+            "ETYS_Node": column(demand_df, "ETYS_Node"),
+            "Category": DEMAND_PREFIX + column(demand_df, "type").astype(str),
+            "MW": pd.to_numeric(demand_df["value"], errors="coerce"),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=UNMATCHED_COLUMNS)
+    long_df = pd.concat(parts, ignore_index=True)
+    long_df["MW"] = long_df["MW"].fillna(0.0)
+    return long_df
+
+
+def _ordered_categories(categories: pd.Index) -> List[str]:
+    """Order balance columns as generation by plant type, IC import/export, then demand by type."""
+    generation = sorted(c for c in categories if c.startswith(GENERATION_PREFIX))
+    demand = sorted(c for c in categories if c.startswith(DEMAND_PREFIX))
+    ic = [c for c in (IC_IMPORT, IC_EXPORT) if c in categories]
+    return generation + ic + demand
+
+
+def build_nodal_balance(nodes_df: pd.DataFrame,
+                        tec_df: pd.DataFrame,
+                        ic_df: pd.DataFrame,
+                        demand_df: pd.DataFrame,
+                        demand_allocation: Optional[DemandAllocation] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Aggregate generation, interconnector and demand capacity per ETYS node.
+
+    :param nodes_df: DataFrame containing network node data with a 'Node' column (all_nodes_df).
+    :param tec_df: TEC register with ETYS_Node assigned.
+    :param ic_df: IC register with ETYS_Node assigned.
+    :param demand_df: Demand data with ETYS_Node assigned.
+    :param demand_allocation: Optional GSP x node allocation of the demand (replaces the ETYS_Node of each row).
+    :return: Dictionary with 'nodal_balance' (one row per node in nodes_df, one column per category, MW) and
+        'unmatched' (rows whose ETYS_Node is missing or not in nodes_df).
+    """
+    node_values = nodes_df["Node"].astype(str) if "Node" in nodes_df.columns else []
+    nodes = pd.Index(node_values, name="Node")
+    if demand_allocation is not None and not demand_df.empty:
+        node_demand, unallocated = allocate_demand(demand_df, demand_allocation)
+        demand_df = pd.concat([node_demand, unallocated], ignore_index=True)
+    long_df = _contributions(tec_df, ic_df, demand_df)
+
+    matched = long_df["ETYS_Node"].isin(nodes)
+    unmatched_df = long_df.loc[~matched, UNMATCHED_COLUMNS].reset_index(drop=True)
+
+    balance = (
+        long_df[matched]
+        .groupby(["ETYS_Node", "Category"], sort=False)["MW"].sum()
+        .unstack("Category", fill_value=0.0)
+    )
+    balance = balance.reindex(index=nodes, columns=_ordered_categories(balance.columns), fill_value=0.0)
+    generation_cols = [c for c in balance.columns if c.startswith(GENERATION_PREFIX)]
+    demand_cols = [c for c in balance.columns if c.startswith(DEMAND_PREFIX)]
+    balance[GENERATION_TOTAL] = balance[generation_cols].sum(axis=1)
+    balance[DEMAND_TOTAL] = balance[demand_cols].sum(axis=1)
+    balance.columns.name = None
+    balance = balance.reset_index()
+
+    if not unmatched_df.empty:
+        summary = unmatched_df.groupby("Source")["MW"].agg(["size", "sum"])
+        for source, row in summary.iterrows():
+            logger.warning(f"⚠️ {int(row['size'])} {source} rows ({row['sum']:.1f} MW) not matched to a network node.")
+    logger.info(f"Nodal balance built for {len(balance)} nodes and {len(balance.columns) - 1} categories.")
+    return {"nodal_balance": balance, "unmatched": unmatched_df}
@@ -0,0 +1,246 @@
+"""
+Node attribute table shared by every stage that needs to reason about ETYS node names.
+
+ETYS node names encode the site in the first 4 characters and the voltage level in the 5th character
+(see VOLTAGE_MAPPING). Instead of re-slicing node names row by row, the attributes are derived once per node list
+into a table (site code, 5-character prefix, voltage digit, kV, TO, coordinates, transmission flag) and consumers
+join against it. The ETYS_Node resolution cascade used for plant and demand (exact -> 5 characters -> 4 characters)
+is implemented here on top of that table, with resolutions remembered across runs (see node_match_memo.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Optional
+
+from src.config import RESULT_CACHE_SIZE
+from src.data_processing.cache import ResultCache
+from src.data_processing.implementations import timed_stage, use_reference
+from src.data_processing.node_match_memo import ANY_CAPACITY, HIGH_CAPACITY, LOW_CAPACITY, node_match_memo
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Mapping for deriving voltage based on a digit in the node name.
+VOLTAGE_MAPPING: Dict[str, str] = {
+    "1": "132",
+    "2": "275",
+    "3": "33",
+    "4": "400",
+    "5": "11",
+    "6": "66",
+    "7": "25",
+    "8": "22",
+}
+
+# Voltage digits of transmission-level (275kV / 400kV) nodes.
+TRANSMISSION_VOLTAGE_DIGITS = ("2", "4")
+
+SITE_CODE_LENGTH = 4
+VOLTAGE_DIGIT_POSITION = 4
+
+NODE_ATTRIBUTE_COLUMNS = [
+    "Node", "Site Code", "Prefix5", "Voltage Digit", "Voltage (kV)", "Relevant TO",
+    "latitude", "longitude", "Is Transmission", "Node Order",
+]
+
+_NODE_ATTRIBUTE_CACHE = ResultCache("node attributes", maxsize=RESULT_CACHE_SIZE)
+
+
+@lru_cache(maxsize=None)
+def derive_voltage(node_name: str) -> str:
+    """
+    Derive a voltage (in kV) value from the node name based on the digit in the 5th character (note this may not work for OFTO sheets due to naming inconsistencies!).
+
+    :param node_name: The node name string.
+    :return: The derived voltage or 'Unknown' if not applicable.
+    """
+    if len(node_name) >= 5 and node_name[4].isdigit():
+        return VOLTAGE_MAPPING.get(node_name[4], "Unknown")
+    return "Unknown"
+
+
+def site_codes(nodes: pd.Series) -> pd.Series:
+    """
+    Return the 4-character site code of each node name.
+
+    :param nodes: Series of node names.
+    :return: Series of site codes aligned with the input.
+    """
+    return nodes.astype(str).str.strip().str[:SITE_CODE_LENGTH]
+
+
+def node_list_key(nodes_df: pd.DataFrame) -> str:
+    """
+    Hash the node list (and the attribute source columns present) so tables can be cached per node list.
+
+    :param nodes_df: DataFrame with a 'Node' column.
+    :return: Hex digest identifying the node list.
+    """
+    cols = [col for col in ("Node", "Relevant TO", "latitude", "longitude") if col in nodes_df.columns]
+    hashes = pd.util.hash_pandas_object(nodes_df[cols], index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes() + "|".join(cols).encode(), digest_size=16).hexdigest()
+
+
+def build_node_attribute_table(nodes_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build (or fetch from cache) the attribute table for a node list.
+
+    Columns:
+      - Node, Site Code (first 4 characters), Prefix5 (first 5 characters)
+      - Voltage Digit (5th character if numeric), Voltage (kV) (via VOLTAGE_MAPPING, NaN if unknown)
+      - Relevant TO, latitude, longitude (copied from nodes_df when present)
+      - Is Transmission (voltage digit is 2 or 4, i.e. 275/400kV)
+      - Node Order (position in nodes_df, used to keep "first match" semantics)
+
+    :param nodes_df: DataFrame containing network node data with a 'Node' column (e.g. all_nodes_df).
+    :return: Node attribute table, one row per node in nodes_df order.
+    """
+    return _NODE_ATTRIBUTE_CACHE.get_or_compute(node_list_key(nodes_df), lambda: _build_node_attribute_table(nodes_df))
+
+
+def _build_node_attribute_table(nodes_df: pd.DataFrame) -> pd.DataFrame:
+    nodes = nodes_df["Node"].astype(str).str.strip().reset_index(drop=True)
+    digit = nodes.str[VOLTAGE_DIGIT_POSITION]
+    digit = digit.where(digit.str.isdigit().fillna(False).astype(bool))
+    table = pd.DataFrame({
+        "Node": nodes,
+        "Site Code": nodes.str[:SITE_CODE_LENGTH],
+        "Prefix5": nodes.str[:5],
+        "Voltage Digit": digit,
+        "Voltage (kV)": pd.to_numeric(digit.map(VOLTAGE_MAPPING), errors="coerce"),
+    })
+    for col in ("Relevant TO", "latitude", "longitude"):
+        table[col] = nodes_df[col].to_numpy() if col in nodes_df.columns else np.nan
+    table["Is Transmission"] = digit.isin(TRANSMISSION_VOLTAGE_DIGITS)
+    table["Node Order"] = np.arange(len(table))
+    return table[NODE_ATTRIBUTE_COLUMNS]
+
+
+def site_candidates(attributes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarise the candidate nodes of each site for 4-character matching.
+
+    :param attributes: Node attribute table.
+    :return: DataFrame indexed by Site Code with the first node overall ('first'), the first 275/400kV node
+        ('first_transmission') and the first lower-voltage node ('first_distribution'), in node order.
+    """
+    ordered = attributes.sort_values("Node Order")
+    first = ordered.drop_duplicates("Site Code").set_index("Site Code")["Node"]
+    first_tx = ordered[ordered["Is Transmission"]].drop_duplicates("Site Code").set_index("Site Code")["Node"]
+    first_dx = ordered[~ordered["Is Transmission"]].drop_duplicates("Site Code").set_index("Site Code")["Node"]
+    return pd.DataFrame({"first": first, "first_transmission": first_tx, "first_distribution": first_dx})
+
+
+def resolve_etys_nodes(keys: pd.Series,
+                       nodes_df: pd.DataFrame,
+                       capacities: Optional[pd.Series] = None,
+                       gen_capacity_for_transmission: Optional[float] = None) -> pd.Series:
+    """
+    Resolve names (TEC/IC Node_Name or demand GSP) to ETYS nodes with the exact -> 5-char -> 4-char cascade.
+
+    1) An exact match on the node name.
+    2) Otherwise the first node whose first 5 characters match.
+    3) Otherwise a node at the same 4-character site. If capacities are given, sites with several nodes prefer a
+       275/400kV node when the capacity exceeds gen_capacity_for_transmission and a lower-voltage node otherwise
+       (falling back to the first node of the site); without capacities the first node of the site is used.
+
+    Keys already resolved against the same node list in this or an earlier run are taken from the node match memo
+    with a single join; only new keys go through the cascade.
+
+    :param keys: Names to resolve (blank/NaN resolve to None).
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :param capacities: Optional capacity (MW) per key, aligned with keys.
+    :param gen_capacity_for_transmission: Capacity threshold (MW) used with capacities.
+    :return: Series of resolved node names (None where unmatched), aligned with keys.
+    """
+    with timed_stage("ETYS node matching"):
+        if use_reference():
+            from src.data_processing import reference
+            return reference.resolve_etys_nodes(keys, nodes_df, capacities, gen_capacity_for_transmission)
+        return _memoised_resolve_etys_nodes(keys, nodes_df, capacities, gen_capacity_for_transmission)
+
+
+def _memoised_resolve_etys_nodes(keys: pd.Series, nodes_df: pd.DataFrame, capacities: Optional[pd.Series],
+                                 gen_capacity_for_transmission: Optional[float]) -> pd.Series:
+    memo = node_match_memo()
+    if memo is None:
+        return _resolve_etys_nodes(keys, nodes_df, capacities, gen_capacity_for_transmission)
+    valid = (keys.notna() & (keys.astype(str) != "")).to_numpy()
+    if capacities is None:
+        capacity_class = ANY_CAPACITY
+    else:
+        capacity_class = np.where(capacities.fillna(0).to_numpy() > gen_capacity_for_transmission,
+                                  HIGH_CAPACITY, LOW_CAPACITY)
+    lookups = pd.DataFrame({"lookup_key": keys.astype(str).to_numpy(), "capacity_class": capacity_class})
+    node_list = node_list_key(nodes_df[["Node"]])
+    try:
+        known = memo.entries(node_list)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"⚠️ Node match memo unavailable ({e}); resolving all keys.")
+        return _resolve_etys_nodes(keys, nodes_df, capacities, gen_capacity_for_transmission)
+
+    merged = lookups.merge(known, how="left", on=["lookup_key", "capacity_class"], indicator=True)
+    resolved = pd.Series(merged["etys_node"].to_numpy(), index=keys.index, dtype=object)
+    missing = valid & (merged["_merge"] == "left_only").to_numpy()
+    if missing.any():
+        fresh = _resolve_etys_nodes(keys[missing], nodes_df, None if capacities is None else capacities[missing],
+                                    gen_capacity_for_transmission)
+        resolved[missing] = fresh.to_numpy()
+        new = lookups[missing].assign(etys_node=fresh.to_numpy()).drop_duplicates(["lookup_key", "capacity_class"])
+        try:
+            memo.add(node_list, new)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"⚠️ Could not update the node match memo ({e}).")
+    logger.debug(f"ETYS node matching: {int(valid.sum() - missing.sum())} keys from the memo, "
+                 f"{int(missing.sum())} resolved.")
+    resolved = resolved.where(valid)
+    return resolved.where(resolved.notna(), None)
+
+
+def match_candidates(keys: pd.Series, nodes_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resolve the part of the ETYS_Node cascade that does not depend on capacity: the exact / 5-character match and
+    the candidate nodes of the 4-character site (see site_candidates).
+
+    :param keys: Names to resolve.
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :return: DataFrame aligned with keys with columns 'direct' (exact or 5-character match), 'first',
+        'first_transmission' and 'first_distribution'; NaN where there is no candidate or the key is blank.
+    """
+    attributes = build_node_attribute_table(nodes_df)
+    valid = keys.notna() & (keys.astype(str) != "")
+    names = keys.where(valid).astype(object)
+    text = names.astype(str)
+
+    node_set = pd.Series(attributes["Node"].to_numpy(), index=attributes["Node"].to_numpy())
+    node_set = node_set[~node_set.index.duplicated()]
+    by_prefix5 = attributes.drop_duplicates("Prefix5").set_index("Prefix5")["Node"]
+    candidates = site_candidates(attributes)
+
+    site = text.str[:SITE_CODE_LENGTH]
+    matches = pd.DataFrame({
+        "direct": names.map(node_set).fillna(text.str[:5].map(by_prefix5)),
+        **{col: site.map(candidates[col]) for col in candidates.columns},
+    }, index=keys.index)
+    return matches.where(valid)
+
+
+def _resolve_etys_nodes(keys: pd.Series, nodes_df: pd.DataFrame, capacities: Optional[pd.Series],
+                        gen_capacity_for_transmission: Optional[float]) -> pd.Series:
+    matches = match_candidates(keys, nodes_df)
+    first = matches["first"]
+    if capacities is None:
+        by_site = first
+    else:
+        high = capacities.fillna(0) > gen_capacity_for_transmission
+        preferred = np.where(high, matches["first_transmission"], matches["first_distribution"])
+        by_site = pd.Series(preferred, index=keys.index).fillna(first)
+    resolved = matches["direct"].fillna(by_site)
+    return resolved.astype(object).where(resolved.notna(), None)
@@ -0,0 +1,157 @@
+"""
+Persistent memo of resolved ETYS_Node assignments, shared across runs and processes.
+
+The result of the exact -> 5-char -> 4-char cascade (see node_attributes.resolve_etys_nodes) only depends on the
+node list, the lookup key (Node_Name / GSP) and, for plant, whether the capacity is above the transmission
+threshold. Each resolution is stored in a small SQLite database keyed on (node list hash, lookup key, capacity
+class), including keys that matched nothing. A warm run resolves every key with one join against the entries of
+its node list; only keys never seen before go through the matcher and are then added.
+
+Entries of a node list are loaded from disk once per process and kept in memory; loading them marks the node list
+as used (warm runs included). Entries for the least recently used node lists are pruned so the memo stays small.
+Any SQLite error disables the memo for the call (with a warning) and the keys are resolved by the matcher as
+before.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from src.config import NODE_MATCH_MEMO_NODE_LISTS, NODE_MATCH_MEMO_PATH
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+MEMO_COLUMNS = ["lookup_key", "capacity_class", "etys_node"]
+
+# Capacity classes: no capacity given (demand, single lookups), above or at/below the transmission threshold.
+ANY_CAPACITY = ""
+HIGH_CAPACITY = "high"
+LOW_CAPACITY = "low"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS node_matches (
+    node_list TEXT NOT NULL,
+    lookup_key TEXT NOT NULL,
+    capacity_class TEXT NOT NULL,
+    etys_node TEXT,
+    PRIMARY KEY (node_list, lookup_key, capacity_class)
+);
+CREATE TABLE IF NOT EXISTS node_lists (
+    node_list TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+"""
+
+
+class NodeMatchMemo:
+    """
+    ETYS_Node resolutions stored in an SQLite database.
+
+    :param path: Path of the database (created with its directory if missing).
+    :param max_node_lists: Number of most recently used node lists whose entries are kept.
+    """
+
+    def __init__(self, path: str, max_node_lists: int = NODE_MATCH_MEMO_NODE_LISTS):
+        self.path = path
+        self.max_node_lists = max_node_lists
+        self._entries: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._schema_created = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database; the directory and tables are created on the first connection of the instance."""
+        if self._schema_created:
+            return sqlite3.connect(self.path, timeout=30)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.executescript(_SCHEMA)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._schema_created = True
+        return conn
+
+    def entries(self, node_list: str) -> pd.DataFrame:
+        """
+        Return the stored resolutions for a node list (loading them marks the node list as used).
+
+        :param node_list: Node list hash (see node_attributes.node_list_key).
+        :return: DataFrame with the MEMO_COLUMNS (etys_node is None for keys that matched nothing).
+        """
+        with self._lock:
+            if node_list not in self._entries:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("UPDATE node_lists SET last_used = ? WHERE node_list = ?",
+                                     (time.time(), node_list))
+                    self._entries[node_list] = pd.read_sql_query(
+                        "SELECT lookup_key, capacity_class, etys_node FROM node_matches WHERE node_list = ?",
+                        conn, params=(node_list,),
+                    )
+                finally:
+                    conn.close()
+            return self._entries[node_list]
+
+    def add(self, node_list: str, resolutions: pd.DataFrame) -> None:
+        """
+        Store new resolutions for a node list and prune the least recently used node lists.
+
+        :param node_list: Node list hash.
+        :param resolutions: DataFrame with the MEMO_COLUMNS, one row per (lookup_key, capacity_class).
+        """
+        rows = [(node_list, key, capacity_class, node)
+                for key, capacity_class, node in resolutions[MEMO_COLUMNS].itertuples(index=False, name=None)]
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO node_matches VALUES (?, ?, ?, ?)", rows)
+                    conn.execute("INSERT OR REPLACE INTO node_lists VALUES (?, ?)", (node_list, time.time()))
+                    stale = [row[0] for row in conn.execute(
+                        "SELECT node_list FROM node_lists ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                        (self.max_node_lists,),
+                    )]
+                    for old in stale:
+                        conn.execute("DELETE FROM node_matches WHERE node_list = ?", (old,))
+                        conn.execute("DELETE FROM node_lists WHERE node_list = ?", (old,))
+            finally:
+                conn.close()
+            known = self._entries.get(node_list)
+            frames = [known, resolutions[MEMO_COLUMNS]] if known is not None and not known.empty else \
+                [resolutions[MEMO_COLUMNS]]
+            self._entries[node_list] = pd.concat(frames, ignore_index=True).drop_duplicates(
+                ["lookup_key", "capacity_class"])
+        logger.debug(f"Added {len(rows)} ETYS_Node resolutions to the memo {self.path}.")
+
+    def clear(self) -> None:
+        """Forget the entries loaded into memory (the database is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+
+_MEMOS: Dict[str, NodeMatchMemo] = {}
+_MEMOS_LOCK = threading.Lock()
+
+
+def node_match_memo(path: Optional[str] = NODE_MATCH_MEMO_PATH) -> Optional[NodeMatchMemo]:
+    """
+    Return the process-wide memo for a database path.
+
+    :param path: Database path; None disables the memo.
+    :return: The memo, or None if disabled.
+    """
+    if path is None:
+        return None
+    with _MEMOS_LOCK:
+        if path not in _MEMOS:
+            _MEMOS[path] = NodeMatchMemo(path)
+        return _MEMOS[path]
@@ -0,0 +1,165 @@
+"""
+Safe output writing for concurrent collation runs.
+
+Files are written to a temporary name in the destination directory and moved into place with os.replace, which is
+atomic on the same filesystem, so readers never see a half-written output and a crashed run leaves no partial file
+behind (only a hidden .tmp file, removed when the error propagates). Directory outputs (parquet/csv tables) are
+built in a temporary directory and renamed into place the same way.
+
+Completed runs are recorded in a lock-free manifest: every run writes its own JSON entry
+(<output_dir>/manifest/<run id>.json) atomically, so parallel runs never contend for a shared file, and the
+manifest is read by listing that directory.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+from src.config import MANIFEST_DIR, RunConfig, new_run_id
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Output formats written with pyarrow (the optional `parquet` extra).
+PARQUET_FORMATS = ("parquet", "geoparquet")
+
+
+def _temporary_name(path: str) -> str:
+    """Hidden, unique name next to path that keeps its extension (some writers rely on it)."""
+    directory, base = os.path.split(os.path.abspath(path))
+    stem, extension = os.path.splitext(base)
+    return os.path.join(directory, f".{stem}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp{extension}")
+
+
+def require_pyarrow(file_format: str = "parquet"):
+    """
+    Import pyarrow, which the PARQUET_FORMATS are written with.
+
+    :param file_format: Output format that needs it (for the error message).
+    :return: The pyarrow module (with pyarrow.parquet loaded).
+    :raises ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(f"The {file_format} format requires pyarrow; install the parquet extra with "
+                          "`pip install network-model-data-collation[parquet]` (or `pip install pyarrow`).") from e
+    return pyarrow
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Yield a temporary file path to write instead of path; on success it is moved onto path with os.replace.
+
+    :param path: Final output path (its directory is created if needed).
+    :return: Temporary path to write to.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = _temporary_name(path)
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+@contextmanager
+def atomic_directory(path: str) -> Iterator[str]:
+    """
+    Yield a temporary directory to fill instead of path; on success it is renamed to path.
+
+    An existing directory at path is first renamed aside and removed after the new one is in place, so path only
+    ever holds a complete set of files.
+
+    :param path: Final output directory.
+    :return: Temporary directory to write to.
+    """
+    temporary = _temporary_name(path)
+    os.makedirs(temporary)
+    try:
+        yield temporary
+        previous = None
+        if os.path.exists(path):
+            previous = _temporary_name(path) + ".old"
+            os.replace(path, previous)
+        os.replace(temporary, path)
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
+    finally:
+        if os.path.exists(temporary):
+            shutil.rmtree(temporary, ignore_errors=True)
+
+
+def write_text_atomic(text: str, path: str) -> None:
+    """
+    Write a UTF-8 text file atomically.
+
+    :param text: File contents.
+    :param path: Output path.
+    """
+    with atomic_path(path) as temporary:
+        with open(temporary, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+
+
+def record_completed_run(run_config: RunConfig, files: List[str], started: datetime) -> str:
+    """
+    Add a manifest entry for a completed run.
+
+    :param run_config: Configuration of the run (its run_id names the entry; a new ID is made if it has none).
+    :param files: Output files and directories written by the run.
+    :param started: Start time of the run.
+    :return: Path of the manifest entry.
+    """
+    run_id = run_config.run_id or new_run_id(run_config)
+    entry = {
+        "run_id": run_id,
+        "config_hash": run_config.config_hash(),
+        "started": started.isoformat(timespec="seconds"),
+        "completed": datetime.now().isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "year_of_analysis": run_config.year_of_analysis,
+        "fes_scenario": run_config.fes_scenario,
+        "selected_tags": sorted(run_config.selected_tags),
+        "output_formats": sorted(run_config.output_formats),
+        "files": [os.path.abspath(path) for path in files],
+    }
+    path = os.path.join(run_config.output_dir, MANIFEST_DIR, f"{run_id}.json")
+    write_text_atomic(json.dumps(entry, indent=2), path)
+    logger.info(f"Run {run_id} recorded in the manifest ({path}).")
+    return path
+
+
+def read_manifest(output_dir: str) -> pd.DataFrame:
+    """
+    Read the manifest of completed runs.
+
+    :param output_dir: Output directory the runs wrote to.
+    :return: One row per completed run, ordered by completion time.
+    """
+    manifest_dir = os.path.join(output_dir, MANIFEST_DIR)
+    entries: List[Dict[str, Any]] = []
+    if os.path.isdir(manifest_dir):
+        for name in os.listdir(manifest_dir):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(manifest_dir, name), encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                logger.warning(f"⚠️ Skipping unreadable manifest entry {name}.")
+    manifest = pd.DataFrame(entries)
+    return manifest.sort_values("completed").reset_index(drop=True) if not manifest.empty else manifest
@@ -36,28 +36,33 @@ Additional functionality:
 Optionally, each DataFrame is sorted by "Asset Type" if that column exists.
 """
 
-import pandas as pd
+from __future__ import annotations
+
 import logging
 import sys
-from typing import Dict
-from src.config import (
-    TEC_REGISTER_FILE_PATH,
-    TEC_REGISTER_MAPPING_FILE_PATH,
-    IC_REGISTER_FILE_PATH,
-    IC_REGISTER_MAPPING_FILE_PATH,
-    PLANT_OUTPUT_FILE_PATH,
-    YEAR_OF_ANALYSIS,
-    SELECTED_TAGS,
-    GEN_CAPACITY_FOR_TRANSMISSION
-)
+from typing import Dict, Optional, Set, Tuple
+from src.config import LOG_FORMAT, RunConfig, default_run_config
 
 # Import the network data function to retrieve node information.
 from src.data_processing.network_data import get_network_data
+from src.data_processing.node_attributes import (
+    TRANSMISSION_VOLTAGE_DIGITS, VOLTAGE_DIGIT_POSITION, resolve_etys_nodes
+)
+from src.data_processing import reference
+from src.data_processing.cache import read_csv_cached
+from src.data_processing.diagnostics import HIGH_CAPACITY_LOW_VOLTAGE, NO_NODE_MATCH, Diagnostics
+from src.data_processing.implementations import timed_stage, use_reference
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Capacity columns considered when choosing between 275/400kV and lower-voltage nodes.
+CAPACITY_COLUMNS = ["MW_Capacity", "MW_Import_Capacity", "MW_Export_Capacity"]
+
 
 def load_csv(file_path: str) -> pd.DataFrame:
     """
@@ -66,7 +71,7 @@ def load_csv(file_path: str) -> pd.DataFrame:
     :return: DataFrame containing the file data.
     """
     try:
-        df = pd.read_csv(file_path)
+        df = read_csv_cached(file_path)
         logger.info(f"Loaded {file_path} with {len(df)} rows.")
         return df
     except Exception as e:
@@ -82,8 +87,9 @@ def merge_mapping_with_register(register_df: pd.DataFrame, mapping_df: pd.DataFr
     :param mapping_df: The mapping DataFrame.
     :return: Merged DataFrame with "Node_Name" column added.
     """
-    logger.info(f"Register Columns: {register_df.columns.tolist()}")
-    logger.info(f"Mapping Columns: {mapping_df.columns.tolist()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Register Columns: {register_df.columns.tolist()}")
+        logger.debug(f"Mapping Columns: {mapping_df.columns.tolist()}")
 
     if "Project Number" not in register_df.columns or "Project Number" not in mapping_df.columns:
         logger.warning("❌ 'Project Number' column missing in one of the datasets. Exiting.")
@@ -102,25 +108,32 @@ def merge_mapping_with_register(register_df: pd.DataFrame, mapping_df: pd.DataFr
     logger.info(f"✅ Merged register with mapping file. Final row count: {len(merged_df)}")
     return merged_df
 
-def filter_by_selected_regions(df: pd.DataFrame, df_name: str = "DataFrame") -> pd.DataFrame:
+def filter_by_selected_regions(df: pd.DataFrame, df_name: str = "DataFrame",
+                               selected_tags: Optional[Set[str]] = None) -> pd.DataFrame:
     """
     Filters the provided DataFrame to include rows where 'HOST TO' is in the SELECTED_TAGS list,
     always including 'OFTO' entries by default.
 
     :param df: The DataFrame to filter.
+    :param df_name: Name of the DataFrame used in log messages.
+    :param selected_tags: Selected TO tags; defaults to SELECTED_TAGS in config.py.
     :return: The filtered DataFrame.
     """
+    if selected_tags is None:
+        selected_tags = default_run_config().selected_tags
     if "HOST TO" not in df.columns:
         logger.warning("'HOST TO' column not found in {df_name}. No filtering applied.")
         return df
 
-    tags_to_include = SELECTED_TAGS.union({"OFTO"})
+    tags_to_include = set(selected_tags).union({"OFTO"})
 
-    filtered_df = df[df["HOST TO"].isin(tags_to_include)].copy()
-    logger.info(f"Filtering {df_name}. 'HOST TO' options include: {sorted(df['HOST TO'].unique())}. Dataframe of {len(df)} rows to {len(filtered_df)} rows based on SELECTED_TAGS: {SELECTED_TAGS} + 'OFTO' (by default)")
+    filtered_df = df[df["HOST TO"].isin(tags_to_include)]
+    logger.info(f"Filtering {df_name}. Dataframe of {len(df)} rows to {len(filtered_df)} rows based on SELECTED_TAGS: {set(selected_tags)} + 'OFTO' (by default)")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"{df_name} 'HOST TO' options include: {sorted(df['HOST TO'].dropna().unique())}")
     return filtered_df
 
-def clean_register_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_register_data(df: pd.DataFrame, year_of_analysis: Optional[int] = None) -> pd.DataFrame:
     """
     Cleans and sorts the TEC register DataFrame by adding the MW_Capacity column
     based on specific rules.
@@ -136,34 +149,30 @@ def clean_register_data(df: pd.DataFrame) -> pd.DataFrame:
               ○ Else, MW_Capacity = MW Increase / Decrease.
     - If "Asset Type" exists, the DataFrame is sorted by this column.
     :param df: DataFrame to be cleaned.
+    :param year_of_analysis: Year of analysis; defaults to YEAR_OF_ANALYSIS in config.py.
     :return: Cleaned and sorted DataFrame.
     """
+    if year_of_analysis is None:
+        year_of_analysis = default_run_config().year_of_analysis
     if "MW Effective From" in df.columns:
         df["MW Effective From"] = pd.to_datetime(df["MW Effective From"], errors="coerce")
     else:
         logger.warning("'MW Effective From' column not found in DataFrame. Exiting.")
         sys.exit()
 
-    def compute_mw_capacity(row):
-        effective_year = row["MW Effective From"].year if pd.notnull(row.get("MW Effective From")) else None
-        status = row.get("Project Status", "")
-        stage = row.get("Stage", "")
-
-        if status == "Built":
-            if effective_year is not None and effective_year > YEAR_OF_ANALYSIS:
-                return row.get("MW Connected", None)
-            else:
-                return row.get("Cumulative Total Capacity (MW)", None)
-        else:  # For projects not Built
-            if effective_year is not None and effective_year > YEAR_OF_ANALYSIS:
-                return 0
-            else:
-                if pd.isna(stage) or stage == "":
-                    return row.get("Cumulative Total Capacity (MW)", None)
-                else:
-                    return row.get("MW Increase / Decrease", None)
-
-    df["MW_Capacity"] = df.apply(compute_mw_capacity, axis=1)
+    with timed_stage("capacity rules"):
+        if use_reference():
+            df["MW_Capacity"] = reference.register_mw_capacity(df, year_of_analysis)
+        else:
+            late = _effective_after(df, year_of_analysis)
+            built = _column(df, "Project Status") == "Built"
+            stage = _column(df, "Stage")
+            df["MW_Capacity"] = np.select(
+                [built & late, built, late, stage.isna() | (stage == "")],
+                [_column(df, "MW Connected"), _column(df, "Cumulative Total Capacity (MW)"), 0,
+                 _column(df, "Cumulative Total Capacity (MW)")],
+                default=_column(df, "MW Increase / Decrease"),
+            )
 
     # Optionally sort by "Project Name"
     if "Project Name" in df.columns:
@@ -172,7 +181,7 @@ def clean_register_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def clean_ic_register_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_ic_register_data(df: pd.DataFrame, year_of_analysis: Optional[int] = None) -> pd.DataFrame:
     """
     Cleans and sorts the IC register DataFrame by adding new columns for MW Import and Export capacities.
 
@@ -188,32 +197,33 @@ def clean_ic_register_data(df: pd.DataFrame) -> pd.DataFrame:
                MW_Export_Capacity = MW Export - Increase / Decrease.
     - If "Asset Type" exists, the DataFrame is sorted by this column.
     :param df: DataFrame to be cleaned.
+    :param year_of_analysis: Year of analysis; defaults to YEAR_OF_ANALYSIS in config.py.
     :return: Cleaned and sorted DataFrame.
     """
+    if year_of_analysis is None:
+        year_of_analysis = default_run_config().year_of_analysis
     if "MW Effective From" in df.columns:
         df["MW Effective From"] = pd.to_datetime(df["MW Effective From"], errors="coerce")
     else:
         logger.warning("'MW Effective From' column not found in DataFrame.")
 
-    def compute_ic_capacities(row):
-        effective_year = row["MW Effective From"].year if pd.notnull(row.get("MW Effective From")) else None
-        stage = row.get("Stage", "")
-        # If effective year is available and is greater than YEAR_OF_ANALYSIS, return zeros.
-        if effective_year is not None and effective_year > YEAR_OF_ANALYSIS:
-            return 0, 0
+    with timed_stage("capacity rules"):
+        if use_reference():
+            capacities = reference.ic_register_capacities(df, year_of_analysis)
         else:
-            # When effective year is within the analysis or not provided, use Stage to decide:
-            # If Stage is blank or equals 1, use the total capacities;
-            # otherwise, use the increase/decrease values.
-            if pd.isna(stage) or stage == "" or stage == 1 or stage == "1":
-                return row.get("MW Import - Total", None), row.get("MW Export - Total", None)
-            else:
-                return row.get("MW Import - Increase / Decrease", None), row.get("MW Export - Increase / Decrease", None)
-
-    capacities = df.apply(
-        lambda row: pd.Series(compute_ic_capacities(row), index=["MW_Import_Capacity", "MW_Export_Capacity"]),
-        axis=1
-    )
+            # After year_of_analysis both capacities are 0; otherwise a blank Stage or Stage 1 uses the totals
+            # and later stages use the increase/decrease values.
+            late = _effective_after(df, year_of_analysis)
+            stage = _column(df, "Stage")
+            first_stage = stage.isna() | (stage == "") | (stage == 1) | (stage == "1")
+            capacities = pd.DataFrame({
+                f"MW_{direction}_Capacity": np.select(
+                    [late, first_stage],
+                    [0, _column(df, f"MW {direction} - Total")],
+                    default=_column(df, f"MW {direction} - Increase / Decrease"),
+                )
+                for direction in ("Import", "Export")
+            }, index=df.index)
     df = pd.concat([df, capacities], axis=1)
 
     # Optionally sort by "Asset Type" if the column exists
@@ -223,7 +233,20 @@ def clean_ic_register_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def add_etys_node(df: pd.DataFrame, nodes_df: pd.DataFrame) -> pd.DataFrame:
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Return a column, or an all-missing column if the DataFrame does not have it."""
+    return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+
+def _effective_after(df: pd.DataFrame, year_of_analysis: int) -> pd.Series:
+    """True where 'MW Effective From' (already converted to datetimes) falls after year_of_analysis."""
+    effective = _column(df, "MW Effective From")
+    return pd.Series(pd.to_datetime(effective).dt.year > year_of_analysis, index=df.index)
+
+
+def add_etys_node(df: pd.DataFrame, nodes_df: pd.DataFrame,
+                  gen_capacity_for_transmission: Optional[float] = None,
+                  diagnostics: Optional[Diagnostics] = None, source: str = "Register") -> pd.DataFrame:
     """
     Adds a new column 'ETYS_Node' to the provided DataFrame based on the 'Node_Name' column.
 
@@ -231,162 +254,158 @@ def add_etys_node(df: pd.DataFrame, nodes_df: pd.DataFrame) -> pd.DataFrame:
     1) If 'Node_Name' is not blank and an exact match exists in nodes_df['Node'], assign that value.
     2) Otherwise, if the first 5 characters of 'Node_Name' match the first 5 characters
        of any node in nodes_df, assign that full node name (first match only).
-    3) If still no match is found, check if the first 4 characters match and assign the corresponding node.
+    3) If still no match is found, check if the first 4 characters match and assign the corresponding node,
+       preferring a 275/400kV node (5th digit 2 or 4) if the capacity exceeds gen_capacity_for_transmission
+       and a lower-voltage node otherwise.
+
+    Matching is done for all rows at once against the shared node attribute table (see node_attributes).
+    Projects without a match, and high-capacity projects assigned to a node below 275kV, are recorded in
+    diagnostics.
 
     :param df: The register DataFrame (TEC or IC) with a 'Node_Name' column.
     :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :param gen_capacity_for_transmission: Capacity (MW) above which 275/400kV nodes are preferred;
+        defaults to GEN_CAPACITY_FOR_TRANSMISSION in config.py.
+    :param diagnostics: Collector for unmatched / low-voltage assignments; if None, a summary is logged instead.
+    :param source: Name of the register used in the diagnostics.
     :return: The updated DataFrame with an 'ETYS_Node' column.
     """
+    if gen_capacity_for_transmission is None:
+        gen_capacity_for_transmission = default_run_config().gen_capacity_for_transmission
+    log_summary = diagnostics is None
+    if diagnostics is None:
+        diagnostics = Diagnostics()
+
+    capacity = plant_capacity(df)
+    df["ETYS_Node"] = resolve_etys_nodes(df["Node_Name"], nodes_df, capacity, gen_capacity_for_transmission)
+
+    def column(name: str, mask: pd.Series) -> Optional[pd.Series]:
+        return df.loc[mask, name] if name in df.columns else None
+
+    # No matches at all
+    node_names = df["Node_Name"]
+    unmatched = node_names.notna() & (node_names != "") & df["ETYS_Node"].isna()
+    diagnostics.record(
+        NO_NODE_MATCH, source, project_number=column("Project Number", unmatched),
+        project=column("Project Name", unmatched), node_name=node_names[unmatched], capacity=capacity[unmatched],
+    )
 
-    def lookup_etys_node(row):
-        node_name = row.get("Node_Name")
-        if pd.isna(node_name) or node_name == "":
-            return None
-
-        # First, try exact match
-        exact_matches = nodes_df[nodes_df["Node"] == node_name]
-        if not exact_matches.empty:
-            return exact_matches.iloc[0]["Node"]
-
-        # If no exact match, check first 5 characters
-        node_name_prefix5 = node_name[:5]
-        partial_matches5 = nodes_df[nodes_df["Node"].str[:5] == node_name_prefix5]
-        if not partial_matches5.empty:
-            return partial_matches5.iloc[0]["Node"]
-
-        # If still no match, check first 4 characters
-        node_name_prefix4 = node_name[:4]
-        partial_matches4 = nodes_df[nodes_df["Node"].str[:4] == node_name_prefix4]
-        if not partial_matches4.empty:
-            # Apply advanced selection based on 5th character and capacity
-            capacity = max(
-                row.get("MW_Capacity", 0) or 0,
-                row.get("MW_Import_Capacity", 0) or 0,
-                row.get("MW_Export_Capacity", 0) or 0
-            )
-
-            # Add a column extracting the 5th character as an integer
-            partial_matches4 = partial_matches4.copy()
-            partial_matches4["5th_digit"] = partial_matches4["Node"].str[4].astype(str)
-
-            if capacity > GEN_CAPACITY_FOR_TRANSMISSION:
-                # Prefer 5th digit = 2 or 4
-                first_node = partial_matches4.iloc[0]["Node"]
-                first_node_5th_digit = first_node[4]
-
-                if first_node_5th_digit in ["2", "4"]:
-                    return first_node
-                else:
-                    preferred = partial_matches4[partial_matches4["5th_digit"].isin(["2", "4"])]
-                    if not preferred.empty:
-                        return preferred.iloc[0]["Node"]
-                    else:
-                        return first_node
-            else:
-                # Prefer NOT 2 or 4 if capacity <= GEN_CAPACITY_FOR_TRANSMISSION
-                first_node = partial_matches4.iloc[0]["Node"]
-                first_node_5th_digit = first_node[4]
-
-                if first_node_5th_digit not in ["2", "4"]:
-                    return first_node
-                else:
-                    non_preferred = partial_matches4[~partial_matches4["5th_digit"].isin(["2", "4"])]
-                    if not non_preferred.empty:
-                        return non_preferred.iloc[0]["Node"]
-                    else:
-                        return first_node
-
-        # No matches at all
-        logger.warning(
-            f"⚠️ No ETYS Node match found for Project '{row.get('Project Name', 'Unknown')}', "
-            f"Node_Name '{node_name}'"
-        )
-        return None
-
-    df["ETYS_Node"] = df.apply(lookup_etys_node, axis=1)
-
-    # Check if the 5th digit is problematic for high capacity (>GEN_CAPACITY_FOR_TRANSMISSION)
-    for idx, row in df.iterrows():
-        etys_node = row.get("ETYS_Node")
-        if pd.isna(etys_node) or len(str(etys_node)) < 5:
-            continue  # skip if ETYS_Node is missing or less than 5 digits
-
-        fifth_digit = str(etys_node)[4]
-        capacity = max(
-            row.get("MW_Capacity", 0) or 0,
-            row.get("MW_Import_Capacity", 0) or 0,
-            row.get("MW_Export_Capacity", 0) or 0
-        )
-
-        if capacity > GEN_CAPACITY_FOR_TRANSMISSION and fifth_digit not in ["2", "4"]:
-            logger.warning(
-                f"⚠️ High-capacity project (>{GEN_CAPACITY_FOR_TRANSMISSION}MW) '{row.get('Project Name', 'Unknown')}' "
-                f"assigned to node '{etys_node}' with max capacity={capacity} with 5th digit '{fifth_digit}' not 2 or 4 i.e. not 275 or 400kV."
-            )
+    # Check if the 5th digit is problematic for high capacity (>gen_capacity_for_transmission)
+    assigned = df["ETYS_Node"].astype("string")
+    assigned_digit = assigned.str[VOLTAGE_DIGIT_POSITION]
+    flagged = ((assigned.str.len() >= 5).fillna(False) & (capacity > gen_capacity_for_transmission)
+               & ~assigned_digit.isin(TRANSMISSION_VOLTAGE_DIGITS).fillna(False))
+    diagnostics.record(
+        HIGH_CAPACITY_LOW_VOLTAGE, source, project_number=column("Project Number", flagged),
+        project=column("Project Name", flagged), node_name=node_names[flagged],
+        node=df["ETYS_Node"][flagged], capacity=capacity[flagged],
+        detail=f"Capacity > {gen_capacity_for_transmission}MW; 5th digit '" + assigned_digit[flagged].astype(str)
+        + "' not 2 or 4 (275/400kV)",
+    )
 
+    if log_summary:
+        diagnostics.log_summary()
     return df
-    # add code to:
-    # 2) sort the partial matches such that the highest voltage is picked based on the criteria unless explicitly defined
 
 
-def process_plant_data() -> Dict[str, pd.DataFrame]:
+def plant_capacity(df: pd.DataFrame) -> pd.Series:
     """
-    Process plant data by merging TEC and IC registers with their respective mapping files,
-    cleaning the data (computing capacity columns), adding the ETYS_Node column, and filtering by selected tags.
+    Return the capacity used for node voltage preference: the largest of MW_Capacity, MW_Import_Capacity and
+    MW_Export_Capacity (missing columns/values count as 0).
 
-    :return: Dictionary containing the processed TEC and IC register DataFrames.
+    :param df: TEC or IC register DataFrame.
+    :return: Capacity (MW) per row.
     """
-    logger.info("Processing plant data...")
+    cols = [col for col in CAPACITY_COLUMNS if col in df.columns]
+    if not cols:
+        return pd.Series(0.0, index=df.index)
+    return df[cols].apply(pd.to_numeric, errors="coerce").fillna(0).max(axis=1)
+
 
+def prepare_registers(run_config: RunConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load the TEC and IC registers, merge Node_Name from their mapping files, filter them by the selected tags and
+    compute the capacity columns (everything before the ETYS_Node assignment).
+
+    :param run_config: Run configuration.
+    :return: Tuple of (TEC register, IC register).
+    """
     # Load TEC and IC registers and their mappings.
-    tec_register_df = load_csv(TEC_REGISTER_FILE_PATH)
-    tec_mapping_df = load_csv(TEC_REGISTER_MAPPING_FILE_PATH)
-    ic_register_df = load_csv(IC_REGISTER_FILE_PATH)
-    ic_mapping_df = load_csv(IC_REGISTER_MAPPING_FILE_PATH)
+    tec_register_df = load_csv(run_config.tec_register_file_path)
+    tec_mapping_df = load_csv(run_config.tec_register_mapping_file_path)
+    ic_register_df = load_csv(run_config.ic_register_file_path)
+    ic_mapping_df = load_csv(run_config.ic_register_mapping_file_path)
 
     # Merge Node_Name into registers.
     tec_merged = merge_mapping_with_register(tec_register_df, tec_mapping_df)
     ic_merged = merge_mapping_with_register(ic_register_df, ic_mapping_df)
 
     # Filter by SELECTED_TAGS
-    tec_merged = filter_by_selected_regions(tec_merged, df_name="TEC Register")
-    ic_merged = filter_by_selected_regions(ic_merged, df_name="IC Register")
+    tec_merged = filter_by_selected_regions(tec_merged, df_name="TEC Register", selected_tags=run_config.selected_tags)
+    ic_merged = filter_by_selected_regions(ic_merged, df_name="IC Register", selected_tags=run_config.selected_tags)
 
     # Clean registers (compute MW capacity columns).
-    tec_merged = clean_register_data(tec_merged)
-    ic_merged = clean_ic_register_data(ic_merged)
+    tec_merged = clean_register_data(tec_merged, run_config.year_of_analysis)
+    ic_merged = clean_ic_register_data(ic_merged, run_config.year_of_analysis)
+    return tec_merged, ic_merged
+
+
+def process_plant_data(run_config: Optional[RunConfig] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Process plant data by merging TEC and IC registers with their respective mapping files,
+    cleaning the data (computing capacity columns), adding the ETYS_Node column, and filtering by selected tags.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
+    :return: Dictionary containing the processed TEC and IC register DataFrames and the 'diagnostics' table
+        (projects without an ETYS node match or on a node below 275kV despite their capacity).
+    """
+    run_config = run_config or default_run_config()
+    logger.info("Processing plant data...")
+    tec_merged, ic_merged = prepare_registers(run_config)
 
     # Retrieve network node data from network_data.py.
-    nodes_df = get_network_data().get("all_nodes_df", pd.DataFrame())
+    diagnostics = Diagnostics()
+    nodes_df = get_network_data(run_config).get("all_nodes_df", pd.DataFrame())
 
     if nodes_df.empty:
         logger.warning("Network node data is empty. 'ETYS_Node' column will not be populated.")
     else:
         # Add the ETYS_Node column to both TEC and IC registers.
-        tec_merged = add_etys_node(tec_merged, nodes_df)
-        ic_merged = add_etys_node(ic_merged, nodes_df)
+        tec_merged = add_etys_node(tec_merged, nodes_df, run_config.gen_capacity_for_transmission,
+                                   diagnostics, source="TEC Register")
+        ic_merged = add_etys_node(ic_merged, nodes_df, run_config.gen_capacity_for_transmission,
+                                  diagnostics, source="IC Register")
+        diagnostics.log_summary()
 
-    return {"tec_register": tec_merged, "ic_register": ic_merged}
+    return {"tec_register": tec_merged, "ic_register": ic_merged, "diagnostics": diagnostics.table()}
 
 
 
-def main() -> None:
+def main(run_config: Optional[RunConfig] = None) -> None:
     """
     Main function to process plant data and save the output.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
     """
+    run_config = run_config or default_run_config()
+    plant_output_file_path = run_config.plant_output_file_path
     try:
-        data = process_plant_data()
+        data = process_plant_data(run_config)
 
         # Save output to an Excel file with separate sheets for TEC and IC registers.
-        with pd.ExcelWriter(PLANT_OUTPUT_FILE_PATH, engine="xlsxwriter") as writer:
+        with atomic_path(plant_output_file_path) as temporary, \
+                pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
             data["tec_register"].to_excel(writer, sheet_name="TEC Register", index=False)
             data["ic_register"].to_excel(writer, sheet_name="IC Register", index=False)
+            if not data["diagnostics"].empty:
+                data["diagnostics"].to_excel(writer, sheet_name="Diagnostics", index=False)
 
-        logger.info(f"Plant data processing complete. Output saved to {PLANT_OUTPUT_FILE_PATH}")
+        logger.info(f"Plant data processing complete. Output saved to {plant_output_file_path}")
 
     except Exception as e:
         logger.exception("An error occurred during plant data processing.")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     main()
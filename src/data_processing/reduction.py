@@ -0,0 +1,308 @@
+"""
+Topological and Kron reduction of the bus/branch case built by case_export.
+
+Two optional steps, applied in order:
+  1) Zero-impedance collapse: buses joined by branches with |R + jX| below ZERO_IMPEDANCE_PU (zero length circuits,
+     bus couplers) are merged into one bus (the highest-voltage bus of each group is kept).
+  2) Kron reduction: buses below a chosen kV are eliminated from the network admittance matrix,
+     Y_red = Y_kk - Y_ke Y_ee^-1 Y_ek. The change to Y_kk becomes equivalent branches between the retained
+     boundary buses and shunts at those buses, so the retained network is electrically equivalent at its
+     terminals. Buses that must stay (slack, HVDC terminals) and low-voltage islands with no retained bus are
+     kept.
+
+Plant and demand on removed buses move onto retained buses through a sparse mapping (original bus x retained
+bus weights): a merged bus maps to its group's bus with weight 1; an eliminated bus maps to the boundary buses
+with the DC distribution factors -B_ee^-1 B_eb (each row sums to 1). Demand is split by these weights and
+each generator moves to the bus with the largest weight.
+
+Requires scipy (optional dependency: `pip install scipy`).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional
+from src.data_processing.case_export import BRANCH_COLUMNS, SLACK_BUS, PowerSystemCase
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Branches with |R + jX| below this (per unit) are treated as busbar connections and collapsed.
+ZERO_IMPEDANCE_PU = 1e-4
+
+# Equivalent branches with |Z| above this (per unit) couple the retained buses negligibly and are not written.
+MAX_EQUIVALENT_IMPEDANCE_PU = 1e3
+
+# Mapping weights below this are dropped (and the remaining weights of the row rescaled to sum to 1).
+MIN_MAPPING_WEIGHT = 1e-6
+
+
+@dataclass
+class ReductionResult:
+    """
+    Reduced case and the mapping from the original buses.
+
+    :param case: The reduced case.
+    :param mapping: Long table of (Node, Retained Node, Weight) for every original node.
+    :param report: Node/branch counts before and after, and per-step counts.
+    """
+    case: PowerSystemCase
+    mapping: pd.DataFrame
+    report: Dict[str, int] = field(default_factory=dict)
+
+
+def _require_scipy():
+    try:
+        import scipy.sparse
+        import scipy.sparse.csgraph
+        import scipy.sparse.linalg
+    except ImportError as e:
+        raise ImportError("Network reduction requires scipy; install it with `pip install scipy`.") from e
+    return scipy
+
+
+def _bus_positions(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """0-based bus positions of a bus number column."""
+    return frame[column].to_numpy(dtype=int) - 1
+
+
+def _apply_mapping(case: PowerSystemCase, mapping, keep: np.ndarray, move_shunts: bool,
+                   extra_branches: Optional[pd.DataFrame] = None,
+                   shunt_delta: Optional[np.ndarray] = None) -> PowerSystemCase:
+    """
+    Build the case on the kept buses, moving loads (and optionally shunts) through a sparse mapping.
+
+    :param case: Original case.
+    :param mapping: scipy sparse matrix, original bus position x original bus position (non-zero columns only for
+        kept buses), rows summing to 1.
+    :param keep: Boolean mask of kept buses.
+    :param move_shunts: Whether bus shunts are moved through the mapping (merging) or kept in place (Kron, where
+        the eliminated shunts are already part of shunt_delta).
+    :param extra_branches: Additional branches (original bus numbers) to add.
+    :param shunt_delta: Complex shunt change (per unit) per original bus.
+    :return: The new case with buses renumbered 1..n.
+    """
+    buses = case.buses
+    new_number = np.zeros(len(buses), dtype=int)
+    new_number[keep] = np.arange(1, int(keep.sum()) + 1)
+    target = np.asarray(mapping.argmax(axis=1)).ravel()
+
+    moved = mapping.T @ buses[["Pd", "Qd"]].to_numpy()
+    new_buses = buses.copy()
+    new_buses[["Pd", "Qd"]] = moved
+    if move_shunts:
+        new_buses[["Gs", "Bs"]] = mapping.T @ buses[["Gs", "Bs"]].to_numpy()
+    if shunt_delta is not None:
+        new_buses["Gs"] += shunt_delta.real * 100
+        new_buses["Bs"] += shunt_delta.imag * 100
+    new_buses = new_buses[keep].reset_index(drop=True)
+    new_buses["Bus"] = np.arange(1, len(new_buses) + 1)
+
+    branches = case.branches if extra_branches is None else pd.concat([case.branches, extra_branches],
+                                                                      ignore_index=True)
+    f = new_number[target[_bus_positions(branches, "From Bus")]]
+    t = new_number[target[_bus_positions(branches, "To Bus")]]
+    retained = (f != t) & keep[_bus_positions(branches, "From Bus")] & \
+        keep[_bus_positions(branches, "To Bus")]
+    new_branches = branches.assign(**{"From Bus": f, "To Bus": t})[retained].reset_index(drop=True)
+    bus_names = new_buses["Node"].to_numpy()
+    new_branches["From Node"] = bus_names[new_branches["From Bus"].to_numpy() - 1]
+    new_branches["To Node"] = bus_names[new_branches["To Bus"].to_numpy() - 1]
+    new_branches["Circuit"] = new_branches.groupby(["From Bus", "To Bus"]).cumcount() + 1
+
+    gens = case.generators.copy()
+    gens["Bus"] = new_number[target[_bus_positions(gens, "Bus")]]
+    gens["Node"] = bus_names[gens["Bus"].to_numpy() - 1]
+
+    dc_lines = case.dc_lines.copy()
+    if not dc_lines.empty:
+        dc_lines["From Bus"] = new_number[target[_bus_positions(dc_lines, "From Bus")]]
+        dc_lines["To Bus"] = new_number[target[_bus_positions(dc_lines, "To Bus")]]
+        dc_lines["From Node"] = bus_names[dc_lines["From Bus"].to_numpy() - 1]
+        dc_lines["To Node"] = bus_names[dc_lines["To Bus"].to_numpy() - 1]
+
+    return replace(case, buses=new_buses, branches=new_branches[BRANCH_COLUMNS], generators=gens,
+                   dc_lines=dc_lines)
+
+
+def collapse_zero_impedance(case: PowerSystemCase, tolerance: float = ZERO_IMPEDANCE_PU):
+    """
+    Merge buses joined by (near) zero-impedance branches.
+
+    :param case: The case.
+    :param tolerance: |R + jX| (per unit) at or below which a branch is a busbar connection.
+    :return: Tuple of (reduced case, sparse mapping original bus x original bus position).
+    """
+    scipy = _require_scipy()
+    n_bus = len(case.buses)
+    br = case.branches
+    zero = np.hypot(br["R"].to_numpy(dtype=float), br["X"].to_numpy(dtype=float)) <= tolerance
+    f, t = br["From Bus"].to_numpy()[zero] - 1, br["To Bus"].to_numpy()[zero] - 1
+    graph = scipy.sparse.coo_matrix((np.ones(len(f)), (f, t)), shape=(n_bus, n_bus))
+    _, groups = scipy.sparse.csgraph.connected_components(graph, directed=False)
+
+    ranked = pd.DataFrame({
+        "group": groups,
+        "slack": (case.buses["Type"] == SLACK_BUS).to_numpy(),
+        "kv": case.buses["Base kV"].to_numpy(),
+        "position": np.arange(n_bus),
+    }).sort_values(["group", "slack", "kv", "position"], ascending=[True, False, False, True])
+    representative = ranked.drop_duplicates("group").set_index("group")["position"]
+    target = representative.reindex(groups).to_numpy()
+
+    mapping = scipy.sparse.csr_matrix((np.ones(n_bus), (np.arange(n_bus), target)), shape=(n_bus, n_bus))
+    keep = np.zeros(n_bus, dtype=bool)
+    keep[representative.to_numpy()] = True
+    return _apply_mapping(case, mapping, keep, move_shunts=True), mapping, keep
+
+
+def _branch_admittances(branches: pd.DataFrame):
+    """Series admittance and half line charging (per unit) of each branch."""
+    z = branches["R"].to_numpy(dtype=float) + 1j * branches["X"].to_numpy(dtype=float)
+    y = 1.0 / np.where(np.abs(z) < ZERO_IMPEDANCE_PU, 1j * ZERO_IMPEDANCE_PU, z)
+    return y, 0.5j * branches["B"].to_numpy(dtype=float)
+
+
+def _admittance_matrix(case: PowerSystemCase):
+    """Complex bus admittance matrix (per unit) with line charging and bus shunts."""
+    scipy = _require_scipy()
+    n_bus = len(case.buses)
+    br = case.branches
+    f, t = br["From Bus"].to_numpy() - 1, br["To Bus"].to_numpy() - 1
+    y, half_b = _branch_admittances(br)
+    rows = np.concatenate([f, t, f, t])
+    cols = np.concatenate([f, t, t, f])
+    data = np.concatenate([y + half_b, y + half_b, -y, -y])
+    shunts = (case.buses["Gs"].to_numpy() + 1j * case.buses["Bs"].to_numpy()) / 100
+    return (scipy.sparse.coo_matrix((data, (rows, cols)), shape=(n_bus, n_bus)) + scipy.sparse.diags(shunts)).tocsc()
+
+
+def kron_reduce(case: PowerSystemCase, below_kv: float,
+                max_equivalent_impedance: float = MAX_EQUIVALENT_IMPEDANCE_PU):
+    """
+    Eliminate buses below a voltage level by Kron reduction.
+
+    :param case: The case (zero-impedance branches should already be collapsed).
+    :param below_kv: Buses with base kV strictly below this are eliminated.
+    :param max_equivalent_impedance: Equivalent branches with |Z| above this (per unit) are not written.
+    :return: Tuple of (reduced case, sparse mapping, kept mask, number of equivalent branches).
+    """
+    scipy = _require_scipy()
+    sparse = scipy.sparse
+    buses = case.buses
+    n_bus = len(buses)
+
+    eliminate = buses["Base kV"].to_numpy() < below_kv
+    eliminate &= buses["Type"].to_numpy() != SLACK_BUS
+    for column in ("From Bus", "To Bus"):
+        eliminate[case.dc_lines[column].to_numpy(dtype=int) - 1] = False
+
+    # Low-voltage islands without any retained bus are kept as they are.
+    y_bus = _admittance_matrix(case)
+    _, islands = sparse.csgraph.connected_components(abs(y_bus) > 0, directed=False)
+    islands_with_retained = np.unique(islands[~eliminate])
+    eliminate &= np.isin(islands, islands_with_retained)
+    keep = ~eliminate
+    e_idx, k_idx = np.flatnonzero(eliminate), np.flatnonzero(keep)
+    if not len(e_idx):
+        mapping = sparse.identity(n_bus, format="csr")
+        return case, mapping, keep, 0
+
+    y_ek = y_bus[e_idx][:, k_idx]
+    boundary = np.unique(y_ek.nonzero()[1])
+    b_idx = k_idx[boundary]
+    y_eb = y_ek[:, boundary].toarray()
+
+    # Y_red(bb) - Y_bb = -Y_be Y_ee^-1 Y_eb.
+    z = sparse.linalg.splu(y_bus[e_idx][:, e_idx].tocsc()).solve(y_eb)
+    delta = -(y_bus[b_idx][:, e_idx] @ z)
+
+    # Off-diagonal change -> equivalent branches. The diagonal of the reduced matrix also keeps the terms of the
+    # dropped branches from boundary to eliminated buses; what the equivalent branches do not supply becomes a
+    # shunt at the boundary bus.
+    shunt_delta = np.zeros(n_bus, dtype=complex)
+    shunt_delta[b_idx] = delta.sum(axis=1)
+    y, half_b = _branch_admittances(case.branches)
+    for end, other in (("From Bus", "To Bus"), ("To Bus", "From Bus")):
+        end_pos, other_pos = _bus_positions(case.branches, end), _bus_positions(case.branches, other)
+        dropped = keep[end_pos] & eliminate[other_pos]
+        np.add.at(shunt_delta, end_pos[dropped], y[dropped] + half_b[dropped])
+    upper_i, upper_j = np.triu_indices(len(b_idx), k=1)
+    y_equivalent = -delta[upper_i, upper_j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_equivalent = 1.0 / y_equivalent
+    significant = np.isfinite(z_equivalent) & (np.abs(z_equivalent) <= max_equivalent_impedance)
+    equivalent = pd.DataFrame({
+        "From Bus": b_idx[upper_i[significant]] + 1,
+        "To Bus": b_idx[upper_j[significant]] + 1,
+        "R": z_equivalent[significant].real,
+        "X": z_equivalent[significant].imag,
+        "B": 0.0, "Rate A": 0.0, "Rate B": 0.0, "Rate C": 0.0, "Is Transformer": False,
+    })
+
+    # DC distribution factors -B_ee^-1 B_eb move injections at eliminated buses onto the boundary buses.
+    b_bus = -y_bus.imag
+    b_bus = b_bus - sparse.diags(np.asarray(b_bus.sum(axis=1)).ravel())  # drop shunts, keep series terms
+    weights = sparse.linalg.splu(b_bus[e_idx][:, e_idx].tocsc()).solve(-b_bus[e_idx][:, b_idx].toarray())
+    weights[weights < MIN_MAPPING_WEIGHT] = 0.0
+    weights /= np.where(weights.sum(axis=1, keepdims=True) > 0, weights.sum(axis=1, keepdims=True), 1.0)
+    rows, cols = np.nonzero(weights)
+    mapping = sparse.csr_matrix(
+        (np.concatenate([np.ones(len(k_idx)), weights[rows, cols]]),
+         (np.concatenate([k_idx, e_idx[rows]]), np.concatenate([k_idx, b_idx[cols]]))),
+        shape=(n_bus, n_bus),
+    )
+    reduced = _apply_mapping(case, mapping, keep, move_shunts=False, extra_branches=equivalent,
+                             shunt_delta=shunt_delta)
+    return reduced, mapping, keep, int(significant.sum())
+
+
+def reduce_case(case: PowerSystemCase, below_kv: Optional[float] = None,
+                collapse_zero_impedance_branches: bool = True) -> ReductionResult:
+    """
+    Reduce a case: collapse zero-impedance branches and optionally Kron-reduce buses below a voltage level.
+
+    :param case: The case (see case_export.build_case).
+    :param below_kv: Eliminate buses with base kV below this (e.g. 275 keeps the 275/400kV network); None to only
+        collapse zero-impedance branches.
+    :param collapse_zero_impedance_branches: Whether to merge buses joined by zero-impedance branches.
+    :return: The ReductionResult.
+    """
+    scipy = _require_scipy()
+    n_bus = len(case.buses)
+    report = {"nodes before": n_bus, "branches before": len(case.branches)}
+    mapping = scipy.sparse.identity(n_bus, format="csr")
+    original_nodes = case.buses["Node"].to_numpy()
+    kept_nodes = original_nodes
+
+    if collapse_zero_impedance_branches:
+        case, collapse_mapping, keep = collapse_zero_impedance(case)
+        mapping = collapse_mapping[:, np.flatnonzero(keep)]
+        kept_nodes = kept_nodes[keep]
+        report["nodes merged by zero-impedance collapse"] = n_bus - int(keep.sum())
+
+    if below_kv is not None:
+        n_before = len(case.buses)
+        case, kron_mapping, keep, n_equivalent = kron_reduce(case, below_kv)
+        mapping = (mapping @ kron_mapping)[:, np.flatnonzero(keep)]
+        kept_nodes = kept_nodes[keep]
+        report[f"nodes eliminated below {below_kv:g} kV"] = n_before - int(keep.sum())
+        report["equivalent branches added"] = n_equivalent
+
+    mapping = mapping.tocoo()
+    mapping_df = pd.DataFrame({
+        "Node": original_nodes[mapping.row],
+        "Retained Node": kept_nodes[mapping.col],
+        "Weight": mapping.data,
+    }).sort_values(["Node", "Weight"], ascending=[True, False]).reset_index(drop=True)
+
+    report.update({"nodes after": len(case.buses), "branches after": len(case.branches)})
+    logger.info(
+        f"Network reduced from {report['nodes before']} to {report['nodes after']} nodes and from "
+        f"{report['branches before']} to {report['branches after']} branches."
+    )
+    return ReductionResult(case=case, mapping=mapping_df, report=report)
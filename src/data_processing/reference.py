@@ -0,0 +1,207 @@
+"""
+Reference (row-by-row) implementations of the pipeline hot paths.
+
+These are the original versions of the status/year filter, node compile, ETYS node matching and capacity rules
+that the accelerated implementations replace. They are kept unchanged in behaviour so that verification mode
+(see verification.py) can check the accelerated outputs against them; the pipeline only calls them while
+use_implementation(REFERENCE) is active.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Set
+from src.config import SHEET_ASSOCIATIONS
+from src.data_processing.node_attributes import TRANSMISSION_VOLTAGE_DIGITS, derive_voltage
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def filter_data_based_on_status_and_year(df: pd.DataFrame, year: int, is_reactive: bool = False) -> pd.DataFrame:
+    """
+    Filter rows based on 'Status' and 'Year' columns, one row at a time.
+
+    :param df: The DataFrame to filter.
+    :param year: The target year for analysis.
+    :param is_reactive: Whether the DataFrame is reactive data (affects column selection).
+    :return: Filtered DataFrame.
+    """
+    filtered_rows = []
+    for _, row in df.iterrows():
+        status = row.get("Status")
+        row_year = row.get("Year")
+        # Include row if Status or Year is missing.
+        if pd.isna(status) or pd.isna(row_year):
+            filtered_rows.append(row)
+            continue
+        # Exclude rows beyond the target year.
+        if row_year > year:
+            continue
+        if status == "Addition":
+            filtered_rows.append(row)
+        elif status in ("Removed", "Change"):
+            if is_reactive:
+                filtered_rows = [r for r in filtered_rows if r.get("Node") != row.get("Node")]
+            else:
+                filtered_rows = [
+                    r for r in filtered_rows
+                    if (r.get("Node 1"), r.get("Node 2")) != (row.get("Node 1"), row.get("Node 2"))
+                ]
+            if status == "Change":
+                filtered_rows.append(row)
+    return pd.DataFrame(filtered_rows, columns=df.columns)
+
+
+def compile_node_info(*dfs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compile a unique, sorted list of nodes with derived voltage, sheet names and relevant TOs, row by row.
+
+    :param dfs: DataFrames to compile node information from.
+    :return: A DataFrame containing node info.
+    """
+    node_info: Dict[str, Set[str]] = {}  # Map node -> set of sheet names
+    for df in dfs:
+        if "Sheet_Name" not in df.columns:
+            continue
+        for col in ["Node 1", "Node 2", "Node"]:
+            if col in df.columns:
+                for _, row in df.iterrows():
+                    node_val = row.get(col)
+                    if pd.isna(node_val):
+                        continue
+                    node_val = str(node_val).strip()
+                    sheet_name = row.get("Sheet_Name")
+                    if not sheet_name:
+                        continue
+                    node_info.setdefault(node_val, set()).add(sheet_name)
+    data = []
+    for node, sheets in node_info.items():
+        sheet_list = sorted(sheets)
+        relevant_to_set = {SHEET_ASSOCIATIONS.get(s[-1], "Unknown") for s in sheet_list if s}
+        data.append({
+            "Node": node,
+            "Voltage (Derived)": derive_voltage(node),
+            "Sheet Names": ", ".join(sheet_list),
+            "Relevant TO": ", ".join(sorted(relevant_to_set))
+        })
+    # Include nodes that might not have any associated sheet info.
+    nodes_already = set(node_info.keys())
+    for df in dfs:
+        for col in ["Node 1", "Node 2", "Node"]:
+            if col in df.columns:
+                for node_val in df[col].dropna().unique():
+                    node_val = str(node_val).strip()
+                    if node_val not in nodes_already:
+                        data.append({
+                            "Node": node_val,
+                            "Voltage (Derived)": derive_voltage(node_val),
+                            "Sheet Names": "",
+                            "Relevant TO": ""
+                        })
+                        nodes_already.add(node_val)
+    nodes_df = pd.DataFrame(data, columns=["Node", "Voltage (Derived)", "Sheet Names", "Relevant TO"])
+    return nodes_df.sort_values("Node").reset_index(drop=True)
+
+
+def resolve_etys_nodes(keys: pd.Series,
+                       nodes_df: pd.DataFrame,
+                       capacities: Optional[pd.Series] = None,
+                       gen_capacity_for_transmission: Optional[float] = None) -> pd.Series:
+    """
+    Resolve names to ETYS nodes (exact -> 5-char -> 4-char cascade) by filtering nodes_df once per key.
+
+    :param keys: Names to resolve (blank/NaN resolve to None).
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :param capacities: Optional capacity (MW) per key, aligned with keys.
+    :param gen_capacity_for_transmission: Capacity threshold (MW) used with capacities.
+    :return: Series of resolved node names (None where unmatched), aligned with keys.
+    """
+    def lookup(node_name, capacity) -> Optional[str]:
+        if pd.isna(node_name) or node_name == "":
+            return None
+        node_name = str(node_name)
+
+        exact_matches = nodes_df[nodes_df["Node"] == node_name]
+        if not exact_matches.empty:
+            return exact_matches.iloc[0]["Node"]
+
+        partial_matches5 = nodes_df[nodes_df["Node"].str[:5] == node_name[:5]]
+        if not partial_matches5.empty:
+            return partial_matches5.iloc[0]["Node"]
+
+        partial_matches4 = nodes_df[nodes_df["Node"].str[:4] == node_name[:4]]
+        if partial_matches4.empty:
+            return None
+        first_node = partial_matches4.iloc[0]["Node"]
+        if capacity is None:
+            return first_node
+        fifth_digit = partial_matches4["Node"].str[4].astype(str)
+        if capacity > gen_capacity_for_transmission:
+            if first_node[4] in TRANSMISSION_VOLTAGE_DIGITS:
+                return first_node
+            preferred = partial_matches4[fifth_digit.isin(TRANSMISSION_VOLTAGE_DIGITS)]
+        else:
+            if first_node[4] not in TRANSMISSION_VOLTAGE_DIGITS:
+                return first_node
+            preferred = partial_matches4[~fifth_digit.isin(TRANSMISSION_VOLTAGE_DIGITS)]
+        return preferred.iloc[0]["Node"] if not preferred.empty else first_node
+
+    if capacities is None:
+        values = [lookup(key, None) for key in keys]
+    else:
+        values = [lookup(key, 0 if pd.isna(capacity) else capacity) for key, capacity in zip(keys, capacities)]
+    return pd.Series(values, index=keys.index, dtype=object)
+
+
+def register_mw_capacity(df: pd.DataFrame, year_of_analysis: int) -> pd.Series:
+    """
+    Compute the TEC register MW_Capacity column one row at a time (see plant_data.clean_register_data).
+
+    :param df: TEC register with 'MW Effective From' already converted to datetimes.
+    :param year_of_analysis: Year of analysis.
+    :return: MW_Capacity per row.
+    """
+    def compute_mw_capacity(row):
+        effective_year = row["MW Effective From"].year if pd.notnull(row.get("MW Effective From")) else None
+        status = row.get("Project Status", "")
+        stage = row.get("Stage", "")
+
+        if status == "Built":
+            if effective_year is not None and effective_year > year_of_analysis:
+                return row.get("MW Connected", None)
+            else:
+                return row.get("Cumulative Total Capacity (MW)", None)
+        else:  # For projects not Built
+            if effective_year is not None and effective_year > year_of_analysis:
+                return 0
+            else:
+                if pd.isna(stage) or stage == "":
+                    return row.get("Cumulative Total Capacity (MW)", None)
+                else:
+                    return row.get("MW Increase / Decrease", None)
+
+    return df.apply(compute_mw_capacity, axis=1)
+
+
+def ic_register_capacities(df: pd.DataFrame, year_of_analysis: int) -> pd.DataFrame:
+    """
+    Compute the IC register MW_Import_Capacity and MW_Export_Capacity columns one row at a time
+    (see plant_data.clean_ic_register_data).
+
+    :param df: IC register with 'MW Effective From' already converted to datetimes.
+    :param year_of_analysis: Year of analysis.
+    :return: DataFrame with the two capacity columns.
+    """
+    def compute_ic_capacities(row):
+        effective_year = row["MW Effective From"].year if pd.notnull(row.get("MW Effective From")) else None
+        stage = row.get("Stage", "")
+        if effective_year is not None and effective_year > year_of_analysis:
+            return 0, 0
+        if pd.isna(stage) or stage == "" or stage == 1 or stage == "1":
+            return row.get("MW Import - Total", None), row.get("MW Export - Total", None)
+        return row.get("MW Import - Increase / Decrease", None), row.get("MW Export - Increase / Decrease", None)
+
+    return df.apply(
+        lambda row: pd.Series(compute_ic_capacities(row), index=["MW_Import_Capacity", "MW_Export_Capacity"]),
+        axis=1
+    )
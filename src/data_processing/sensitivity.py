@@ -0,0 +1,233 @@
+"""
+DC sensitivity factors (PTDF and LODF) for the collated network.
+
+The DC susceptance matrix is built from X (% on 100MVA) of the filtered circuits and transformers (via the
+bus/branch model of case_export). Each island gets its own slack bus, the reduced matrix (block diagonal over the
+islands) is factorised once with a sparse LU, and:
+  - PTDF[l, n]: MW change on branch l per MW injected at node n and withdrawn at the slack of n's island.
+  - LODF[l, k]: share of the pre-outage flow on branch k picked up by branch l when k is switched out
+    (LODF[k, k] = -1; NaN where outaging k splits an island).
+
+Both matrices can be computed for all branches or for a requested subset. Results are saved with
+np.savez_compressed together with the node and branch index maps.
+
+Requires scipy (optional dependency: `pip install scipy`).
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from src.data_processing.case_export import SLACK_BUS, PowerSystemCase, build_case
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+# Branches with |X| below this (zero length / bus couplers) are given this reactance (per unit).
+MIN_REACTANCE_PU = 1e-4
+
+# |1 - PTDF_kk| below this means outaging branch k splits its island.
+ISLANDING_TOLERANCE = 1e-8
+
+
+@dataclass
+class SensitivityResult:
+    """
+    PTDF/LODF matrices and their index maps.
+
+    :param ptdf: PTDF matrix, monitored branches x nodes.
+    :param lodf: LODF matrix, monitored branches x outaged branches (None if not computed).
+    :param nodes: Node name of each PTDF column.
+    :param branches: Label of each monitored branch (PTDF/LODF row), see branch_labels.
+    :param outages: Label of each outaged branch (LODF column).
+    :param islands: Island number of each node.
+    :param slack_nodes: Slack node of each island (indexed by island number).
+    """
+    ptdf: np.ndarray
+    lodf: Optional[np.ndarray]
+    nodes: np.ndarray
+    branches: np.ndarray
+    outages: np.ndarray
+    islands: np.ndarray
+    slack_nodes: np.ndarray
+
+
+def _require_scipy():
+    try:
+        import scipy.sparse
+        import scipy.sparse.csgraph
+        import scipy.sparse.linalg
+    except ImportError as e:
+        raise ImportError("PTDF/LODF calculation requires scipy; install it with `pip install scipy`.") from e
+    return scipy
+
+
+def branch_labels(branches: pd.DataFrame) -> pd.Series:
+    """
+    Label branches as "<Node 1>-<Node 2>-<circuit number>" (circuit numbers count parallel branches).
+
+    :param branches: Branch table of a PowerSystemCase.
+    :return: Series of labels.
+    """
+    return branches["From Node"].astype(str) + "-" + branches["To Node"].astype(str) + "-" + \
+        branches["Circuit"].astype(str)
+
+
+def _select(labels: pd.Series, requested: Optional[Iterable[str]], kind: str) -> np.ndarray:
+    """Positions of the requested branch labels (all branches if None)."""
+    if requested is None:
+        return np.arange(len(labels))
+    requested = list(requested)
+    positions = pd.Index(labels).get_indexer(requested)
+    missing = [label for label, position in zip(requested, positions) if position < 0]
+    if missing:
+        raise KeyError(f"Unknown {kind} branch label(s): {missing[:10]}")
+    return positions
+
+
+def island_slacks(case: PowerSystemCase, islands: np.ndarray) -> np.ndarray:
+    """
+    Choose one slack bus position per island: the case slack bus if it lies in the island, otherwise the first
+    bus of the island at the island's highest base kV.
+
+    :param case: The case.
+    :param islands: Island number of each bus position.
+    :return: Bus position of the slack of each island.
+    """
+    buses = pd.DataFrame({
+        "island": islands,
+        "case_slack": (case.buses["Type"] == SLACK_BUS).to_numpy(),
+        "kv": case.buses["Base kV"].to_numpy(),
+        "position": np.arange(len(islands)),
+    })
+    ranked = buses.sort_values(["island", "case_slack", "kv", "position"], ascending=[True, False, False, True])
+    return ranked.drop_duplicates("island")["position"].to_numpy()
+
+
+def compute_sensitivities(case: PowerSystemCase,
+                          monitored: Optional[Iterable[str]] = None,
+                          outages: Optional[Iterable[str]] = None,
+                          lodf: bool = True) -> SensitivityResult:
+    """
+    Compute PTDF (and optionally LODF) matrices for a case.
+
+    :param case: The case (see case_export.build_case).
+    :param monitored: Labels of the branches to report (rows); all branches if None.
+    :param outages: Labels of the branches to outage (LODF columns); all branches if None.
+    :param lodf: Whether to compute the LODF matrix.
+    :return: The SensitivityResult.
+    """
+    scipy = _require_scipy()
+    sparse = scipy.sparse
+
+    branches = case.branches
+    n_bus, n_branch = len(case.buses), len(branches)
+    labels = branch_labels(branches)
+    monitored_pos = _select(labels, monitored, "monitored")
+    outage_pos = _select(labels, outages, "outage")
+
+    x = branches["X"].to_numpy(dtype=float)
+    small = np.abs(x) < MIN_REACTANCE_PU
+    if small.any():
+        logger.info(f"{int(small.sum())} branches with |X| < {MIN_REACTANCE_PU} pu given X = {MIN_REACTANCE_PU} pu.")
+    x = np.where(small, MIN_REACTANCE_PU, x)
+    b = 1.0 / x
+
+    # Branch-bus incidence matrix and susceptance matrix B = A^T diag(b) A.
+    f = branches["From Bus"].to_numpy() - 1
+    t = branches["To Bus"].to_numpy() - 1
+    rows = np.repeat(np.arange(n_branch), 2)
+    incidence = sparse.csr_matrix(
+        (np.tile([1.0, -1.0], n_branch), (rows, np.column_stack([f, t]).ravel())), shape=(n_branch, n_bus)
+    )
+    bf = sparse.diags(b) @ incidence
+    bbus = (incidence.T @ bf).tocsc()
+
+    n_islands, islands = scipy.sparse.csgraph.connected_components(abs(bbus) > 0, directed=False)
+    slacks = island_slacks(case, islands)
+    keep = np.ones(n_bus, dtype=bool)
+    keep[slacks] = False
+    logger.info(f"DC network has {n_islands} islands; factorising {int(keep.sum())} x {int(keep.sum())} matrix.")
+
+    lu = scipy.sparse.linalg.splu(bbus[keep][:, keep].tocsc())
+
+    # PTDF^T (reduced) = B_red^-1 Bf_red^T for the rows needed (monitored, plus outaged for LODF).
+    needed = np.union1d(monitored_pos, outage_pos) if lodf else monitored_pos
+    rhs = bf[needed][:, keep].T.toarray()
+    ptdf_needed = np.zeros((len(needed), n_bus))
+    if rhs.size:
+        ptdf_needed[:, keep] = lu.solve(rhs).T
+    row_of = pd.Series(np.arange(len(needed)), index=needed)
+    ptdf = ptdf_needed[row_of[monitored_pos].to_numpy()]
+
+    lodf_matrix = None
+    if lodf:
+        # H[l, k] = PTDF[l, from_k] - PTDF[l, to_k]; LODF[l, k] = H[l, k] / (1 - H[k, k]).
+        h_monitored = ptdf[:, f[outage_pos]] - ptdf[:, t[outage_pos]]
+        ptdf_outaged = ptdf_needed[row_of[outage_pos].to_numpy()]
+        h_self = ptdf_outaged[np.arange(len(outage_pos)), f[outage_pos]] - \
+            ptdf_outaged[np.arange(len(outage_pos)), t[outage_pos]]
+        denominator = 1.0 - h_self
+        islanding = np.abs(denominator) < ISLANDING_TOLERANCE
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lodf_matrix = h_monitored / np.where(islanding, np.nan, denominator)
+        same = monitored_pos[:, None] == outage_pos[None, :]
+        lodf_matrix[same] = -1.0
+        if islanding.any():
+            logger.info(f"{int(islanding.sum())} outaged branches split their island (LODF set to NaN).")
+
+    nodes = case.buses["Node"].to_numpy(dtype=str)
+    return SensitivityResult(
+        ptdf=ptdf,
+        lodf=lodf_matrix,
+        nodes=nodes,
+        branches=labels.to_numpy(dtype=str)[monitored_pos],
+        outages=labels.to_numpy(dtype=str)[outage_pos],
+        islands=islands,
+        slack_nodes=nodes[slacks],
+    )
+
+
+def save_sensitivities(result: SensitivityResult, path: str) -> None:
+    """
+    Save a SensitivityResult with np.savez_compressed.
+
+    The archive holds 'ptdf', 'lodf' (if computed) and the index maps 'nodes' (PTDF columns), 'branches'
+    (PTDF/LODF rows), 'outages' (LODF columns), 'islands' (island of each node) and 'slack_nodes'
+    (slack node of each island). Load with np.load(path) (no pickle needed).
+
+    :param result: Result to save.
+    :param path: Output .npz path.
+    """
+    arrays: Dict[str, np.ndarray] = {
+        "ptdf": result.ptdf, "nodes": result.nodes, "branches": result.branches, "outages": result.outages,
+        "islands": result.islands, "slack_nodes": result.slack_nodes,
+    }
+    if result.lodf is not None:
+        arrays["lodf"] = result.lodf
+    if not path.endswith(".npz"):
+        path += ".npz"  # As np.savez_compressed would.
+    with atomic_path(path) as temporary:
+        np.savez_compressed(temporary, **arrays)
+    logger.info(f"Sensitivity matrices saved to {path}.")
+
+
+def network_sensitivities(network_data: Dict[str, object],
+                          monitored: Optional[List[str]] = None,
+                          outages: Optional[List[str]] = None,
+                          lodf: bool = True) -> SensitivityResult:
+    """
+    Compute PTDF/LODF matrices directly from get_network_data output.
+
+    :param network_data: Result of network_data.get_network_data.
+    :param monitored: Labels of the branches to report; all branches if None.
+    :param outages: Labels of the branches to outage; all branches if None.
+    :param lodf: Whether to compute the LODF matrix.
+    :return: The SensitivityResult.
+    """
+    return compute_sensitivities(build_case({"network": network_data}), monitored, outages, lodf)
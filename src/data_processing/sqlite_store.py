@@ -0,0 +1,254 @@
+"""
+Writes the collated network, plant, demand and intra HVDC outputs into a local SQLite database.
+
+Each output table is written once with indexes on the columns analysts filter by (Node, Site Code,
+ETYS_Node and Project Number), so ad hoc lookups such as "all plant at node X" or "all circuits touching
+site Y" are answered by an index seek instead of re-opening the FULL_GRID workbook.
+
+Branch tables (circuits, transformers) carry materialised "Site Code 1"/"Site Code 2" columns and node-based
+tables carry a "Site Code" column (first 4 characters of the node name) so site queries can use an index.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import logging
+from typing import Any, Dict, List, Optional
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# Table layout
+# ============================================================================
+
+NODES_TABLE = "nodes"
+CIRCUITS_TABLE = "circuits"
+TRANSFORMERS_TABLE = "transformers"
+REACTIVE_TABLE = "reactive"
+TEC_REGISTER_TABLE = "tec_register"
+IC_REGISTER_TABLE = "ic_register"
+DEMAND_TABLE = "demand"
+INTRA_HVDC_TABLE = "intra_hvdc"
+HVDC_BRANCHES_TABLE = "hvdc_branches"
+NODAL_BALANCE_TABLE = "nodal_balance"
+NODAL_BALANCE_UNMATCHED_TABLE = "nodal_balance_unmatched"
+DEMAND_ALLOCATION_TABLE = "demand_allocation"
+INPUT_VALIDATION_TABLE = "input_validation"
+DIAGNOSTICS_TABLE = "diagnostics"
+BRANCH_ANOMALIES_TABLE = "branch_anomalies"
+
+# Columns that receive an index whenever they are present in a written table.
+INDEXED_COLUMNS: List[str] = [
+    "Node", "Node 1", "Node 2", "Site Code", "Site Code 1", "Site Code 2", "ETYS_Node", "Project Number"
+]
+
+# Node columns from which a site code column is derived before writing.
+SITE_CODE_SOURCES: Dict[str, str] = {"Node": "Site Code", "Node 1": "Site Code 1", "Node 2": "Site Code 2"}
+
+# Tables whose rows are plant (and therefore carry a Project Number / ETYS_Node).
+PLANT_TABLES: List[str] = [TEC_REGISTER_TABLE, IC_REGISTER_TABLE]
+
+# Tables whose rows are branches between two nodes.
+BRANCH_TABLES: List[str] = [CIRCUITS_TABLE, TRANSFORMERS_TABLE, HVDC_BRANCHES_TABLE]
+
+
+# ============================================================================
+# Writing
+# ============================================================================
+
+def _add_site_code_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add site code columns derived from the node columns present in the DataFrame.
+
+    :param df: DataFrame to extend.
+    :return: DataFrame with "Site Code"/"Site Code 1"/"Site Code 2" columns where applicable.
+    """
+    new_columns = {
+        site_col: df[node_col].astype("string").str.strip().str[:4]
+        for node_col, site_col in SITE_CODE_SOURCES.items()
+        if node_col in df.columns and site_col not in df.columns
+    }
+    return df.assign(**new_columns) if new_columns else df
+
+
+def _quote(identifier: str) -> str:
+    """Quote an SQLite identifier (column names here contain spaces and brackets)."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def write_table(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame) -> None:
+    """
+    Write a DataFrame to a table (replacing any existing table) and index its lookup columns.
+
+    :param conn: Open SQLite connection.
+    :param table_name: Name of the table to write.
+    :param df: DataFrame to write.
+    """
+    df = _add_site_code_columns(df)
+    df.to_sql(table_name, conn, if_exists="replace", index=False)
+    for col in INDEXED_COLUMNS:
+        if col in df.columns:
+            index_name = f"idx_{table_name}_{col.lower().replace(' ', '_')}"
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote(index_name)} ON {_quote(table_name)} ({_quote(col)})")
+    logger.info(f"Wrote {len(df)} rows to SQLite table '{table_name}'.")
+
+
+def write_collated_outputs_to_sqlite(db_path: str,
+                                     tables: Dict[str, pd.DataFrame]) -> str:
+    """
+    Write the collated outputs into a fresh SQLite database file.
+
+    The database is built under a temporary name and then replaces any existing database at db_path in one step,
+    so readers (e.g. an open CollatedStore) never see a partially written file. Empty DataFrames are skipped.
+
+    :param db_path: Path of the SQLite database file to create.
+    :param tables: Mapping of table name (see the *_TABLE constants) to DataFrame.
+    :return: The path of the written database.
+    """
+    with atomic_path(db_path) as temporary:
+        conn = sqlite3.connect(temporary)
+        try:
+            with conn:
+                for table_name, df in tables.items():
+                    if df is None or df.empty:
+                        logger.info(f"Skipping empty SQLite table '{table_name}'.")
+                        continue
+                    write_table(conn, table_name, df)
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+    logger.info(f"SQLite output saved to {db_path}")
+    return db_path
+
+
+# ============================================================================
+# Query API
+# ============================================================================
+
+class CollatedStore:
+    """
+    Read-only query API over a database written by write_collated_outputs_to_sqlite.
+
+    The connection is opened once and kept for the lifetime of the object, so repeated lookups only pay for an
+    index seek. Lookup methods return a list of row dictionaries; use query_frame for a DataFrame.
+    """
+
+    def __init__(self, db_path: str):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite output not found at {db_path}")
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._tables = {
+            row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "CollatedStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def has_table(self, table_name: str) -> bool:
+        """Return True if the table was written to the database."""
+        return table_name in self._tables
+
+    def query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """
+        Run an arbitrary read-only query.
+
+        :param sql: SQL statement (use ? placeholders).
+        :param params: Parameters for the placeholders.
+        :return: List of rows as dictionaries.
+        """
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def query_frame(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        """
+        Run an arbitrary read-only query and return the result as a DataFrame.
+
+        :param sql: SQL statement (use ? placeholders).
+        :param params: Parameters for the placeholders.
+        :return: Query result.
+        """
+        return pd.read_sql_query(sql, self._conn, params=params)
+
+    def _select_where(self, table_name: str, column: str, value: Any) -> List[Dict[str, Any]]:
+        if not self.has_table(table_name):
+            return []
+        return self.query(f"SELECT * FROM {_quote(table_name)} WHERE {_quote(column)} = ?", (value,))
+
+    def node(self, node: str) -> Optional[Dict[str, Any]]:
+        """Return the node record, or None if the node is not in the network."""
+        rows = self._select_where(NODES_TABLE, "Node", node)
+        return rows[0] if rows else None
+
+    def nodes_at_site(self, site_code: str) -> List[Dict[str, Any]]:
+        """Return all nodes belonging to a 4-character site code."""
+        return self._select_where(NODES_TABLE, "Site Code", site_code)
+
+    def plant_at_node(self, node: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return all TEC and IC register entries assigned to an ETYS node.
+
+        :param node: ETYS node name.
+        :return: Dictionary keyed by table name ('tec_register', 'ic_register').
+        """
+        return {table: self._select_where(table, "ETYS_Node", node) for table in PLANT_TABLES}
+
+    def project(self, project_number: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the TEC and IC register entries for a Project Number.
+
+        :param project_number: Project Number (e.g. 'PRO-000285').
+        :return: Dictionary keyed by table name ('tec_register', 'ic_register').
+        """
+        return {table: self._select_where(table, "Project Number", project_number) for table in PLANT_TABLES}
+
+    def branches_at_site(self, site_code: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return all circuits, transformers and HVDC links with either end at the given site.
+
+        :param site_code: 4-character site code.
+        :return: Dictionary keyed by table name ('circuits', 'transformers', 'hvdc_branches').
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for table in BRANCH_TABLES:
+            if not self.has_table(table):
+                result[table] = []
+                continue
+            result[table] = self.query(
+                f'SELECT * FROM {_quote(table)} WHERE "Site Code 1" = ? '
+                f'UNION ALL SELECT * FROM {_quote(table)} WHERE "Site Code 2" = ? AND "Site Code 1" IS NOT ?',
+                (site_code, site_code, site_code)
+            )
+        return result
+
+    def demand_at_node(self, node: str) -> List[Dict[str, Any]]:
+        """Return all demand rows assigned to an ETYS node."""
+        return self._select_where(DEMAND_TABLE, "ETYS_Node", node)
+
+    def demand_by_to(self, value_column: str) -> List[Dict[str, Any]]:
+        """
+        Aggregate demand by the "Relevant TO" of the assigned ETYS node.
+
+        :param value_column: Name of the demand value column to sum.
+        :return: List of rows with "Relevant TO", "type" and the summed value.
+        """
+        if not (self.has_table(DEMAND_TABLE) and self.has_table(NODES_TABLE)):
+            return []
+        return self.query(
+            f'SELECT n."Relevant TO" AS "Relevant TO", d."type" AS "type", SUM(d.{_quote(value_column)}) AS '
+            f'{_quote(value_column)} FROM {_quote(DEMAND_TABLE)} d '
+            f'JOIN {_quote(NODES_TABLE)} n ON n."Node" = d."ETYS_Node" '
+            f'GROUP BY n."Relevant TO", d."type" ORDER BY n."Relevant TO", d."type"'
+        )
@@ -0,0 +1,227 @@
+"""
+Sensitivity of the plant-to-node mapping to the transmission capacity threshold (GEN_CAPACITY_FOR_TRANSMISSION).
+
+A project whose Node_Name only matches an ETYS site on its first 4 characters is placed on a 275/400kV node of the
+site when its capacity exceeds the threshold and on a lower-voltage node otherwise (see
+node_attributes.resolve_etys_nodes). Only that last step depends on the threshold, so the sweep resolves the exact /
+5-character match and the site candidates once (node_attributes.match_candidates) and evaluates every threshold in
+one pass over a projects x thresholds array:
+
+    node[p, t] = direct[p]                 if the name matched exactly or on 5 characters
+               = transmission node[p]      if capacity[p] > threshold[t]
+               = lower-voltage node[p]     otherwise (each falling back to the first node of the site)
+
+The nodal capacity for all thresholds is one bincount over the (node, threshold) codes. Results are compared with
+the baseline threshold (run_config.gen_capacity_for_transmission, always evaluated): the projects that move and the
+capacity each node gains or loses.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from src.config import TRANSMISSION_THRESHOLD_SWEEP, RunConfig
+from src.data_processing.node_attributes import build_node_attribute_table, match_candidates
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+PROJECT_COLUMNS: List[str] = ["Source", "Project Number", "Project Name", "Node_Name", "Capacity (MW)"]
+SHIFT_COLUMNS: List[str] = [
+    "Threshold (MW)", "ETYS_Node", "Voltage (kV)", "Is Transmission", "Capacity (MW)", "Baseline Capacity (MW)",
+    "Shift (MW)",
+]
+SUMMARY_COLUMNS: List[str] = [
+    "Threshold (MW)", "Projects on 275/400kV", "Capacity on 275/400kV (MW)", "Capacity below 275kV (MW)",
+    "Unmatched Capacity (MW)", "Projects Moved", "Capacity Moved (MW)", "High Capacity below 275kV",
+]
+
+
+@dataclass
+class ThresholdSweep:
+    """
+    ETYS_Node assignments of a set of projects for several transmission thresholds.
+
+    :param thresholds: Sorted thresholds (MW), the baseline included.
+    :param baseline: Baseline threshold (MW) the shifts are measured against.
+    :param projects: One row per project with the PROJECT_COLUMNS.
+    :param nodes: Object array of projects x thresholds with the assigned node (None where unmatched).
+    :param node_attributes: Node attribute table of the network (see node_attributes).
+    """
+    thresholds: np.ndarray
+    baseline: float
+    projects: pd.DataFrame
+    nodes: np.ndarray
+    node_attributes: pd.DataFrame
+
+    def _column(self, threshold: float) -> int:
+        position = int(np.searchsorted(self.thresholds, threshold))
+        if position >= len(self.thresholds) or self.thresholds[position] != threshold:
+            raise KeyError(f"Threshold {threshold} was not evaluated (thresholds: {list(self.thresholds)}).")
+        return position
+
+    def assignment(self, threshold: float) -> pd.Series:
+        """
+        Return the ETYS_Node of every project for one threshold.
+
+        :param threshold: An evaluated threshold (MW).
+        :return: Series aligned with projects.
+        """
+        return pd.Series(self.nodes[:, self._column(threshold)], index=self.projects.index, name="ETYS_Node")
+
+    def assignments(self) -> pd.DataFrame:
+        """
+        Return the projects with one ETYS_Node column per threshold.
+
+        :return: DataFrame with the PROJECT_COLUMNS and an "ETYS_Node @ <threshold> MW" column per threshold.
+        """
+        labels = [f"ETYS_Node @ {threshold:g} MW" for threshold in self.thresholds]
+        return pd.concat([self.projects, pd.DataFrame(self.nodes, index=self.projects.index, columns=labels)],
+                         axis=1)
+
+    def nodal_capacity(self) -> pd.DataFrame:
+        """
+        Sum the project capacity per node for every threshold.
+
+        :return: DataFrame of nodes x thresholds (MW), nodes with an assignment at any threshold only.
+        """
+        codes, nodes = pd.factorize(self.nodes.ravel())
+        codes = codes.reshape(self.nodes.shape)
+        capacity = np.broadcast_to(self.projects["Capacity (MW)"].to_numpy(dtype=float)[:, None], codes.shape)
+        assigned = codes >= 0
+        flat = codes[assigned] * len(self.thresholds) + np.nonzero(assigned)[1]
+        totals = np.bincount(flat, weights=capacity[assigned], minlength=len(nodes) * len(self.thresholds))
+        return pd.DataFrame(totals.reshape(len(nodes), len(self.thresholds)), index=pd.Index(nodes, name="ETYS_Node"),
+                            columns=pd.Index(self.thresholds, name="Threshold (MW)"))
+
+    def capacity_shift(self) -> pd.DataFrame:
+        """
+        List, for every threshold, the nodes whose capacity differs from the baseline threshold.
+
+        :return: DataFrame with the SHIFT_COLUMNS (nodes without a shift are left out).
+        """
+        capacity = self.nodal_capacity()
+        baseline = capacity[self.baseline]
+        shift = capacity.sub(baseline, axis=0)
+        moved = shift.stack()
+        moved = moved[moved.abs() > 1e-9].rename("Shift (MW)").reset_index()
+        attributes = self.node_attributes.drop_duplicates("Node").set_index("Node")
+        return pd.DataFrame({
+            "Threshold (MW)": moved["Threshold (MW)"],
+            "ETYS_Node": moved["ETYS_Node"],
+            "Voltage (kV)": attributes["Voltage (kV)"].reindex(moved["ETYS_Node"]).to_numpy(),
+            "Is Transmission": attributes["Is Transmission"].reindex(moved["ETYS_Node"]).to_numpy(),
+            "Capacity (MW)": capacity.to_numpy()[capacity.index.get_indexer(moved["ETYS_Node"]),
+                                                  capacity.columns.get_indexer(moved["Threshold (MW)"])],
+            "Baseline Capacity (MW)": baseline.reindex(moved["ETYS_Node"]).to_numpy(),
+            "Shift (MW)": moved["Shift (MW)"],
+        }, columns=SHIFT_COLUMNS).sort_values(["Threshold (MW)", "Shift (MW)"], ignore_index=True)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Summarise every threshold: capacity by voltage level and the projects/capacity moved from the baseline.
+
+        :return: DataFrame with the SUMMARY_COLUMNS, one row per threshold.
+        """
+        capacity = self.projects["Capacity (MW)"].to_numpy(dtype=float)[:, None]
+        transmission = self.node_attributes.drop_duplicates("Node").set_index("Node")["Is Transmission"]
+        flat = pd.Series(self.nodes.ravel())
+        on_transmission = flat.map(transmission).eq(True).to_numpy().reshape(self.nodes.shape)
+        matched = flat.notna().to_numpy().reshape(self.nodes.shape)
+        below = matched & ~on_transmission
+        moved = self.nodes != self.nodes[:, [self._column(self.baseline)]]
+        return pd.DataFrame({
+            "Threshold (MW)": self.thresholds,
+            "Projects on 275/400kV": on_transmission.sum(axis=0),
+            "Capacity on 275/400kV (MW)": (capacity * on_transmission).sum(axis=0),
+            "Capacity below 275kV (MW)": (capacity * below).sum(axis=0),
+            "Unmatched Capacity (MW)": (capacity * ~matched).sum(axis=0),
+            "Projects Moved": moved.sum(axis=0),
+            "Capacity Moved (MW)": (capacity * moved).sum(axis=0),
+            "High Capacity below 275kV": (below & (capacity > self.thresholds[None, :])).sum(axis=0),
+        }, columns=SUMMARY_COLUMNS)
+
+
+def sweep_projects(projects: pd.DataFrame, nodes_df: pd.DataFrame, thresholds: Iterable[float],
+                   baseline: float) -> ThresholdSweep:
+    """
+    Evaluate the ETYS_Node assignment of projects for several thresholds at once.
+
+    :param projects: DataFrame with Node_Name and 'Capacity (MW)' columns (e.g. from register_projects).
+    :param nodes_df: DataFrame containing network node data with a 'Node' column.
+    :param thresholds: Thresholds (MW) to evaluate.
+    :param baseline: Baseline threshold (MW), added to the thresholds if missing.
+    :return: The ThresholdSweep.
+    """
+    evaluated = np.unique(np.append(np.asarray(list(thresholds), dtype=float), float(baseline)))
+    projects = projects.reset_index(drop=True)
+    matches = match_candidates(projects["Node_Name"], nodes_df)
+    first = matches["first"]
+    direct = matches["direct"].to_numpy(dtype=object)[:, None]
+    transmission = matches["first_transmission"].fillna(first).to_numpy(dtype=object)[:, None]
+    distribution = matches["first_distribution"].fillna(first).to_numpy(dtype=object)[:, None]
+
+    high = projects["Capacity (MW)"].fillna(0).to_numpy(dtype=float)[:, None] > evaluated[None, :]
+    nodes = np.where(pd.notna(direct), direct, np.where(high, transmission, distribution))
+    nodes[pd.isna(nodes)] = None
+    depends = int((pd.isna(direct[:, 0]) & first.notna().to_numpy()).sum())
+    logger.info(f"Threshold sweep: {len(projects)} projects x {len(evaluated)} thresholds "
+                f"({depends} matched on the site code only).")
+    return ThresholdSweep(evaluated, float(baseline), projects, nodes, build_node_attribute_table(nodes_df))
+
+
+def register_projects(run_config: RunConfig) -> pd.DataFrame:
+    """
+    Collect the TEC and IC register projects as the plant stage sees them before the ETYS_Node assignment.
+
+    :param run_config: Run configuration.
+    :return: DataFrame with the PROJECT_COLUMNS (capacity as used for the voltage preference, see plant_capacity).
+    """
+    from src.data_processing.plant_data import plant_capacity, prepare_registers
+    parts = []
+    for source, df in zip(("TEC Register", "IC Register"), prepare_registers(run_config)):
+        parts.append(pd.DataFrame({
+            "Source": source,
+            "Project Number": df["Project Number"] if "Project Number" in df.columns else None,
+            "Project Name": df["Project Name"] if "Project Name" in df.columns else None,
+            "Node_Name": df["Node_Name"],
+            "Capacity (MW)": plant_capacity(df),
+        }, index=df.index, columns=PROJECT_COLUMNS))
+    return pd.concat(parts, ignore_index=True)
+
+
+def run_threshold_sweep(run_config: RunConfig,
+                        thresholds: Optional[Iterable[float]] = None) -> ThresholdSweep:
+    """
+    Sweep the transmission threshold for the registers and network of a configuration.
+
+    :param run_config: Run configuration; gen_capacity_for_transmission is the baseline.
+    :param thresholds: Thresholds (MW); defaults to TRANSMISSION_THRESHOLD_SWEEP in config.py.
+    :return: The ThresholdSweep.
+    """
+    from src.data_processing.network_data import get_network_data
+    nodes_df = get_network_data(run_config).get("all_nodes_df", pd.DataFrame())
+    if nodes_df.empty:
+        raise ValueError("No network nodes to assign the projects to.")
+    return sweep_projects(register_projects(run_config), nodes_df,
+                          TRANSMISSION_THRESHOLD_SWEEP if thresholds is None else thresholds,
+                          run_config.gen_capacity_for_transmission)
+
+
+def write_threshold_sweep(sweep: ThresholdSweep, output_path: str) -> None:
+    """
+    Write the summary, the capacity shifts and the assignments to a workbook.
+
+    :param sweep: Result of run_threshold_sweep.
+    :param output_path: Path of the workbook (written atomically).
+    """
+    with atomic_path(output_path) as temporary, pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
+        sweep.summary().to_excel(writer, sheet_name="Summary", index=False)
+        sweep.capacity_shift().to_excel(writer, sheet_name="Capacity Shift", index=False)
+        sweep.assignments().to_excel(writer, sheet_name="Assignments", index=False)
+    logger.info(f"Threshold sweep saved to {output_path}.")
@@ -0,0 +1,195 @@
+"""
+Dual-run verification: collate the same inputs with the reference and the accelerated implementations
+(see implementations.py) and check that every output table is identical.
+
+Tables are compared as row multisets: each row is normalised (columns in name order, numbers as floats,
+everything else as text) and hashed with pandas.util.hash_pandas_object, so the comparison is insensitive to
+row order and dtype differences such as 1 vs 1.0 but catches any changed, missing or extra row. The time spent in
+each timed stage is recorded for both runs to report the speedup per stage.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+from src.config import RunConfig
+from src.data_processing.implementations import ACCELERATED, REFERENCE, record_stage_times, use_implementation
+from src.data_processing.output_files import atomic_path
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+TABLE_REPORT_COLUMNS: List[str] = [
+    "Table", "Reference Rows", "Accelerated Rows", "Only In Reference", "Only In Accelerated",
+    "Column Differences", "Examples",
+]
+STAGE_REPORT_COLUMNS: List[str] = ["Stage", "Reference (s)", "Accelerated (s)", "Speedup"]
+
+TOTAL_STAGE = "total"
+
+# Number of mismatching rows shown per table and side.
+MAX_EXAMPLES = 3
+
+
+@dataclass
+class VerificationResult:
+    """
+    Outcome of verify_outputs.
+
+    :param outputs: Collated outputs of the accelerated run (as returned by main.collate_outputs).
+    :param tables: One row per output table with row counts, mismatch counts and examples.
+    :param stages: Time per stage for both runs and the speedup.
+    """
+    outputs: Dict[str, object]
+    tables: pd.DataFrame
+    stages: pd.DataFrame
+
+    @property
+    def ok(self) -> bool:
+        """True if every table matched."""
+        mismatched = (self.tables["Only In Reference"] + self.tables["Only In Accelerated"]) > 0
+        return not (mismatched | (self.tables["Column Differences"] != "")).any()
+
+
+def _normalised(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Return the given columns with numeric columns as floats and the rest as text (blank for missing), where numbers
+    in mixed text/number columns are written as floats.
+    """
+    normalised = {}
+    for col in columns:
+        values = df[col]
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == values.notna().sum():
+            normalised[col] = numeric.astype(float)
+        else:
+            text = values.astype(str).where(values.notna(), "")
+            normalised[col] = text.where(numeric.isna(), numeric.astype(float).astype(str))
+    return pd.DataFrame(normalised, index=pd.RangeIndex(len(df)))
+
+
+def row_hashes(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    Hash each row of df over the given columns after normalisation.
+
+    :param df: Table to hash.
+    :param columns: Columns to include (in this order).
+    :return: uint64 hash per row (positional index).
+    """
+    return pd.util.hash_pandas_object(_normalised(df, columns), index=False)
+
+
+def diff_tables(reference_df: pd.DataFrame, accelerated_df: pd.DataFrame) -> Dict[str, object]:
+    """
+    Compare two tables as row multisets over their common columns.
+
+    :param reference_df: Table from the reference run.
+    :param accelerated_df: Table from the accelerated run.
+    :return: Dictionary with the TABLE_REPORT_COLUMNS fields (except Table).
+    """
+    reference_df = reference_df.rename(columns=str)
+    accelerated_df = accelerated_df.rename(columns=str)
+    reference_cols, accelerated_cols = set(reference_df.columns), set(accelerated_df.columns)
+    columns = sorted(reference_cols & accelerated_cols)
+    column_differences = "; ".join(
+        f"{label}: {sorted(cols)}" for label, cols in
+        (("only in reference", reference_cols - accelerated_cols),
+         ("only in accelerated", accelerated_cols - reference_cols)) if cols
+    )
+
+    reference_hashes = row_hashes(reference_df, columns)
+    accelerated_hashes = row_hashes(accelerated_df, columns)
+    # Rows whose hash occurs more often on one side than on the other.
+    counts = pd.concat([reference_hashes.value_counts().rename("reference"),
+                        accelerated_hashes.value_counts().rename("accelerated")], axis=1).fillna(0)
+    surplus = counts["reference"] - counts["accelerated"]
+    only_reference, only_accelerated = surplus[surplus > 0], -surplus[surplus < 0]
+
+    examples = []
+    for label, df, hashes, extra in (("reference", reference_df, reference_hashes, only_reference),
+                                     ("accelerated", accelerated_df, accelerated_hashes, only_accelerated)):
+        rows = df[hashes.isin(extra.index).to_numpy()].head(MAX_EXAMPLES)
+        examples += [f"{label}: {row}" for row in rows[columns].to_dict(orient="records")]
+
+    return {
+        "Reference Rows": len(reference_df),
+        "Accelerated Rows": len(accelerated_df),
+        "Only In Reference": int(only_reference.sum()),
+        "Only In Accelerated": int(only_accelerated.sum()),
+        "Column Differences": column_differences,
+        "Examples": "\n".join(examples),
+    }
+
+
+def _stage_report(reference_times: Dict[str, float], accelerated_times: Dict[str, float]) -> pd.DataFrame:
+    stages = [stage for stage in reference_times if stage != TOTAL_STAGE] + \
+        [stage for stage in accelerated_times if stage not in reference_times and stage != TOTAL_STAGE] + [TOTAL_STAGE]
+    report = pd.DataFrame({
+        "Stage": stages,
+        "Reference (s)": [reference_times.get(stage, 0.0) for stage in stages],
+        "Accelerated (s)": [accelerated_times.get(stage, 0.0) for stage in stages],
+    })
+    report["Speedup"] = report["Reference (s)"] / report["Accelerated (s)"].where(report["Accelerated (s)"] > 0)
+    return report[STAGE_REPORT_COLUMNS]
+
+
+def verify_outputs(run_config: RunConfig) -> VerificationResult:
+    """
+    Collate the outputs with the reference and the accelerated implementations and compare every output table.
+
+    Input files are read once before the two runs and the cached network results are cleared before each run,
+    so both runs process the same (already loaded) inputs from scratch.
+
+    :param run_config: Run configuration.
+    :return: The VerificationResult (outputs of the accelerated run, table and stage reports).
+    """
+    from src.main import collate_outputs, output_tables
+    from src.data_processing.input_validation import validate_inputs
+    from src.data_processing.network_data import clear_network_caches
+
+    validate_inputs(run_config)  # Loads every input into the file caches.
+    outputs, times = {}, {}
+    for implementation in (REFERENCE, ACCELERATED):
+        clear_network_caches()
+        logger.info(f"Verification: collating with the {implementation} implementation.")
+        with use_implementation(implementation), record_stage_times() as stage_times:
+            start = time.perf_counter()
+            outputs[implementation] = collate_outputs(run_config)
+            stage_times[TOTAL_STAGE] = time.perf_counter() - start
+        times[implementation] = stage_times
+
+    reference_tables = output_tables(outputs[REFERENCE])
+    accelerated_tables = output_tables(outputs[ACCELERATED])
+    tables = pd.DataFrame(
+        [{"Table": name, **diff_tables(reference_tables[name], accelerated_tables[name])} for name in reference_tables],
+        columns=TABLE_REPORT_COLUMNS,
+    )
+    result = VerificationResult(outputs[ACCELERATED], tables, _stage_report(times[REFERENCE], times[ACCELERATED]))
+
+    for row in result.tables.to_dict(orient="records"):
+        if row["Only In Reference"] or row["Only In Accelerated"] or row["Column Differences"]:
+            logger.warning(
+                f"⚠️ Verification: table '{row['Table']}' differs ({row['Only In Reference']} rows only in reference, "
+                f"{row['Only In Accelerated']} only in accelerated; {row['Column Differences'] or 'same columns'})."
+            )
+    for row in result.stages.to_dict(orient="records"):
+        logger.info(f"Verification: {row['Stage']}: reference {row['Reference (s)']:.3f}s, "
+                    f"accelerated {row['Accelerated (s)']:.3f}s (x{row['Speedup']:.1f}).")
+    logger.info(f"Verification {'passed' if result.ok else 'FAILED'} for {len(result.tables)} tables.")
+    return result
+
+
+def write_verification_report(result: VerificationResult, output_path: str) -> None:
+    """
+    Write the table and stage reports to an Excel workbook.
+
+    :param result: Result of verify_outputs.
+    :param output_path: Path of the workbook to write.
+    """
+    with atomic_path(output_path) as temporary, pd.ExcelWriter(temporary, engine="xlsxwriter") as writer:
+        result.tables.to_excel(writer, sheet_name="Tables", index=False)
+        result.stages.to_excel(writer, sheet_name="Stages", index=False)
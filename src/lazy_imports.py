@@ -0,0 +1,49 @@
+"""
+Deferred imports for heavy third-party modules.
+
+Modules in this package bind pandas/numpy with `pd = lazy_import("pandas")`, so importing a pipeline module is cheap
+and the real import only happens the first time an attribute of the module is used (i.e. when a stage runs).
+Modules doing this also use `from __future__ import annotations` so that `pd.DataFrame` type hints are not evaluated
+at import time.
+"""
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module object that is only executed when one of its attributes is first accessed.
+
+    If the module has already been imported the real module is returned.
+
+    :param name: Absolute module name, e.g. "pandas".
+    :return: The (possibly not yet executed) module.
+    """
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
+
+
+def is_loaded(name: str) -> bool:
+    """
+    Return True if the module has been imported and actually executed (not just registered lazily).
+
+    :param name: Absolute module name.
+    :return: Whether the module's code has run.
+    """
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
@@ -3,37 +3,127 @@ This script combines the data outputs from:
  - network_data
  - plant_data
  - load_data
- - intra_hvdc_data
+ - intra_hvdc_data (and the links attached to the network nodes as DC branches)
+ - nodal_balance (generation, interconnector and demand aggregated per ETYS node)
+ - demand_allocation (optional split of GSP demand across several ETYS nodes)
+ - input_validation (schema and integrity checks of the inputs, run first)
 into a single output, ready for feeding into a power system model
 """
 
+from __future__ import annotations
+
 import os
-import pandas as pd
-from src import config
+import logging
+from datetime import datetime
+from typing import BinaryIO, Dict, Optional, Union
+from src.config import LOG_FORMAT, RunConfig, default_run_config
+from src.lazy_imports import lazy_import
+from src.data_processing.output_files import (
+    PARQUET_FORMATS, atomic_directory, atomic_path, record_completed_run, require_pyarrow
+)
+
+pd = lazy_import("pandas")
+
+
+def collate_outputs(run_config: RunConfig) -> Dict[str, object]:
+    """
+    Run every pipeline stage for the given configuration.
+
+    :param run_config: Run configuration.
+    :return: Dictionary with the network data dict, TEC/IC registers, demand, intra HVDC, HVDC branches, nodal
+        balance, demand allocation, input validation, diagnostics and branch anomalies DataFrames.
+    :raises InputValidationError: If run_config.fail_on_invalid_input is set and the inputs have errors.
+    """
+    # The stages are imported here so that importing src.main (CLI, service) stays within the startup budget.
+    from src.data_processing.branch_checks import check_branch_parameters
+    from src.data_processing.demand_allocation import ALLOCATION_COLUMNS, build_run_demand_allocation
+    from src.data_processing.diagnostics import Diagnostics
+    from src.data_processing.input_validation import validate_inputs
+    from src.data_processing.intra_hvdc import build_hvdc_branches, process_intra_hvdc_data
+    from src.data_processing.load_data import load_demand_data
+    from src.data_processing.network_data import get_network_data
+    from src.data_processing.nodal_balance import build_nodal_balance
+    from src.data_processing.plant_data import process_plant_data
+    validation = validate_inputs(run_config, raise_on_error=run_config.fail_on_invalid_input)
+    demand_df = load_demand_data(run_config)
+    network_data_dict = get_network_data(run_config)
+    plant_data_dict = process_plant_data(run_config)
+    intra_hvdc_df = process_intra_hvdc_data(run_config)
+    tec_df = plant_data_dict.get('tec_register', pd.DataFrame())
+    ic_df = plant_data_dict.get('ic_register', pd.DataFrame())
+    all_nodes_df = network_data_dict.get('all_nodes_df', pd.DataFrame())
+    hvdc_diagnostics = Diagnostics()
+    hvdc_branches = build_hvdc_branches(intra_hvdc_df, all_nodes_df, hvdc_diagnostics)
+    hvdc_diagnostics.log_summary()
+    demand_allocation = build_run_demand_allocation(
+        demand_df, all_nodes_df, network_data_dict.get('transformer_data_filtered', pd.DataFrame()), run_config
+    )
+    nodal_balance = build_nodal_balance(all_nodes_df, tec_df, ic_df, demand_df, demand_allocation)
+    diagnostics_df = plant_data_dict.get('diagnostics', pd.DataFrame())
+    if len(hvdc_diagnostics):
+        diagnostics_df = pd.concat([diagnostics_df, hvdc_diagnostics.table()], ignore_index=True)
+    return {
+        'network': network_data_dict,
+        'tec_register': tec_df,
+        'ic_register': ic_df,
+        'demand': demand_df,
+        'intra_hvdc': intra_hvdc_df,
+        'hvdc_branches': hvdc_branches,
+        'nodal_balance': nodal_balance['nodal_balance'],
+        'nodal_balance_unmatched': nodal_balance['unmatched'],
+        'demand_allocation': demand_allocation.table() if demand_allocation is not None else
+        pd.DataFrame(columns=ALLOCATION_COLUMNS),
+        'input_validation': validation.issues,
+        'diagnostics': diagnostics_df,
+        'branch_anomalies': check_branch_parameters(network_data_dict.get('circuit_data_filtered', pd.DataFrame())),
+    }
+
 
-from src.data_processing.load_data import load_demand_data
-from src.data_processing.network_data import get_network_data
-from src.data_processing.plant_data import process_plant_data
-from src.data_processing.intra_hvdc import process_intra_hvdc_data
+def output_tables(outputs: Dict[str, object]) -> Dict[str, pd.DataFrame]:
+    """
+    Flatten collated outputs into one DataFrame per table, named as in the SQLite output.
 
-def combine_outputs():
-    demand_df = load_demand_data()
+    :param outputs: Result of collate_outputs.
+    :return: Mapping of table name to DataFrame.
+    """
+    from src.data_processing import sqlite_store
+    network_data_dict = outputs['network']
+    return {
+        sqlite_store.NODES_TABLE: network_data_dict.get('all_nodes_df', pd.DataFrame()),
+        sqlite_store.CIRCUITS_TABLE: network_data_dict.get('circuit_data_filtered', pd.DataFrame()),
+        sqlite_store.TRANSFORMERS_TABLE: network_data_dict.get('transformer_data_filtered', pd.DataFrame()),
+        sqlite_store.REACTIVE_TABLE: network_data_dict.get('reactive_data_filtered', pd.DataFrame()),
+        sqlite_store.TEC_REGISTER_TABLE: outputs['tec_register'],
+        sqlite_store.IC_REGISTER_TABLE: outputs['ic_register'],
+        sqlite_store.DEMAND_TABLE: outputs['demand'],
+        sqlite_store.INTRA_HVDC_TABLE: outputs['intra_hvdc'],
+        sqlite_store.HVDC_BRANCHES_TABLE: outputs['hvdc_branches'],
+        sqlite_store.NODAL_BALANCE_TABLE: outputs['nodal_balance'],
+        sqlite_store.NODAL_BALANCE_UNMATCHED_TABLE: outputs['nodal_balance_unmatched'],
+        sqlite_store.DEMAND_ALLOCATION_TABLE: outputs['demand_allocation'],
+        sqlite_store.INPUT_VALIDATION_TABLE: outputs['input_validation'],
+        sqlite_store.DIAGNOSTICS_TABLE: outputs['diagnostics'],
+        sqlite_store.BRANCH_ANOMALIES_TABLE: outputs['branch_anomalies'],
+    }
 
-    network_data_dict = get_network_data()
-    network_nodes_df = network_data_dict.get('all_nodes_df', pd.DataFrame())
-    network_filtered = network_data_dict.get('filtered_dataframes', {})
 
-    plant_data_dict = process_plant_data()
-    tec_register_df = plant_data_dict.get('tec_register', pd.DataFrame())
-    ic_register_df = plant_data_dict.get('ic_register', pd.DataFrame())
+def write_full_grid_workbook(outputs: Dict[str, object], output_path: Union[str, BinaryIO]) -> None:
+    """
+    Write all outputs to a single Excel file with multiple sheets.
 
-    intra_hvdc_df = process_intra_hvdc_data()
+    :param outputs: Result of collate_outputs.
+    :param output_path: Path of the workbook to write (written atomically), or a binary file-like object.
+    """
+    if isinstance(output_path, str):
+        with atomic_path(output_path) as temporary, open(temporary, "wb") as f:
+            write_full_grid_workbook(outputs, f)
+        return
 
-    # Create directory if it does not exist.
-    os.makedirs(os.path.dirname(config.FULL_GRID_OUTPUT_FILE_PATH), exist_ok=True)
+    network_nodes_df = outputs['network'].get('all_nodes_df', pd.DataFrame())
+    network_filtered = outputs['network'].get('filtered_dataframes', {})
+    intra_hvdc_df = outputs['intra_hvdc']
 
-    # Write all outputs to a single Excel file with multiple sheets.
-    with pd.ExcelWriter(config.FULL_GRID_OUTPUT_FILE_PATH, engine="xlsxwriter") as writer:
+    with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
         # Write network data: nodes sheet.
         if not network_nodes_df.empty:
             network_nodes_df.to_excel(writer, sheet_name="Nodes", index=False)
@@ -44,17 +134,136 @@ def combine_outputs():
             df.to_excel(writer, sheet_name=safe_sheet_name, index=False)
 
         # Write plant data sheets: TEC Register and IC Register.
-        tec_register_df.to_excel(writer, sheet_name="TEC Register", index=False)
-        ic_register_df.to_excel(writer, sheet_name="IC Register", index=False)
+        outputs['tec_register'].to_excel(writer, sheet_name="TEC Register", index=False)
+        outputs['ic_register'].to_excel(writer, sheet_name="IC Register", index=False)
 
         # Write demand data.
-        demand_df.to_excel(writer, sheet_name="Demand Data", index=False)
+        outputs['demand'].to_excel(writer, sheet_name="Demand Data", index=False)
 
         # Write intra HVDC data.
         if not intra_hvdc_df.empty:
             intra_hvdc_df.to_excel(writer, sheet_name="Intra_HVDC", index=False)
+        if not outputs['hvdc_branches'].empty:
+            outputs['hvdc_branches'].to_excel(writer, sheet_name="HVDC Branches", index=False)
+
+        # Write the nodal balance and the rows that could not be assigned to a node.
+        outputs['nodal_balance'].to_excel(writer, sheet_name="Nodal Balance", index=False)
+        if not outputs['nodal_balance_unmatched'].empty:
+            outputs['nodal_balance_unmatched'].to_excel(writer, sheet_name="Nodal Balance Unmatched", index=False)
+        if not outputs['demand_allocation'].empty:
+            outputs['demand_allocation'].to_excel(writer, sheet_name="Demand Allocation", index=False)
+
+        # Write the input validation issues.
+        if not outputs['input_validation'].empty:
+            outputs['input_validation'].to_excel(writer, sheet_name="Input Validation", index=False)
+
+        # Write the processing diagnostics (e.g. projects without an ETYS node match).
+        if not outputs['diagnostics'].empty:
+            outputs['diagnostics'].to_excel(writer, sheet_name="Diagnostics", index=False)
+
+        # Write the circuits with suspicious parameters.
+        if not outputs['branch_anomalies'].empty:
+            outputs['branch_anomalies'].to_excel(writer, sheet_name="Branch Anomalies", index=False)
+
+
+def write_table_directory(tables: Dict[str, pd.DataFrame], output_dir: str, file_format: str) -> None:
+    """
+    Write one file per table into a directory (built in a temporary directory and renamed into place, replacing
+    any previous contents).
+
+    :param tables: Mapping of table name to DataFrame (see output_tables).
+    :param output_dir: Directory to write.
+    :param file_format: "parquet" or "csv". Parquet requires pyarrow (the parquet extra).
+    """
+    with atomic_directory(output_dir) as temporary_dir:
+        for table_name, df in tables.items():
+            if df.empty:
+                continue
+            path = os.path.join(temporary_dir, f"{table_name}.{file_format}")
+            if file_format == "parquet":
+                # Parquet needs homogeneous column types; mixed object columns (e.g. Unit Number) are stored as text.
+                mixed = [col for col in df.columns if df[col].dtype == object]
+                df.astype({col: "string" for col in mixed}).to_parquet(path, engine="pyarrow", index=False)
+            else:
+                df.to_csv(path, index=False)
+
+
+def combine_outputs(run_config: Optional[RunConfig] = None, verify: bool = False) -> None:
+    """
+    Collate all outputs and write them in every format listed in run_config.output_formats.
+
+    Every output is written atomically (see output_files.py), to <output_dir>/runs/<run_id> if the configuration
+    has a run ID, and the completed run is recorded in the <output_dir>/manifest directory.
+
+    :param run_config: Run configuration; defaults to the settings in config.py.
+    :param verify: Also collate with the reference implementations, compare every output table and write the
+        comparison and per-stage speedup to VERIFICATION_<date>.xlsx (see verification.py).
+    :raises ImportError: If a requested output format needs an optional dependency that is not installed (checked
+        before the pipeline runs).
+    """
+    from src.data_processing import case_export, geo_export, sqlite_store
+    run_config = run_config or default_run_config()
+    for file_format in PARQUET_FORMATS:
+        if file_format in run_config.output_formats:
+            require_pyarrow(file_format)
+    started = datetime.now()
+    written = []
+    if verify:
+        from src.data_processing.verification import verify_outputs, write_verification_report
+        verification = verify_outputs(run_config)
+        outputs = verification.outputs
+        report_path = run_config.output_path("VERIFICATION", "xlsx")
+        write_verification_report(verification, report_path)
+        written.append(report_path)
+        print(f"Verification {'passed' if verification.ok else 'FAILED'}; report saved to {report_path}")
+    else:
+        outputs = collate_outputs(run_config)
+
+    if "sqlite" in run_config.output_formats:
+        sqlite_store.write_collated_outputs_to_sqlite(run_config.sqlite_output_file_path, output_tables(outputs))
+        written.append(run_config.sqlite_output_file_path)
+        print(f"SQLite output successfully saved to {run_config.sqlite_output_file_path}")
+
+    for file_format in ("parquet", "csv"):
+        if file_format in run_config.output_formats:
+            output_dir = os.path.join(run_config.output_path("FULL_GRID"), file_format)
+            write_table_directory(output_tables(outputs), output_dir, file_format)
+            written.append(output_dir)
+            print(f"{file_format} output successfully saved to {output_dir}")
+
+    geo_formats = [fmt for fmt in geo_export.GEO_FORMATS if fmt in run_config.output_formats]
+    if geo_formats:
+        output_dir = os.path.join(run_config.output_path("FULL_GRID"), "geo")
+        geo_export.write_geo_layers(geo_export.build_geo_layers(outputs), output_dir, geo_formats)
+        written.append(output_dir)
+        print(f"Geospatial output ({', '.join(geo_formats)}) successfully saved to {output_dir}")
+
+    case_formats = [fmt for fmt in case_export.CASE_WRITERS if fmt in run_config.output_formats]
+    if case_formats:
+        case = case_export.build_case(outputs)
+        if run_config.collapse_zero_impedance or run_config.reduce_below_kv is not None:
+            from src.data_processing.reduction import reduce_case
+            reduction = reduce_case(case, run_config.reduce_below_kv, run_config.collapse_zero_impedance)
+            case = reduction.case
+            mapping_path = run_config.output_path("FULL_GRID_REDUCTION_MAPPING", "csv")
+            with atomic_path(mapping_path) as temporary:
+                reduction.mapping.to_csv(temporary, index=False)
+            written.append(mapping_path)
+            print(f"Network reduction: {reduction.report}; node mapping saved to {mapping_path}")
+        for file_format in case_formats:
+            extension, writer = case_export.CASE_WRITERS[file_format]
+            path = writer(case, run_config.output_path("FULL_GRID", extension))
+            written.append(path)
+            print(f"{file_format} case successfully saved to {path}")
+
+    if "xlsx" in run_config.output_formats:
+        write_full_grid_workbook(outputs, run_config.full_grid_output_file_path)
+        written.append(run_config.full_grid_output_file_path)
+        print(f"Combined output successfully saved to {run_config.full_grid_output_file_path}")
+
+    record_completed_run(run_config, written, started)
 
-    print(f"Combined output successfully saved to {config.FULL_GRID_OUTPUT_FILE_PATH}")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     combine_outputs()
@@ -0,0 +1,272 @@
+"""
+Long-running local collation service.
+
+Keeps the parsed ETYS workbook, register/mapping/coordinate frames and per-configuration results warm in memory,
+so internal tools can query the collated data over HTTP without paying the cold start and workbook parse on
+every call. Per-configuration results are held in an LRU cache (RESULT_CACHE_SIZE entries by default).
+
+Endpoints (all accept the run configuration as query parameters: year, scenario, tags, demand_types,
+gen_capacity_for_transmission; anything not given falls back to config.py):
+
+    GET  /health                          cache statistics
+    GET  /network[?table=nodes]           network tables (nodes, circuits, transformers, reactive) as JSON
+    GET  /etys-node?gsp=ABHA1             ETYS node resolved for a GSP
+    GET  /etys-node?project=PRO-000285    ETYS node(s) assigned to a TEC/IC Project Number
+    GET  /full-grid[?format=json|xlsx]    full grid export (JSON tables or the FULL_GRID workbook)
+    POST /cache/clear                     drop every in-memory cache
+
+Start with `collate serve --port 8765`; the server binds to 127.0.0.1 unless --host is given.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.config import RESULT_CACHE_SIZE, SERVICE_HOST, SERVICE_PORT, RunConfig, default_run_config
+from src.data_processing.cache import ResultCache, all_cache_stats, clear_all_caches
+from src.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+NETWORK_TABLES: Dict[str, str] = {
+    "nodes": "all_nodes_df",
+    "circuits": "circuit_data_filtered",
+    "transformers": "transformer_data_filtered",
+    "reactive": "reactive_data_filtered",
+}
+
+
+def _frames_to_json(frames: Dict[str, pd.DataFrame]) -> str:
+    """Serialise a mapping of DataFrames to a JSON object of record lists without re-parsing pandas' output."""
+    parts = [
+        f"{json.dumps(name)}: {df.to_json(orient='records', date_format='iso')}" for name, df in frames.items()
+    ]
+    return "{" + ", ".join(parts) + "}"
+
+
+class CollationService:
+    """
+    In-memory collation backend used by the HTTP handler.
+
+    :param cache_size: Number of per-configuration full results to keep.
+    :param base_config: Configuration that request parameters are applied on top of.
+    """
+
+    def __init__(self, cache_size: int = RESULT_CACHE_SIZE, base_config: Optional[RunConfig] = None):
+        self.base_config = base_config or default_run_config()
+        self._outputs = ResultCache("service outputs", maxsize=cache_size)
+
+    def config_from_params(self, params: Dict[str, List[str]]) -> RunConfig:
+        """
+        Build a RunConfig from query parameters.
+
+        :param params: Parsed query string (parse_qs output).
+        :return: The run configuration.
+        """
+        def single(name: str) -> Optional[str]:
+            values = params.get(name)
+            return values[-1] if values else None
+
+        def as_list(name: str) -> Optional[List[str]]:
+            value = single(name)
+            return [item.strip().upper() for item in value.split(",") if item.strip()] if value else None
+
+        overrides: Dict[str, Any] = {}
+        if single("year"):
+            overrides["year_of_analysis"] = int(single("year"))
+        if single("scenario"):
+            overrides["fes_scenario"] = single("scenario").upper()
+        if as_list("tags"):
+            overrides["selected_tags"] = frozenset(as_list("tags"))
+        if as_list("demand_types"):
+            overrides["consider_demand_types"] = tuple(as_list("demand_types"))
+        if single("gen_capacity_for_transmission"):
+            overrides["gen_capacity_for_transmission"] = float(single("gen_capacity_for_transmission"))
+        return self.base_config.replace(**overrides) if overrides else self.base_config
+
+    def network(self, run_config: RunConfig) -> Dict[str, Any]:
+        """Return the network data for a configuration (cached in network_data)."""
+        from src.data_processing.network_data import get_network_data
+        return get_network_data(run_config)
+
+    def outputs(self, run_config: RunConfig) -> Dict[str, Any]:
+        """Return all collated outputs for a configuration, computing them on the first request."""
+        from src.main import collate_outputs
+        return self._outputs.get_or_compute(run_config.data_key(), lambda: collate_outputs(run_config))
+
+    def etys_node_for_gsp(self, run_config: RunConfig, gsp: str) -> Optional[str]:
+        """Resolve the ETYS node for a GSP name against the configuration's node list."""
+        from src.data_processing.load_data import lookup_etys_node
+        nodes_df = self.network(run_config).get("all_nodes_df", pd.DataFrame())
+        return lookup_etys_node(gsp.replace("_", ""), nodes_df) if not nodes_df.empty else None
+
+    def etys_node_for_project(self, run_config: RunConfig, project_number: str) -> List[Dict[str, Any]]:
+        """Return the ETYS node assignments of a TEC/IC Project Number."""
+        from src.data_processing.plant_data import process_plant_data
+        if run_config.data_key() in self._outputs:
+            outputs = self.outputs(run_config)
+            plant = {"tec_register": outputs["tec_register"], "ic_register": outputs["ic_register"]}
+        else:
+            key = ("plant",) + run_config.data_key()
+            plant = self._outputs.get_or_compute(key, lambda: process_plant_data(run_config))
+        matches = []
+        for register_name in ("tec_register", "ic_register"):
+            df = plant[register_name]
+            if "Project Number" not in df.columns:
+                continue
+            rows = df.loc[df["Project Number"] == project_number,
+                          [col for col in ("Project Name", "Node_Name", "ETYS_Node") if col in df.columns]]
+            rows = rows.astype(object).where(rows.notna(), None)
+            matches.extend(dict(row, register=register_name) for row in rows.to_dict(orient="records"))
+        return matches
+
+    def full_grid_workbook(self, run_config: RunConfig) -> bytes:
+        """Return the FULL_GRID workbook for a configuration as bytes."""
+        from src.main import write_full_grid_workbook
+        buffer = io.BytesIO()
+        write_full_grid_workbook(self.outputs(run_config), buffer)
+        return buffer.getvalue()
+
+    def full_grid_tables(self, run_config: RunConfig) -> Dict[str, pd.DataFrame]:
+        """Return the full grid tables for a configuration."""
+        from src.main import output_tables
+        return output_tables(self.outputs(run_config))
+
+    def warm(self, run_config: Optional[RunConfig] = None) -> None:
+        """Load the workbook, registers and network for a configuration ahead of the first request."""
+        run_config = run_config or self.base_config
+        logger.info("Warming collation caches...")
+        self.network(run_config)
+        try:
+            self.outputs(run_config)
+        except (FileNotFoundError, OSError) as e:
+            logger.warning(f"Full grid outputs not pre-loaded: {e}")
+        logger.info("Collation caches warm.")
+
+
+class CollationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler dispatching requests to the server's CollationService."""
+
+    server_version = "CollationService/1.0"
+
+    @property
+    def service(self) -> CollationService:
+        return self.server.service
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload: Any, status: HTTPStatus = HTTPStatus.OK) -> None:
+        body = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+        self._send(status, body.encode("utf-8"))
+
+    def _route(self) -> Tuple[str, Dict[str, List[str]]]:
+        parsed = urlparse(self.path)
+        return parsed.path.rstrip("/") or "/", parse_qs(parsed.query)
+
+    def do_GET(self) -> None:
+        path, params = self._route()
+        try:
+            if path == "/health":
+                self._send_json({"status": "ok", "caches": all_cache_stats()})
+                return
+            run_config = self.service.config_from_params(params)
+            if path == "/network":
+                network = self.service.network(run_config)
+                tables = params.get("table", list(NETWORK_TABLES))
+                unknown = [name for name in tables if name not in NETWORK_TABLES]
+                if unknown:
+                    raise ValueError(f"Unknown network table(s) {unknown}; expected {list(NETWORK_TABLES)}.")
+                self._send_json(_frames_to_json({name: network[NETWORK_TABLES[name]] for name in tables}))
+            elif path == "/etys-node":
+                if "gsp" in params:
+                    gsp = params["gsp"][-1]
+                    self._send_json({"gsp": gsp, "ETYS_Node": self.service.etys_node_for_gsp(run_config, gsp)})
+                elif "project" in params:
+                    project = params["project"][-1]
+                    matches = self.service.etys_node_for_project(run_config, project)
+                    if not matches:
+                        raise KeyError(f"Project Number '{project}' not found in the selected registers.")
+                    self._send_json({"project": project, "matches": matches})
+                else:
+                    raise ValueError("Provide either 'gsp' or 'project'.")
+            elif path == "/full-grid":
+                file_format = params.get("format", ["json"])[-1]
+                if file_format == "xlsx":
+                    self._send(HTTPStatus.OK, self.service.full_grid_workbook(run_config),
+                               "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                elif file_format == "json":
+                    self._send_json(_frames_to_json(self.service.full_grid_tables(run_config)))
+                else:
+                    raise ValueError(f"Unsupported format '{file_format}'; expected 'json' or 'xlsx'.")
+            else:
+                self._send_json({"error": f"Unknown endpoint '{path}'."}, HTTPStatus.NOT_FOUND)
+        except (ValueError, TypeError) as e:
+            self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except (KeyError, FileNotFoundError) as e:
+            self._send_json({"error": str(e).strip("'\"")}, HTTPStatus.NOT_FOUND)
+        except Exception as e:
+            logger.exception(f"Error handling request {self.path}")
+            self._send_json({"error": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def do_POST(self) -> None:
+        path, _ = self._route()
+        if path == "/cache/clear":
+            clear_all_caches()
+            self._send_json({"status": "cleared"})
+        else:
+            self._send_json({"error": f"Unknown endpoint '{path}'."}, HTTPStatus.NOT_FOUND)
+
+
+def make_server(host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                service: Optional[CollationService] = None) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) the HTTP server. Use port 0 to bind to a free port.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to.
+    :param service: Service backend; a new CollationService is created if not given.
+    :return: The server; call serve_forever() to start it.
+    """
+    server = ThreadingHTTPServer((host, port), CollationRequestHandler)
+    server.daemon_threads = True
+    server.service = service or CollationService()
+    return server
+
+
+def serve(host: str = SERVICE_HOST, port: int = SERVICE_PORT, cache_size: int = RESULT_CACHE_SIZE,
+          warm: bool = True) -> None:
+    """
+    Run the collation service until interrupted.
+
+    :param host: Interface to bind to.
+    :param port: Port to bind to.
+    :param cache_size: Number of per-configuration results to keep.
+    :param warm: Whether to load the default configuration before accepting requests.
+    """
+    service = CollationService(cache_size=cache_size)
+    if warm:
+        service.warm()
+    server = make_server(host, port, service)
+    logger.info(f"Collation service listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Collation service stopped.")
+    finally:
+        server.server_close()
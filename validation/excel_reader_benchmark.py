@@ -0,0 +1,77 @@
+"""
+Benchmarks the Excel reader engines (see src/data_processing/excel_readers.py) on the ETYS Appendix B workbook and
+checks that they produce identical DataFrames.
+
+Every sheet is read with header=1, the column names are stripped and renamed with COLUMN_RENAME_MAP (as in
+network_data.parse_all_sheets), and each engine's sheets are compared with the first engine's using
+pandas.testing.assert_frame_equal (exact values, dtypes and column names). Engines whose optional dependency is
+not installed are reported and skipped. The script fails (exit code 1) if any sheet differs.
+
+Usage:
+    python -m validation.excel_reader_benchmark [--file input_data/etys_appendix_b_2024.xlsx] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from typing import Dict, List
+
+from src.config import ETYSB_FILE_PATH
+from src.data_processing.excel_readers import EXCEL_READERS
+from src.data_processing.network_data import COLUMN_RENAME_MAP, read_workbook_sheets
+
+warnings.filterwarnings("ignore", message="Cannot parse header or footer so it will be ignored")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=ETYSB_FILE_PATH, help="Workbook to read.")
+    parser.add_argument("--engines", default=",".join(EXCEL_READERS),
+                        help="Comma-separated engines; the first one is the reference for the comparison.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed reads per engine (the best is reported).")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    results: Dict[str, Dict[str, pd.DataFrame]] = {}
+    timings: Dict[str, float] = {}
+    for engine in [name.strip() for name in args.engines.split(",") if name.strip()]:
+        times: List[float] = []
+        try:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results[engine] = read_workbook_sheets(args.file, COLUMN_RENAME_MAP, engine)
+                times.append(time.perf_counter() - start)
+        except ImportError as e:
+            print(f"SKIP {engine}: {e}")
+            continue
+        timings[engine] = min(times)
+
+    if not results:
+        print("No engine could be run.")
+        return 1
+    reference = next(iter(results))
+    failures: List[str] = []
+    for engine, sheets in results.items():
+        speedup = timings[reference] / timings[engine]
+        print(f"{engine:10} {timings[engine]:7.2f} s  (x{speedup:.1f} vs {reference}, {len(sheets)} sheets)")
+        if list(sheets) != list(results[reference]):
+            failures.append(f"{engine}: sheets {list(sheets)} differ from {list(results[reference])}")
+            continue
+        for sheet_name, df in sheets.items():
+            try:
+                pd.testing.assert_frame_equal(results[reference][sheet_name], df, check_exact=True)
+            except AssertionError as e:
+                failures.append(f"{engine}: sheet '{sheet_name}' differs from {reference}: {e}")
+
+    if failures:
+        for failure in failures:
+            print(failure)
+        return 1
+    print(f"All engines produced identical DataFrames for {len(results[reference])} sheets.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
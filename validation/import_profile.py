@@ -0,0 +1,98 @@
+"""
+Measures the import-time profile of the pipeline entry modules and checks it against a startup budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, so the figures are cold-start costs
+as seen by a short scheduled job. The script fails (exit code 1) if any module exceeds the budget or eagerly
+imports one of the heavy third-party packages, which must only be loaded when a stage actually runs.
+
+Usage:
+    python -m validation.import_profile [--budget-ms 150] [--top 10]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_MODULES: List[str] = [
+    "src.config",
+    "src.cli",
+    "src.main",
+    "src.data_processing.network_data",
+    "src.data_processing.plant_data",
+    "src.data_processing.load_data",
+    "src.data_processing.intra_hvdc",
+    "validation.isolated_nodes_network_data",
+]
+
+# Packages that must not be executed at import time.
+DEFERRED_PACKAGES: List[str] = ["pandas", "numpy", "openpyxl", "scipy", "networkx"]
+
+IMPORT_TIME_BUDGET_MS = 150.0
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> Tuple[float, List[Tuple[str, float, float]], List[str]]:
+    """
+    Import a module in a fresh interpreter and collect its import-time profile.
+
+    :param module: Module to import.
+    :return: Tuple of (total cumulative ms, [(module, self ms, cumulative ms)], deferred packages that were executed).
+    """
+    check = (
+        "import sys, importlib.util; "
+        f"import {module}; "
+        f"print(','.join(p for p in {DEFERRED_PACKAGES!r} if p in sys.modules "
+        "and not isinstance(sys.modules[p], importlib.util._LazyModule)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+    entries: List[Tuple[str, float, float]] = []
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+        if len(indent) == 1:  # top-level import
+            total_ms += int(cumulative_us) / 1000
+    loaded = [p for p in result.stdout.strip().split(",") if p]
+    return total_ms, entries, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list per module.")
+    args = parser.parse_args()
+
+    failures: Dict[str, str] = {}
+    for module in ENTRY_MODULES:
+        total_ms, entries, loaded = profile_import(module)
+        status = "OK" if total_ms <= args.budget_ms and not loaded else "FAIL"
+        print(f"{status:4} {module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        for name, self_ms, cumulative_ms in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+            print(f"       {self_ms:7.1f} ms self  {cumulative_ms:7.1f} ms cumulative  {name}")
+        if total_ms > args.budget_ms:
+            failures[module] = f"import took {total_ms:.1f} ms"
+        if loaded:
+            failures[module] = f"eagerly imported {', '.join(loaded)}"
+
+    if failures:
+        for module, reason in failures.items():
+            print(f"Startup budget exceeded by {module}: {reason}")
+        return 1
+    print("All entry modules are within the startup budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
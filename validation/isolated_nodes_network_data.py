@@ -1,20 +1,9 @@
-import networkx as nx
 import logging
+from src.config import LOG_FORMAT
 from src.data_processing.network_data import get_network_data  # adjust import path as needed
 
-# Logging setup
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# Retrieve the processed network data
-data = get_network_data()
-circuit_data_filtered = data['circuit_data_filtered']
-transformer_data_filtered = data['transformer_data_filtered']
-reactive_data_filtered = data['reactive_data_filtered']
-all_nodes_df = data['all_nodes_df']
-
-# Extract nodes list from all_nodes_df
-nodes = set(all_nodes_df['Node'].dropna())
 
 def extract_branches_and_nodes(circuit_data, transformer_data):
     branches = []
@@ -36,18 +25,6 @@ def extract_branches_and_nodes(circuit_data, transformer_data):
         raise
     return branches, all_extracted_nodes
 
-branches, extracted_nodes = extract_branches_and_nodes(circuit_data_filtered, transformer_data_filtered)
-missing_nodes = extracted_nodes - nodes
-if missing_nodes:
-    logger.warning(f"Missing nodes detected! The following nodes are in circuit/transformer data but not in the node list: {missing_nodes}")
-    print("Missing nodes:", missing_nodes)
-else:
-    logger.info("All nodes in the circuit and transformer data are accounted for in the node data.")
-
-G = nx.Graph()
-G.add_nodes_from(nodes)
-G.add_edges_from(branches)
-isolated_nodes = list(nx.isolates(G))
 
 def analyse_isolated_nodes(isolated_nodes, circuit_data, transformer_data, reactive_data, graph):
     details = []
@@ -73,26 +50,58 @@ def analyse_isolated_nodes(isolated_nodes, circuit_data, transformer_data, react
         details.append(node_details)
     return details
 
-isolated_node_details = analyse_isolated_nodes(isolated_nodes, circuit_data_filtered, transformer_data_filtered, reactive_data_filtered, G)
-
-# Print detailed analysis for each isolated node
-for detail in isolated_node_details:
-    print(f"Node: {detail['Node']}")
-    print(f"  - In Circuit Data: {detail['In Circuit Data']}")
-    print(f"  - In Transformer Data: {detail['In Transformer Data']}")
-    print(f"  - In Reactive Data: {detail['In Reactive Data']}")
-    print(f"  - Degree in Graph: {detail['Degree']}")
-    print(f"  - Isolation Cause: {detail['Isolation Cause']}")
-    print("\n")
-
-# Count the isolated nodes per category
-circuit_count = sum(1 for detail in isolated_node_details if detail["In Circuit Data"])
-transformer_count = sum(1 for detail in isolated_node_details if detail["In Transformer Data"])
-reactive_count = sum(1 for detail in isolated_node_details if detail["In Reactive Data"])
-
-print(f"Number of isolated nodes: {len(isolated_nodes)}")
-print(f"Isolated nodes present in Circuit Data: {circuit_count}")
-print(f"Isolated nodes present in Transformer Data: {transformer_count}")
-print(f"Isolated nodes present in Reactive Data: {reactive_count}")
-
-logger.info("Isolated nodes analysis completed.")
+
+def main() -> None:
+    import networkx as nx
+
+    # Retrieve the processed network data
+    data = get_network_data()
+    circuit_data_filtered = data['circuit_data_filtered']
+    transformer_data_filtered = data['transformer_data_filtered']
+    reactive_data_filtered = data['reactive_data_filtered']
+    all_nodes_df = data['all_nodes_df']
+
+    # Extract nodes list from all_nodes_df
+    nodes = set(all_nodes_df['Node'].dropna())
+
+    branches, extracted_nodes = extract_branches_and_nodes(circuit_data_filtered, transformer_data_filtered)
+    missing_nodes = extracted_nodes - nodes
+    if missing_nodes:
+        logger.warning(f"Missing nodes detected! The following nodes are in circuit/transformer data but not in the node list: {missing_nodes}")
+        print("Missing nodes:", missing_nodes)
+    else:
+        logger.info("All nodes in the circuit and transformer data are accounted for in the node data.")
+
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(branches)
+    isolated_nodes = list(nx.isolates(G))
+
+    isolated_node_details = analyse_isolated_nodes(isolated_nodes, circuit_data_filtered, transformer_data_filtered, reactive_data_filtered, G)
+
+    # Print detailed analysis for each isolated node
+    for detail in isolated_node_details:
+        print(f"Node: {detail['Node']}")
+        print(f"  - In Circuit Data: {detail['In Circuit Data']}")
+        print(f"  - In Transformer Data: {detail['In Transformer Data']}")
+        print(f"  - In Reactive Data: {detail['In Reactive Data']}")
+        print(f"  - Degree in Graph: {detail['Degree']}")
+        print(f"  - Isolation Cause: {detail['Isolation Cause']}")
+        print("\n")
+
+    # Count the isolated nodes per category
+    circuit_count = sum(1 for detail in isolated_node_details if detail["In Circuit Data"])
+    transformer_count = sum(1 for detail in isolated_node_details if detail["In Transformer Data"])
+    reactive_count = sum(1 for detail in isolated_node_details if detail["In Reactive Data"])
+
+    print(f"Number of isolated nodes: {len(isolated_nodes)}")
+    print(f"Isolated nodes present in Circuit Data: {circuit_count}")
+    print(f"Isolated nodes present in Transformer Data: {transformer_count}")
+    print(f"Isolated nodes present in Reactive Data: {reactive_count}")
+
+    logger.info("Isolated nodes analysis completed.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    main()
@@ -0,0 +1,119 @@
+"""
+Measures the peak memory allocated by each pipeline stage with pandas copy-on-write off (eager copies, the
+behaviour before PANDAS_COPY_ON_WRITE) and on.
+
+Each mode runs in its own subprocess so that the caches and the pandas option start fresh. The stages run in
+pipeline order with tracemalloc; for each stage the peak traced allocation above the memory held before the stage
+and the memory still held after it are reported. The last stage collates the outputs again on warm caches, which
+is what a service or a second run in the same process does: every cached table is handed out as a copy.
+
+Usage:
+    python -m validation.memory_benchmark [--tags NGET,SPT,SHET,OFTO] [--demand-file path] [--modes off,on]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Tuple
+
+warnings.filterwarnings("ignore", message="Cannot parse header or footer so it will be ignored")
+
+MODES = {"off": False, "on": True}
+
+
+def _stages(run_config) -> List[Tuple[str, Callable[[], object]]]:
+    from src.data_processing.input_validation import validate_inputs
+    from src.data_processing.intra_hvdc import process_intra_hvdc_data
+    from src.data_processing.load_data import load_demand_data
+    from src.data_processing.network_data import COLUMN_RENAME_MAP, get_network_data, parse_all_sheets
+    from src.data_processing.plant_data import process_plant_data
+    from src.main import collate_outputs
+    return [
+        ("parse workbook", lambda: parse_all_sheets(run_config.etysb_file_path, COLUMN_RENAME_MAP,
+                                                    run_config.excel_reader)),
+        ("network data", lambda: get_network_data(run_config)),
+        ("input validation", lambda: validate_inputs(run_config)),
+        ("demand", lambda: load_demand_data(run_config)),
+        ("plant data", lambda: process_plant_data(run_config)),
+        ("intra hvdc", lambda: process_intra_hvdc_data(run_config)),
+        ("collate outputs", lambda: collate_outputs(run_config)),
+        ("collate outputs (warm)", lambda: collate_outputs(run_config)),
+    ]
+
+
+def measure(copy_on_write: bool, tags: str, demand_file: str) -> Dict[str, Dict[str, float]]:
+    """
+    Run the stages in this process and measure them.
+
+    :param copy_on_write: pandas copy-on-write mode.
+    :param tags: Comma-separated TO tags.
+    :param demand_file: Demand CSV (the configured file if empty).
+    :return: Dictionary of stage name to {"peak": MB, "held": MB}.
+    """
+    from src.config import default_run_config
+    from src.data_processing.cache import configure_pandas
+    configure_pandas(copy_on_write)
+    overrides = {"selected_tags": {tag.strip() for tag in tags.split(",") if tag.strip()}}
+    if demand_file:
+        overrides["demand_file_path"] = demand_file
+    run_config = default_run_config(**overrides)
+
+    results: Dict[str, Dict[str, float]] = {}
+    retained = []
+    tracemalloc.start()
+    for name, stage in _stages(run_config):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        retained.append(stage())
+        after, peak = tracemalloc.get_traced_memory()
+        results[name] = {"peak": (peak - before) / 1e6, "held": (after - before) / 1e6}
+    tracemalloc.stop()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tags", default="NGET,SPT,SHET,OFTO", help="Comma-separated TO tags.")
+    parser.add_argument("--demand-file", default="", help="Demand CSV (defaults to the configured file).")
+    parser.add_argument("--modes", default="off,on", help="Comma-separated copy-on-write modes to compare.")
+    parser.add_argument("--worker", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(MODES[args.worker], args.tags, args.demand_file)))
+        return 0
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"Unknown modes {unknown}; use {list(MODES)}.")
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for mode in modes:
+        completed = subprocess.run(
+            [sys.executable, "-m", "validation.memory_benchmark", "--worker", mode, "--tags", args.tags,
+             "--demand-file", args.demand_file],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"Copy-on-write {mode}: the benchmark failed (exit code {completed.returncode}).")
+            return 1
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    header = "".join(f"{f'cow {mode} peak':>15}{f'cow {mode} held':>15}" for mode in modes)
+    print(f"{'stage (MB)':24}{header}")
+    for stage in results[modes[0]]:
+        row = "".join(f"{results[mode][stage]['peak']:15.1f}{results[mode][stage]['held']:15.1f}" for mode in modes)
+        print(f"{stage:24}{row}")
+    totals = ""
+    for mode in modes:
+        stages = results[mode].values()
+        totals += f"{max(r['peak'] for r in stages):15.1f}{sum(r['held'] for r in stages):15.1f}"
+    print(f"{'max peak / total held':24}{totals}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())